@@ -0,0 +1 @@
+"""Benchmarks for sphinx-graph, run against synthetic projects."""
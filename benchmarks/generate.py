@@ -0,0 +1,193 @@
+"""Generate synthetic Sphinx projects for benchmarking.
+
+Usage::
+
+    python -m benchmarks.generate OUTPUT_DIR --vertices 10000 --documents 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import dataclass, fields
+from itertools import pairwise, starmap
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sphinx_graph.vertex.fingerprint import FingerprintConfig, digest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+__all__ = [
+    "Corpus",
+    "generate",
+]
+
+
+@dataclass(frozen=True)
+class Corpus:
+    """The shape of a synthetic project.
+
+    Vertices are arranged in levels. Each vertex below the top level links to up to
+    ``fan_in`` parents in the level above, so the average fan-out of a vertex is
+    ``fan_in`` multiplied by the ratio of the sizes of the two levels.
+
+    Args:
+        vertices: the total number of vertices
+        documents: the number of documents the vertices are spread across
+        fan_in: the maximum number of parents of each vertex
+        depth: the number of levels of vertices
+        tags: the number of distinct tags. Each vertex has one or two tags.
+        tables: the number of vertex tables in each document
+        fingerprints: whether parent links include (and require) fingerprints
+        reachability: whether the reachability index is enabled. Tables of
+            descendants then have no depth limit (only a limit on the rows shown),
+            and alternate with tables of ancestors, so that they are looked up in
+            the index.
+        seed: the seed for the random links, so that projects are reproducible
+    """
+
+    vertices: int = 1_000
+    documents: int = 20
+    fan_in: int = 2
+    depth: int = 5
+    tags: int = 10
+    tables: int = 1
+    fingerprints: bool = False
+    reachability: bool = False
+    seed: int = 0
+
+
+def uid(index: int) -> str:
+    """The UID of the vertex with the given index."""
+    return f"V-{index:06d}"
+
+
+def content(index: int) -> str:
+    """The (single line) content of the vertex with the given index."""
+    return f"This is the content of synthetic vertex number {index}."
+
+
+def levels(corpus: Corpus) -> list[range]:
+    """The indices of the vertices in each level, from the top level down."""
+    depth = max(1, min(corpus.depth, corpus.vertices))
+    bounds = [corpus.vertices * level // depth for level in range(depth + 1)]
+    return list(starmap(range, pairwise(bounds)))
+
+
+def vertices(corpus: Corpus, rng: random.Random) -> Iterator[str]:
+    """The source of every vertex directive, in index order."""
+    fingerprint = FingerprintConfig()
+    previous: range = range(0)
+    for level in levels(corpus):
+        for index in level:
+            lines = [f".. vertex:: {uid(index)}"]
+            if previous:
+                count = rng.randint(1, min(corpus.fan_in, len(previous)))
+                parents = sorted(rng.sample(previous, count))
+                links = [
+                    f"{uid(parent)}:{digest(content(parent), fingerprint)}"
+                    if corpus.fingerprints
+                    else uid(parent)
+                    for parent in parents
+                ]
+                lines.append(f"   :parents: {', '.join(links)}")
+            if corpus.tags:
+                tags = {f"tag-{rng.randrange(corpus.tags)}" for _ in range(2)}
+                lines.append(f"   :tags: {', '.join(sorted(tags))}")
+            lines.extend(["", f"   {content(index)}", ""])
+            yield "\n".join(lines)
+        previous = level
+
+
+def tables(corpus: Corpus, rng: random.Random, document: int) -> Iterator[str]:
+    """The source of the vertex tables in one document.
+
+    Tables rotate between a tag query, a descendants (or ancestors) query and a
+    limited listing of every vertex, across and within documents.
+    """
+    for table in range(corpus.tables):
+        kind = (document + table) % 3
+        if kind == 0 and corpus.tags:
+            body = f'tags = "tag-{rng.randrange(corpus.tags)}"'
+            options = ""
+        elif kind == 1 and corpus.reachability:
+            relation = "ancestors_of" if table % 2 else "descendants_of"
+            body = f'{relation} = "{uid(rng.randrange(corpus.vertices))}"'
+            options = "   :limit: 50\n"
+        elif kind == 1:
+            body = (
+                f'descendants_of = "{uid(rng.randrange(corpus.vertices))}"\ndepth = 2'
+            )
+            options = ""
+        else:
+            body = 'sort = "-uid"'
+            options = "   :limit: 50\n"
+        indented = "\n".join(f"   {line}" for line in body.splitlines())
+        yield f".. vertex-table::\n   :query: select\n{options}\n{indented}\n"
+
+
+def conf(corpus: Corpus) -> str:
+    """The *conf.py* of the project."""
+    vertex_config = (
+        "VertexConfig(require_fingerprints=True)"
+        if corpus.fingerprints
+        else "VertexConfig()"
+    )
+    reachability = ", reachability_index=True" if corpus.reachability else ""
+    return (
+        "from sphinx_graph import Config, VertexConfig\n\n"
+        'project = "synthetic"\n'
+        'extensions = ["sphinx_graph"]\n\n'
+        f"graph_config = Config(vertex_config={vertex_config}{reachability})\n"
+    )
+
+
+def generate(corpus: Corpus, path: Path) -> None:
+    """Write a synthetic project to the given directory.
+
+    Vertices are spread evenly across the documents, so that links frequently cross
+    between documents.
+    """
+    rng = random.Random(corpus.seed)  # noqa: S311
+    documents: list[list[str]] = [[] for _ in range(max(1, corpus.documents))]
+    for index, source in enumerate(vertices(corpus, rng)):
+        documents[index % len(documents)].append(source)
+
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "conf.py").write_text(conf(corpus))
+    names = [f"doc-{number:04d}" for number in range(len(documents))]
+    toctree = "\n".join(f"   {name}" for name in names)
+    (path / "index.rst").write_text(
+        f"Synthetic project\n=================\n\n.. toctree::\n\n{toctree}\n"
+    )
+    for document, (name, sources) in enumerate(zip(names, documents, strict=True)):
+        title = f"{name}\n{'=' * len(name)}\n"
+        body = "\n".join([*sources, *tables(corpus, rng, document)])
+        (path / f"{name}.rst").write_text(f"{title}\n{body}")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> tuple[Corpus, Path]:
+    """Parse the command line arguments of the generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path, help="the directory to write to")
+    for field in fields(Corpus):
+        name = f"--{field.name.replace('_', '-')}"
+        if field.type == "bool":
+            parser.add_argument(name, action="store_true")
+        else:
+            parser.add_argument(name, type=int, default=field.default)
+    args = vars(parser.parse_args(argv))
+    output = args.pop("output")
+    return Corpus(**args), output
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Generate a synthetic project from the command line."""
+    corpus, output = parse_args(argv)
+    generate(corpus, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Benchmark sphinx-graph against synthetic projects, and check for regressions.
+
+Usage::
+
+    python -m benchmarks.run                    # run the default scenarios
+    python -m benchmarks.run large --jobs 4     # run a named scenario
+    python -m benchmarks.run --update           # store the results as the baselines
+    python -m benchmarks.run --runner ci        # use the baselines of another runner
+
+Each build runs in a fresh process, from an empty environment. The minimum of
+``--repeat`` builds is reported for each timing, and the maximum for memory. A metric
+has regressed if it exceeds its baseline by more than ``--threshold`` (a fraction), and
+by more than an absolute allowance for noise.
+
+Timings depend on the machine, so baselines are stored separately for each runner (by
+default, ``$BENCHMARK_RUNNER``, or ``local``). Results are only compared with the
+baselines recorded by the same runner.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from benchmarks.generate import Corpus, generate
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from sphinx.application import Sphinx
+
+__all__ = [
+    "SCENARIOS",
+    "compare",
+    "measure",
+]
+
+BASELINES = Path(__file__).parent / "baselines.json"
+
+# the environment variable which names the runner, for its baselines
+RUNNER = "BENCHMARK_RUNNER"
+
+SCENARIOS: dict[str, Corpus] = {
+    "small": Corpus(vertices=1_000, documents=20, tables=1),
+    "medium": Corpus(
+        vertices=5_000, documents=50, tags=50, tables=2, fingerprints=True
+    ),
+    "reachability": Corpus(
+        vertices=5_000,
+        documents=50,
+        fan_in=3,
+        depth=20,
+        tags=100,
+        tables=3,
+        reachability=True,
+    ),
+    "large": Corpus(
+        vertices=20_000, documents=200, fan_in=3, depth=8, tags=200, tables=3
+    ),
+}
+
+DEFAULT_SCENARIOS = ("small", "medium", "reachability")
+
+# differences smaller than this are treated as noise: seconds for timings, and
+# megabytes for memory
+ALLOWANCE = {"seconds": 0.05, "megabytes": 5.0}
+
+
+def peak_memory() -> float:
+    """The peak memory use of this process and its children, in megabytes.
+
+    Returns zero on platforms without the :py:mod:`resource` module (Windows).
+    """
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return 0.0
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # kilobytes on Linux, bytes on macOS
+    return usage / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def build(srcdir: Path, outdir: Path, jobs: int) -> dict[str, float]:
+    """Build a project in this process, and measure each phase.
+
+    Returns:
+        a mapping from metric name to value. Timings are in seconds.
+    """
+    from sphinx.application import Sphinx  # noqa: PLC0415
+
+    from sphinx_graph.instrumentation import Instrumentation  # noqa: PLC0415
+
+    marks: dict[str, float] = {}
+
+    def mark(name: str) -> Any:  # noqa: ANN401
+        def handler(*_args: object) -> None:
+            marks[name] = time.perf_counter()
+
+        return handler
+
+    app: Sphinx = Sphinx(
+        srcdir,
+        srcdir,
+        outdir,
+        outdir / ".doctrees",
+        "html",
+        status=None,
+        warning=sys.stderr,
+        freshenv=True,
+        parallel=jobs,
+    )
+    app.connect("env-before-read-docs", mark("read_start"))
+    # before the graph is built
+    app.connect("env-updated", mark("read_end"), priority=0)
+    app.connect("build-finished", mark("finished"))
+    start = time.perf_counter()
+    app.build()
+    if app.statuscode:
+        msg = "the benchmark project failed to build"
+        raise RuntimeError(msg)
+
+    timers = Instrumentation.read(app.env).timers
+
+    def total(prefix: str) -> float:
+        return sum(
+            timer.seconds for name, timer in timers.items() if name.startswith(prefix)
+        )
+
+    return {
+        "total.seconds": time.perf_counter() - start,
+        "read.seconds": marks["read_end"] - marks["read_start"],
+        "graph_build.seconds": total("graph.build"),
+        "cycle_detection.seconds": total("graph.check_cycles"),
+        "reachability.seconds": total("graph.reachability"),
+        "table_query.seconds": total("query."),
+        "write.seconds": marks["finished"] - marks["read_end"],
+        "peak_memory.megabytes": peak_memory(),
+    }
+
+
+def measure(srcdir: Path, jobs: int, repeat: int) -> dict[str, float]:
+    """Build a project ``repeat`` times, each in a fresh process.
+
+    Returns:
+        the best (minimum) of each timing, and the maximum peak memory.
+    """
+    runs: list[dict[str, float]] = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as outdir:
+            result = subprocess.run(  # noqa: S603
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.run",
+                    "--build",
+                    str(srcdir),
+                    outdir,
+                    "--jobs",
+                    str(jobs),
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+                cwd=Path(__file__).parent.parent,
+            )
+        if result.returncode:
+            sys.stderr.write(result.stderr)
+            result.check_returncode()
+        runs.append(json.loads(result.stdout))
+    return {
+        metric: (max if metric.endswith(".megabytes") else min)(
+            run[metric] for run in runs
+        )
+        for metric in runs[0]
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baselines: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Compare results with their baselines.
+
+    Returns:
+        a description of each metric which has regressed.
+    """
+    regressions = []
+    for key, metrics in sorted(results.items()):
+        for metric, value in metrics.items():
+            baseline = baselines.get(key, {}).get(metric)
+            if baseline is None:
+                continue
+            allowance = ALLOWANCE[metric.rsplit(".", 1)[1]]
+            if value > baseline * (1 + threshold) and value - baseline > allowance:
+                regressions.append(
+                    f"{key} {metric}: {value:.3f} (baseline {baseline:.3f}, "
+                    f"+{(value / baseline - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse the command line arguments of the benchmark runner."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"the scenarios to run, from {', '.join(SCENARIOS)} (default:"
+        f" {', '.join(DEFAULT_SCENARIOS)})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        help="the number of processes for the parallel build (the serial build is"
+        " always run)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="the fraction by which a metric may exceed its baseline",
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="store the results as the baselines"
+    )
+    parser.add_argument(
+        "--runner",
+        default=os.environ.get(RUNNER) or "local",
+        help=f"the name of the machine, whose baselines are compared with (default:"
+        f" ${RUNNER}, or 'local')",
+    )
+    parser.add_argument(
+        "--build", nargs=2, metavar=("SRCDIR", "OUTDIR"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    args.scenarios = args.scenarios or list(DEFAULT_SCENARIOS)
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the benchmarks from the command line.
+
+    Returns:
+        the exit status: non-zero if any metric has regressed.
+    """
+    args = parse_args(argv)
+    if args.build:
+        srcdir, outdir = args.build
+        print(json.dumps(build(Path(srcdir), Path(outdir), args.jobs)))
+        return 0
+
+    results: dict[str, dict[str, float]] = {}
+    for name in args.scenarios:
+        corpus = SCENARIOS[name]
+        with tempfile.TemporaryDirectory() as srcdir:
+            generate(corpus, Path(srcdir))
+            for jobs in sorted({1, args.jobs}):
+                key = f"{name}-j{jobs}"
+                print(f"{key}: {json.dumps(asdict(corpus))}", file=sys.stderr)
+                results[key] = measure(Path(srcdir), jobs, args.repeat)
+                for metric, value in results[key].items():
+                    print(f"  {metric:<28} {value:10.3f}")
+
+    runners = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    if args.update:
+        runners.setdefault(args.runner, {}).update(results)
+        BASELINES.write_text(json.dumps(runners, indent=2, sort_keys=True) + "\n")
+        return 0
+
+    baselines = runners.get(args.runner)
+    if baselines is None:
+        print(
+            f"no baselines for runner '{args.runner}'. record them with --update",
+            file=sys.stderr,
+        )
+        return 0
+    regressions = compare(results, baselines, args.threshold)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
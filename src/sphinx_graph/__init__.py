@@ -14,10 +14,11 @@ from . import vertex
 from ._setup import setup
 from .config import Config
 from .vertex import Config as VertexConfig
-from .vertex import Query
+from .vertex import FingerprintConfig, Query
 
 __all__ = [
     "Config",
+    "FingerprintConfig",
     "Query",
     "VertexConfig",
     "setup",
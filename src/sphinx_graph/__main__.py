@@ -0,0 +1,8 @@
+"""Run the sphinx-graph command line interface: ``python -m sphinx_graph``."""
+
+import sys
+
+from sphinx_graph.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
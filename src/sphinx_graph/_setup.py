@@ -4,7 +4,7 @@ from typing import TypedDict
 
 from sphinx.application import Sphinx
 
-from . import table, vertex
+from . import graphcheck, instrumentation, table, vertex
 from .config import Config
 
 
@@ -23,10 +23,12 @@ def setup(app: Sphinx) -> ExtensionMetadata:
 
     vertex.register(app)
     table.register(app)
+    instrumentation.register(app)
+    graphcheck.register(app)
 
     return {
         "version": "0.1",
-        "env_version": 0,
+        "env_version": 2,
         "parallel_read_safe": True,
         "parallel_write_safe": True,
     }
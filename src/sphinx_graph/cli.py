@@ -0,0 +1,322 @@
+"""Check the vertex graph of a project from the command line, without Sphinx.
+
+Usage::
+
+    python -m sphinx_graph check [SRCDIR] [--confdir DIR] [--outdir DIR] [--jobs N]
+
+Vertex directives are found by a lightweight scanner (see :py:mod:`sphinx_graph.scan`)
+rather than by reading each document with Sphinx, so a check finishes in seconds even
+for large projects. The configuration (``graph_config``) is loaded from *conf.py*, and
+the graph is checked in the same way as during a Sphinx build.
+
+Any warning or error is printed as ``path:line: level: message``, and the exit status
+is non-zero. Links to vertices whose content contains markup can't have their
+fingerprints checked; these are counted in the summary.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import rustworkx as rx
+from sphinx.config import eval_config_file
+from sphinx.project import Project
+from sphinx.util import logging as sphinx_logging
+from sphinx.util.tags import Tags
+
+from sphinx_graph.config import Config
+from sphinx_graph.graphcheck import Diagnostic, DiagnosticsHandler
+from sphinx_graph.scan import ScannedVertex, scan_file
+from sphinx_graph.vertex.config import Config as VertexConfig
+from sphinx_graph.vertex.info import Info
+from sphinx_graph.vertex.state import (
+    check_cycles,
+    check_link,
+    missing_fingerprint,
+    missing_parent,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from sphinx_graph.vertex.config import ConfigKey
+    from sphinx_graph.vertex.fingerprint import FingerprintConfig
+
+logger = sphinx_logging.getLogger(__name__)
+
+__all__ = [
+    "check",
+    "main",
+]
+
+# extensions which add a Markdown parser
+MARKDOWN_EXTENSIONS = frozenset({"myst_parser", "myst_nb"})
+
+
+def load_config(confdir: Path) -> dict[str, Any]:
+    """Evaluate the *conf.py* in the given directory.
+
+    Returns:
+        the namespace of *conf.py*
+    """
+    return eval_config_file(confdir / "conf.py", Tags())
+
+
+def source_suffixes(namespace: dict[str, Any]) -> dict[str, str]:
+    """The suffixes of source files, and their file types."""
+    suffix = namespace.get("source_suffix", ".rst")
+    if isinstance(suffix, str):
+        suffixes = {suffix: "restructuredtext"}
+    elif isinstance(suffix, dict):
+        suffixes = dict(suffix)
+    else:
+        suffixes = dict.fromkeys(suffix, "restructuredtext")
+    if MARKDOWN_EXTENSIONS & set(namespace.get("extensions", [])):
+        suffixes.setdefault(".md", "markdown")
+    return suffixes
+
+
+def discover(
+    srcdir: Path, namespace: dict[str, Any], outdir: Path | None = None
+) -> Project:
+    """Find the documents in a project, in the same way as Sphinx.
+
+    As well as the configured exclusions (and those the project always adds, such as
+    ``**/_sources``), the asset paths of the HTML builder are excluded, and the output
+    directory if it's within the source directory, so build output is never scanned.
+    """
+    excluded = [
+        *namespace.get("exclude_patterns", []),
+        *namespace.get("templates_path", []),
+        *namespace.get("html_extra_path", []),
+        *namespace.get("html_static_path", []),
+    ]
+    if outdir is not None and outdir.is_relative_to(srcdir):
+        excluded.append(outdir.relative_to(srcdir).as_posix())
+    project = Project(srcdir, source_suffixes(namespace))
+    project.discover(excluded, namespace.get("include_patterns", ["**"]))
+    return project
+
+
+def scan_all(
+    documents: Sequence[tuple[str, Path]],
+    fingerprints: FingerprintConfig,
+    jobs: int,
+) -> list[ScannedVertex]:
+    """Scan every document for vertices, across a pool of worker processes.
+
+    Returns:
+        the vertices found, ordered by document, then position in the document.
+    """
+    scan = partial(scan_file, config=fingerprints)
+    if jobs <= 1 or len(documents) <= 1:
+        return list(chain.from_iterable(map(scan, documents)))
+    workers = min(jobs, len(documents))
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(
+            scan, documents, chunksize=max(1, len(documents) // (workers * 4))
+        )
+        return list(chain.from_iterable(results))
+
+
+def _vertex_config(
+    config: Config,
+    vertex: ScannedVertex,
+    resolved: dict[ConfigKey, VertexConfig],
+) -> VertexConfig:
+    """The configuration of a vertex, combined as for the vertex directive."""
+    key = (
+        vertex.type,
+        vertex.require_fingerprints,
+        vertex.require_parents,
+        vertex.layout,
+    )
+    vertex_config = resolved.get(key)
+    if vertex_config is None:
+        vertex_config = resolved[key] = config.vertex_config.override(
+            config.types[vertex.type] if vertex.type else VertexConfig()
+        ).override(
+            VertexConfig(
+                require_fingerprints=vertex.require_fingerprints,
+                require_parent=vertex.require_parents,
+                layout=vertex.layout,
+            )
+        )
+    return vertex_config
+
+
+def _collect(vertices: Iterable[ScannedVertex], config: Config) -> dict[str, Info]:
+    """Check each vertex on its own, and collect the valid ones."""
+    resolved: dict[ConfigKey, VertexConfig] = {}
+    infos: dict[str, Info] = {}
+    for vertex in vertices:
+        location = (vertex.docname, vertex.line)
+        if vertex.error is not None:
+            logger.error(vertex.error, location=location)
+            continue
+        if vertex.uid in infos:
+            logger.error(f"Vertex {vertex.uid} already exists.", location=location)
+            continue
+        if vertex.type and vertex.type not in config.types:
+            logger.error(f"unknown vertex type '{vertex.type}'", location=location)
+            continue
+        vertex_config = _vertex_config(config, vertex, resolved)
+        msg = vertex_config.violation(vertex.uid, vertex.parents)
+        if msg is not None:
+            logger.error(msg, location=location)
+        infos[vertex.uid] = Info(
+            docname=vertex.docname,
+            config=vertex_config,
+            parents=vertex.parents,
+            fingerprint=vertex.fingerprint or "",
+            tags=vertex.tags,
+            legacy_fingerprint=vertex.legacy_fingerprint,
+            type=vertex.type,
+        )
+    return infos
+
+
+def check(vertices: Sequence[ScannedVertex], config: Config) -> int:
+    """Check the graph of scanned vertices, logging any problems found.
+
+    Unlike a Sphinx build, every problem is reported, rather than stopping at the
+    first error.
+
+    Returns:
+        the number of links whose fingerprints couldn't be checked, because the
+        content of their parent contains markup.
+    """
+    infos = _collect(vertices, config)
+    unknown = {vertex.uid for vertex in vertices if vertex.fingerprint is None}
+    lines = {vertex.uid: vertex.line for vertex in reversed(vertices)}
+
+    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    node_ids = {uid: graph.add_node(uid) for uid in sorted(infos)}
+    unchecked = 0
+    for uid, info in infos.items():
+        location = (info.docname, lines[uid])
+        for parent_uid, fingerprint in info.parents.items():
+            parent = infos.get(parent_uid)
+            if parent is None:
+                logger.error(missing_parent(uid, parent_uid), location=location)
+                continue
+            graph.add_edge(node_ids[parent_uid], node_ids[uid], fingerprint)
+            if parent_uid not in unknown:
+                check_link(uid, info, parent_uid, parent, location=location)
+            elif info.config.require_fingerprints and fingerprint is None:
+                logger.warning(
+                    missing_fingerprint(uid, parent_uid, None), location=location
+                )
+            elif fingerprint:
+                unchecked += 1
+
+    check_cycles(
+        graph, limit=config.max_reported_cycles, members=config.report_cycle_members
+    )
+    return unchecked
+
+
+@contextmanager
+def collect() -> Iterator[DiagnosticsHandler]:
+    """Collect the problems logged by sphinx-graph, rather than printing them.
+
+    Any handlers left by a Sphinx application in the same process are detached
+    meanwhile, so that they don't also handle (and translate) the records.
+    """
+    handler = DiagnosticsHandler()
+    sphinx_logger = logging.getLogger(sphinx_logging.NAMESPACE)
+    handlers = sphinx_logger.handlers
+    sphinx_logger.handlers = [handler]
+    try:
+        yield handler
+    finally:
+        sphinx_logger.handlers = handlers
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m sphinx_graph", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    check_parser = commands.add_parser(
+        "check", help="scan the sources for vertices, and check the graph"
+    )
+    check_parser.add_argument(
+        "srcdir",
+        type=Path,
+        nargs="?",
+        default=Path(),
+        help="the source directory (default: the current directory)",
+    )
+    check_parser.add_argument(
+        "-c",
+        "--confdir",
+        type=Path,
+        help="the directory containing conf.py (default: the source directory)",
+    )
+    check_parser.add_argument(
+        "-o",
+        "--outdir",
+        type=Path,
+        help="the build output directory, which isn't scanned if it's within the"
+        " source directory",
+    )
+    check_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="the number of processes to scan with (default: the number of CPUs)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Check a project from the command line.
+
+    Returns:
+        the exit status: non-zero if any warnings or errors were reported.
+    """
+    args = parse_args(argv)
+    srcdir: Path = args.srcdir.resolve()
+    namespace = load_config((args.confdir or srcdir).resolve())
+    config: Config = namespace.get("graph_config", Config())
+    outdir: Path | None = args.outdir.resolve() if args.outdir else None
+    project = discover(srcdir, namespace, outdir)
+    documents = [
+        (docname, Path(project.doc2path(docname, absolute=True)))
+        for docname in sorted(project.docnames)
+    ]
+
+    with collect() as handler:
+        vertices = scan_all(documents, config.fingerprints, args.jobs)
+        unchecked = check(vertices, config)
+
+    doc2path = partial(project.doc2path, absolute=False)
+    diagnostics = [
+        Diagnostic.from_record(record, doc2path) for record in handler.records.values()
+    ]
+    for diagnostic in diagnostics:
+        location = ":".join(
+            str(part) for part in (diagnostic.path, diagnostic.line) if part is not None
+        )
+        prefix = f"{location}: " if location else ""
+        sys.stdout.write(f"{prefix}{diagnostic.level}: {diagnostic.message}\n")
+    summary = (
+        f"checked {len(vertices)} vertices in {len(documents)} documents:"
+        f" {len(diagnostics)} problems found"
+    )
+    if unchecked:
+        summary += f", {unchecked} link fingerprints not checked (content has markup)"
+    sys.stderr.write(f"{summary}\n")
+    return 1 if diagnostics else 0
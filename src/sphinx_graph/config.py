@@ -5,9 +5,14 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+from sphinx.errors import ConfigError
+
 from sphinx_graph.vertex import Config as VertexConfig
+from sphinx_graph.vertex import FingerprintConfig
+from sphinx_graph.vertex.plan import SELECT
 
 if TYPE_CHECKING:
+    from sphinx_graph.table.columns import Column
     from sphinx_graph.vertex.query import Query
 
 
@@ -85,8 +90,83 @@ class Config:
 
                 Due to a quirk in the way Sphinx handles *conf.py*, the query function
                 MUST be defined in a different file and imported into *conf.py*.
+        max_reported_cycles: The maximum number of dependency cycles to report.
+            One representative cycle is reported for each group of mutually
+            dependent vertices (strongly connected component). If ``None``, every
+            cycle is reported. If 0, only the number of cycles is reported.
+        report_cycle_members: Whether to list every vertex in each group of mutually
+            dependent vertices, in addition to the representative cycle.
+        fingerprints: How vertex fingerprints are computed.
+            This is an instance of :py:class:`sphinx_graph.FingerprintConfig`.
+        reachability_index: Whether to precompute the ancestors and descendants of
+            every vertex after the graph is built. This makes
+            `sphinx_graph.vertex.State.ancestors`, ``descendants`` and
+            ``is_ancestor`` much faster when they are called for many vertices, at
+            the cost of memory (quadratic in the number of vertices in the worst
+            case).
+        query_workers: If set, every vertex-table query is evaluated after the
+            documents are read and before any are written, rather than as each table
+            is written. Identical queries are only evaluated once. If greater than 1,
+            queries are evaluated concurrently by this many forked worker processes.
+            On platforms which can't fork, queries are evaluated serially. Must be at
+            least 1.
+        columns: Custom columns which may be shown in vertex tables, in addition to
+            the built-in columns. This is a mapping from column name to a function
+            which computes the contents of a cell from a
+            :py:class:`sphinx_graph.table.Cell` (typed as
+            `sphinx_graph.table.Column`). Like queries, columns MUST be defined in a
+            different file and imported into *conf.py*.
+        query_budget: If set, a warning is logged whenever evaluating the query of
+            a single vertex table takes longer than this many seconds. The slowest
+            queries are also summarised at the end of the build. Must be positive.
+        query_profiles: If set, every query is profiled with :py:mod:`cProfile`, and
+            the profile of each query over budget is written to this directory,
+            relative to the output directory. Requires ``query_budget``.
+        report: If set, a JSON report of the time spent (and work done) by
+            sphinx-graph during the build is written to this path, relative to the
+            output directory. A summary is always logged with ``-v``.
     """
 
     vertex_config: VertexConfig = field(default_factory=VertexConfig)
     types: dict[str, VertexConfig] = field(default_factory=dict)
     queries: dict[str, Query] = field(default_factory=dict)
+    max_reported_cycles: int | None = 10
+    report_cycle_members: bool = False
+    fingerprints: FingerprintConfig = field(default_factory=FingerprintConfig)
+    reachability_index: bool = False
+    query_workers: int | None = None
+    columns: dict[str, Column] = field(default_factory=dict)
+    query_budget: float | None = None
+    query_profiles: str | None = None
+    report: str | None = None
+
+    def __post_init__(self) -> None:
+        """Check that the configuration is valid.
+
+        Raises:
+            ConfigError: If a query is registered with a reserved name,
+                ``max_reported_cycles`` is negative, ``query_workers`` is less
+                than 1, ``query_budget`` isn't positive, or ``query_profiles`` is
+                set without ``query_budget``.
+        """
+        if self.max_reported_cycles is not None and self.max_reported_cycles < 0:
+            err_msg = (
+                "max_reported_cycles must not be negative, but was"
+                f" {self.max_reported_cycles}"
+            )
+            raise ConfigError(err_msg)
+        if self.query_workers is not None and self.query_workers < 1:
+            err_msg = f"query_workers must be at least 1, but was {self.query_workers}"
+            raise ConfigError(err_msg)
+        if self.query_budget is not None and self.query_budget <= 0:
+            err_msg = f"query_budget must be positive, but was {self.query_budget}"
+            raise ConfigError(err_msg)
+        if self.query_profiles is not None and self.query_budget is None:
+            err_msg = "query_profiles is set, but query_budget isn't"
+            raise ConfigError(err_msg)
+        if SELECT in self.queries:
+            err_msg = (
+                f"the query name '{SELECT}' is reserved for declarative queries, and"
+                " can't be registered"
+            )
+            raise ConfigError(err_msg)
@@ -0,0 +1,188 @@
+"""A builder which only checks the vertex graph, without writing any documents.
+
+``sphinx-build -b graphcheck`` reads the sources and finalises the graph as usual, so
+every check is run, but skips resolving and writing documents. Every warning and error
+reported by sphinx-graph is written to a JSON file in the output directory.
+
+The whole graph is checked on every build, even if only some documents were re-read.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from sphinx.builders import Builder
+from sphinx.util import logging as sphinx_logging
+
+from sphinx_graph.vertex.store import Store
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Set as AbstractSet
+
+    from docutils import nodes
+    from sphinx.application import Sphinx
+
+__all__ = [
+    "Diagnostic",
+    "GraphCheckBuilder",
+]
+
+# the file the diagnostics are written to, in the output directory
+DIAGNOSTICS = "diagnostics.json"
+
+# the version of the diagnostics file. This must be incremented whenever it changes.
+DIAGNOSTICS_VERSION = 1
+
+# the name of the logger of every module of this package
+LOGGER = f"{sphinx_logging.NAMESPACE}.{__package__}"
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A problem reported by sphinx-graph.
+
+    Args:
+        level: the log level, such as ``"warning"`` or ``"error"``
+        message: the message logged
+        path: the source file the problem was found in, if known
+        line: the line the problem was found on, if known
+        source: the module which reported the problem
+    """
+
+    level: str
+    message: str
+    path: str | None
+    line: int | None
+    source: str
+
+    @classmethod
+    def from_record(
+        cls, record: logging.LogRecord, doc2path: Callable[[str], object]
+    ) -> Diagnostic:
+        """Create a diagnostic from a log record.
+
+        ``doc2path`` finds the source file of a document, for locations given as a
+        ``(docname, line)`` pair.
+
+        Sphinx's own handlers may have already turned the record into a Sphinx log
+        record, whose message is prefixed with its level. The plain message is used.
+        """
+        path, line = _location(doc2path, getattr(record, "location", None))
+        return cls(
+            level=record.levelname.lower(),
+            message=logging.LogRecord.getMessage(record),
+            path=path,
+            line=line,
+            source=record.name.removeprefix(f"{LOGGER}."),
+        )
+
+
+def _location(
+    doc2path: Callable[[str], object],
+    location: Any,  # noqa: ANN401
+) -> tuple[str | None, int | None]:
+    """The source file and line of a log record's location.
+
+    Sphinx's own handlers may have already formatted the location as ``path:line``.
+    """
+    if isinstance(location, tuple):
+        docname, line = location
+        return str(doc2path(docname)) if docname else None, line
+    if isinstance(location, str) and location:
+        path, _, line = location.rpartition(":")
+        if path and line.isdigit():
+            return path, int(line)
+        return location, None
+    return None, None
+
+
+class DiagnosticsHandler(logging.Handler):
+    """Collects the warnings and errors reported by sphinx-graph.
+
+    Records from parallel read workers are handled by the main process, so this sees
+    them too. Warnings deferred until the end of the read are handled twice, so each
+    record is only collected once.
+    """
+
+    def __init__(self) -> None:
+        """Create a new handler, with no records."""
+        super().__init__(logging.WARNING)
+        self.records: dict[int, logging.LogRecord] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Collect a record, if it came from sphinx-graph."""
+        if record.name == LOGGER or record.name.startswith(f"{LOGGER}."):
+            self.records.setdefault(id(record), record)
+
+
+class GraphCheckBuilder(Builder):
+    """Checks the vertex graph, and writes any problems found to a JSON file."""
+
+    name = "graphcheck"
+    epilog = "The graph diagnostics are in %(outdir)s."
+
+    allow_parallel = True
+
+    def init(self) -> None:
+        """Start collecting diagnostics, and check every vertex on this build."""
+        self.handler = DiagnosticsHandler()
+        logging.getLogger(sphinx_logging.NAMESPACE).addHandler(self.handler)
+        store = Store.read(self.env)
+        store.dirty.update(store.vertices)
+
+    def get_outdated_docs(self) -> str:  # noqa: PLR6301
+        """Every document is checked, as part of the graph."""
+        return "all documents"
+
+    def get_target_uri(self, _docname: str, _typ: str | None = None) -> str:  # noqa: PLR6301
+        """No documents are written, so no document has a URI."""
+        return ""
+
+    def prepare_writing(self, _docnames: AbstractSet[str]) -> None:
+        """Nothing needs to be prepared, as no documents are written."""
+
+    def write_documents(self, _docnames: AbstractSet[str]) -> None:
+        """Skip the write phase, without loading or resolving any doctrees."""
+
+    def write_doc(self, _docname: str, _doctree: nodes.document) -> None:
+        """No documents are written."""
+
+    def diagnostics(self) -> list[Diagnostic]:
+        """The diagnostics collected so far."""
+        return [
+            Diagnostic.from_record(record, self.env.doc2path)
+            for record in self.handler.records.values()
+        ]
+
+
+def write_diagnostics(app: Sphinx, exception: Exception | None) -> None:
+    """Write the diagnostics file at the end of a graph check.
+
+    The file is written even if the build failed, so that errors are recorded too.
+    """
+    builder = app.builder
+    if not isinstance(builder, GraphCheckBuilder):
+        return
+    logging.getLogger(sphinx_logging.NAMESPACE).removeHandler(builder.handler)
+    diagnostics = builder.diagnostics()
+    store = Store.read(app.env)
+    report = {
+        "version": DIAGNOSTICS_VERSION,
+        "passed": exception is None and not diagnostics,
+        "vertices": len(store.vertices),
+        "documents": len(store.docnames),
+        "exception": None if exception is None else str(exception),
+        "diagnostics": [asdict(diagnostic) for diagnostic in diagnostics],
+    }
+    app.outdir.mkdir(parents=True, exist_ok=True)
+    (app.outdir / DIAGNOSTICS).write_text(json.dumps(report, indent=2) + "\n")
+
+
+def register(app: Sphinx) -> None:
+    """Register the graphcheck builder."""
+    app.add_builder(GraphCheckBuilder)
+    app.connect("build-finished", write_diagnostics)
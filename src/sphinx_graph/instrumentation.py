@@ -0,0 +1,200 @@
+"""Timers and counters for the work done by the extension during a build.
+
+The timings show how much of a build is spent in sphinx-graph (rather than in Sphinx
+itself). They are logged at the end of the build (with ``-v``), and optionally written
+to a JSON report in the output directory.
+
+Work done in worker processes is included for parallel reads and the query workers,
+but not for parallel writes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from sphinx.util import logging
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    from sphinx_graph.config import Config
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Instrumentation",
+    "Timer",
+]
+
+# the version of the JSON report. This must be incremented whenever it changes.
+REPORT_VERSION = 1
+
+
+@dataclass
+class Timer:
+    """The total time spent on one kind of work.
+
+    Args:
+        calls: the number of times the work was done
+        seconds: the total time taken, in seconds
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Instrumentation:
+    """Timers and counters for the current build.
+
+    The instrumentation is stored on the environment, so that the work done by worker
+    processes during a parallel read is sent back to the main process with the rest
+    of the environment. Otherwise, it is only needed until the end of the build, so
+    its timers and counters aren't pickled.
+
+    Args:
+        timers: a mapping from timer name to the time spent
+        counters: a mapping from counter name to its value
+        worker: whether this records the work of a worker process in a parallel read.
+            Only then are the timers and counters pickled.
+    """
+
+    def __init__(self, *, worker: bool = False) -> None:
+        """Create a new set of timers and counters, all zero."""
+        self.timers: dict[str, Timer] = {}
+        self.counters: dict[str, int] = {}
+        self.worker = worker
+        self._pid = os.getpid()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Serialise the timers and counters of a worker process, and nothing else."""
+        if not self.worker:
+            return {"timers": {}, "counters": {}}
+        return {"timers": self.timers, "counters": self.counters}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the timers and counters, in the current process."""
+        self.timers = state["timers"]
+        self.counters = state["counters"]
+        self.worker = False
+        self._pid = os.getpid()
+
+    @classmethod
+    def read(cls, env: BuildEnvironment) -> Instrumentation:
+        """Get the instrumentation for the given environment, creating it if necessary.
+
+        Each worker process in a parallel read (which inherits the instrumentation of
+        the main process) starts from zero, so that its work can be merged into the
+        main process without counting anything twice.
+        """
+        instrumentation: Instrumentation | None = getattr(
+            env, "graph_instrumentation", None
+        )
+        if instrumentation is None or instrumentation._pid != os.getpid():  # noqa: SLF001
+            instrumentation = Instrumentation(worker=instrumentation is not None)
+            env.graph_instrumentation = instrumentation  # type: ignore[attr-defined]
+        return instrumentation
+
+    def _timer(self, name: str) -> Timer:
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Timer()
+        return timer
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Time a block of code, adding to the named timer."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            timer = self._timer(name)
+            timer.calls += 1
+            timer.seconds += perf_counter() - start
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one call, which took the given time, to the named timer."""
+        timer = self._timer(name)
+        timer.calls += 1
+        timer.seconds += seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to the named counter."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: Instrumentation) -> None:
+        """Add the timers and counters from another process.
+
+        A worker which didn't record anything sends back the instrumentation it
+        inherited from this process, which is pickled without any timers or counters.
+        """
+        for name, timer in other.timers.items():
+            total = self._timer(name)
+            total.calls += timer.calls
+            total.seconds += timer.seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def report(self) -> dict[str, Any]:
+        """A JSON-serialisable report of every timer and counter."""
+        return {
+            "version": REPORT_VERSION,
+            "timers": {
+                name: {"calls": timer.calls, "seconds": timer.seconds}
+                for name, timer in sorted(self.timers.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def reset(app: Sphinx) -> None:
+    """Start each build with every timer and counter at zero."""
+    app.env.graph_instrumentation = Instrumentation()  # type: ignore[attr-defined]
+
+
+def merge(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    _docnames: list[str],
+    other: BuildEnvironment,
+) -> None:
+    """Merge the work done by a worker process during a parallel read."""
+    worker: Instrumentation | None = getattr(other, "graph_instrumentation", None)
+    if worker is not None:
+        Instrumentation.read(env).merge(worker)
+
+
+def report(app: Sphinx, exception: Exception | None) -> None:
+    """Log a summary of the build, and write the JSON report if configured."""
+    instrumentation = Instrumentation.read(app.env)
+    timers = sorted(
+        instrumentation.timers.items(), key=lambda item: item[1].seconds, reverse=True
+    )
+    for name, timer in timers:
+        logger.verbose(
+            "sphinx-graph: %s took %.3fs (%d calls)", name, timer.seconds, timer.calls
+        )
+    for name, value in sorted(instrumentation.counters.items()):
+        logger.verbose("sphinx-graph: %s = %d", name, value)
+
+    config: Config = app.config.graph_config
+    if config.report is None or exception is not None:
+        return
+    path = app.outdir / config.report
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(instrumentation.report(), indent=2) + "\n")
+
+
+def register(app: Sphinx) -> None:
+    """Register the instrumentation lifecycle events."""
+    app.connect("builder-inited", reset)
+    app.connect("env-merge-info", merge)
+    # after the other handlers have recorded their counters
+    app.connect("build-finished", report, priority=900)
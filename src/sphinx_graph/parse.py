@@ -55,3 +55,24 @@ def string(value: str | None) -> str | None:
     Returns None if the input is None or an empty string
     """
     return value or None
+
+
+def non_negative_integer(value: str | None) -> int:
+    """Parse an integer which is zero or greater."""
+    try:
+        number = int(value or "")
+    except ValueError:
+        number = -1
+    if number < 0:
+        err_msg = f"invalid non-negative integer: {value}"
+        raise ConfigError(err_msg)
+    return number
+
+
+def positive_integer(value: str | None) -> int:
+    """Parse an integer which is greater than zero."""
+    number = non_negative_integer(value)
+    if number == 0:
+        err_msg = f"invalid positive integer: {value}"
+        raise ConfigError(err_msg)
+    return number
@@ -0,0 +1,339 @@
+"""A lightweight scanner for vertex directives, which doesn't parse documents.
+
+The scanner finds ``vertex`` directives in reStructuredText and MyST Markdown sources
+line by line, reading their UID, options and raw content. It is much faster than
+parsing each document with docutils, but only understands the directive itself:
+vertices generated by other directives, or included from other files, aren't found.
+
+With ``ignore_markup`` (the default), the fingerprint of a vertex is computed from its
+rendered text. The scanner can only reproduce that for content without any markup,
+so the fingerprints of other vertices are unknown.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from sphinx.errors import ConfigError
+
+from sphinx_graph import parse
+from sphinx_graph.vertex.fingerprint import LEGACY, FingerprintConfig, digest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+__all__ = [
+    "ScannedVertex",
+    "scan",
+    "scan_file",
+]
+
+# the tab width used by docutils
+TAB_WIDTH = 8
+
+RST_DIRECTIVE = re.compile(r"^(?P<indent> *)\.\.\s+vertex::(?:\s+(?P<uid>\S+))?\s*$")
+# other reStructuredText blocks which contain literal text, rather than markup
+RST_LITERAL = re.compile(
+    r"^(?P<indent> *)(?:\.\.\s+(?:code|code-block|sourcecode)::.*|(?!\.\.\s).*::)$"
+)
+MYST_FENCE = re.compile(r"^(?P<indent> *)(?P<fence>`{3,}|~{3,}|:{3,})\s*(?P<info>.*)$")
+MYST_DIRECTIVE = re.compile(r"^\{vertex\}(?:\s+(?P<uid>\S+))?\s*$")
+# other MyST directives which contain literal text, rather than markup
+MYST_CODE_DIRECTIVE = re.compile(r"^\{(?:code|code-block|code-cell|sourcecode)\}")
+OPTION = re.compile(r"^:(?P<name>[\w-]+):(?:\s+(?P<value>.*))?$")
+
+# the options of the vertex directive
+OPTIONS = frozenset({
+    "parents",
+    "layout",
+    "require_fingerprints",
+    "type",
+    "tags",
+    "require_parents",
+})
+
+# content which the renderer would change: inline markup, escapes and references, or
+# lines which start a block other than a paragraph (lists, titles, directives, etc.)
+MARKUP = re.compile(
+    r"[*`|\\<>\[\]{}#]"
+    r"|\w_(?!\w)|_`"
+    r"|^ "
+    r"|^(?:[-+•=~^\"'.:>]|\d+[.)]|\w[.)]\s)"
+    r"|::$",
+    re.MULTILINE,
+)
+
+
+@dataclass(slots=True)
+class ScannedVertex:
+    """A vertex directive found by the scanner.
+
+    Args:
+        uid: the UID of the vertex
+        docname: the name of the document the vertex is in
+        path: the path of the source file
+        line: the line number of the directive
+        parents: a mapping from parent UID to link fingerprint, if any
+        tags: the tags of the vertex
+        type: the type of the vertex, if any
+        require_fingerprints: the ``require_fingerprints`` option, if set
+        require_parents: the ``require_parents`` option, if set
+        layout: the ``layout`` option, if set
+        fingerprint: the fingerprint of the vertex, if it can be computed without
+            rendering its content
+        legacy_fingerprint: the legacy fingerprint of the vertex, if legacy
+            fingerprints are accepted and it can be computed
+        error: a description of why the directive is invalid, if it is
+    """
+
+    uid: str
+    docname: str
+    path: str
+    line: int
+    parents: dict[str, str | None] = field(default_factory=dict)
+    tags: list[str] = field(default_factory=list)
+    type: str | None = None
+    require_fingerprints: bool | None = None
+    require_parents: bool | None = None
+    layout: str | None = None
+    fingerprint: str | None = None
+    legacy_fingerprint: str | None = None
+    error: str | None = None
+
+    @property
+    def location(self) -> str:
+        """The location of the directive, as ``path:line``."""
+        return f"{self.path}:{self.line}"
+
+
+@dataclass(slots=True)
+class _Directive:
+    """The raw text of a directive, before its options are parsed."""
+
+    uid: str
+    line: int
+    options: list[tuple[str, str]]
+    content: list[str]
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _dedent(lines: list[str]) -> list[str]:
+    """Remove the common indentation of some lines, and any blank lines around them."""
+    while lines and not lines[0]:
+        lines = lines[1:]
+    while lines and not lines[-1]:
+        lines = lines[:-1]
+    indent = min((_indent(line) for line in lines if line), default=0)
+    return [line[indent:] for line in lines]
+
+
+def _options(lines: list[str]) -> tuple[list[tuple[str, str]], list[str]]:
+    """Split the options of a directive from its content.
+
+    Option values may continue on following (indented) lines.
+    """
+    options: list[tuple[str, str]] = []
+    for index, line in enumerate(lines):
+        match = OPTION.match(line)
+        if match:
+            options.append((match["name"], match["value"] or ""))
+        elif line and options and line[0] == " ":
+            name, value = options[-1]
+            options[-1] = (name, f"{value}\n{line.strip()}")
+        else:
+            return options, lines[index:]
+    return options, []
+
+
+def _rst(lines: Sequence[str]) -> Iterator[_Directive]:
+    """Find the vertex directives in reStructuredText source."""
+    literal: int | None = None
+    for index, line in enumerate(lines):
+        if literal is not None:
+            if not line or _indent(line) > literal:
+                continue
+            literal = None
+        if "::" not in line:
+            continue
+        match = RST_DIRECTIVE.match(line)
+        if match is None:
+            literal_match = RST_LITERAL.match(line)
+            if literal_match:
+                literal = len(literal_match["indent"])
+            continue
+        indent = len(match["indent"])
+        end = index + 1
+        while end < len(lines) and (not lines[end] or _indent(lines[end]) > indent):
+            end += 1
+        options, content = _options(_dedent(list(lines[index + 1 : end])))
+        # nested directives are found by scanning the content too
+        yield _Directive(match["uid"] or "", index + 1, options, _dedent(content))
+
+
+def _myst(lines: Sequence[str]) -> Iterator[_Directive]:
+    """Find the vertex directives in MyST Markdown source."""
+    # the fences of the open directives, whose content is scanned too
+    fences: list[str] = []
+    # the fence of the open code block, whose content isn't scanned
+    code: str | None = None
+    for index, line in enumerate(lines):
+        match = MYST_FENCE.match(line)
+        if match is None:
+            continue
+        if code is not None:
+            if _closes(match, code):
+                code = None
+            continue
+        if fences and _closes(match, fences[-1]):
+            fences.pop()
+            continue
+        fence, info = match["fence"], match["info"]
+        directive = MYST_DIRECTIVE.match(info)
+        if directive:
+            fences.append(fence)
+            yield _myst_directive(lines, index, fence, directive["uid"] or "")
+        elif fence[0] == ":" or (
+            info.startswith("{") and not MYST_CODE_DIRECTIVE.match(info)
+        ):
+            fences.append(fence)
+        else:
+            code = fence
+
+
+def _closes(match: re.Match[str], fence: str) -> bool:
+    """Whether a fence closes the block opened by another fence."""
+    return (
+        not match["info"]
+        and match["fence"][0] == fence[0]
+        and len(match["fence"]) >= len(fence)
+    )
+
+
+def _myst_directive(
+    lines: Sequence[str], start: int, fence: str, uid: str
+) -> _Directive:
+    """Read the options and content of a MyST directive."""
+    end = start + 1
+    depth = 0
+    while end < len(lines):
+        match = MYST_FENCE.match(lines[end])
+        if match and match["fence"][0] == fence[0]:
+            if match["info"]:
+                depth += 1
+            elif depth:
+                depth -= 1
+            elif len(match["fence"]) >= len(fence):
+                break
+        end += 1
+    body = list(lines[start + 1 : end])
+    if body and body[0].strip() == "---":
+        close = next(
+            (i for i, line in enumerate(body[1:], 1) if line.strip() == "---"),
+            len(body),
+        )
+        options = [
+            (name.strip(), value.strip())
+            for name, _, value in (line.partition(":") for line in body[1:close])
+            if name.strip()
+        ]
+        return _Directive(uid, start + 1, options, _dedent(body[close + 1 :]))
+    options, content = _options(body)
+    return _Directive(uid, start + 1, options, _dedent(content))
+
+
+def _rendered(content: list[str]) -> str | None:
+    """The rendered text of some content, if it doesn't contain any markup.
+
+    Each paragraph is rendered as its lines, and paragraphs are separated by a single
+    blank line.
+    """
+    source = "\n".join(content)
+    if MARKUP.search(source):
+        return None
+    return "\n\n".join(
+        paragraph.strip("\n") for paragraph in re.split(r"\n\s*\n", source)
+    )
+
+
+def _vertex(
+    directive: _Directive,
+    docname: str,
+    path: str,
+    config: FingerprintConfig,
+) -> ScannedVertex:
+    """Parse the options of a directive, and compute its fingerprints."""
+    vertex = ScannedVertex(sys.intern(directive.uid), docname, path, directive.line)
+    if not directive.uid:
+        vertex.error = "vertex directive is missing its UID"
+        return vertex
+    options = {name: value or None for name, value in directive.options}
+    unknown = sorted(set(options) - OPTIONS)
+    if unknown:
+        vertex.error = f'unknown option: "{unknown[0]}"'
+        return vertex
+    try:
+        vertex.parents = parse.parents(options.get("parents"))
+        vertex.tags = parse.comma_separated_list(options.get("tags"))
+        vertex.type = parse.string(options.get("type"))
+        vertex.layout = parse.string(options.get("layout"))
+        if "require_fingerprints" in options:
+            vertex.require_fingerprints = parse.boolean(options["require_fingerprints"])
+        if "require_parents" in options:
+            vertex.require_parents = parse.boolean(options["require_parents"])
+    except ConfigError as e:
+        vertex.error = f"invalid option: {e}"
+        return vertex
+
+    text = _rendered(directive.content) if config.ignore_markup else None
+    if not config.ignore_markup:
+        vertex.fingerprint = digest("\n".join(directive.content), config)
+    elif text is not None:
+        vertex.fingerprint = digest(text, config)
+    if text is not None and config.accept_legacy and not config.is_legacy():
+        vertex.legacy_fingerprint = digest(text, LEGACY)
+    return vertex
+
+
+def scan(
+    source: str,
+    docname: str,
+    path: str,
+    config: FingerprintConfig,
+) -> list[ScannedVertex]:
+    """Find the vertex directives in some source text.
+
+    Args:
+        source: the source text
+        docname: the name of the document
+        path: the path of the source file, used in messages. A ``.md`` suffix
+            selects the MyST Markdown scanner.
+        config: the fingerprint configuration
+
+    Returns:
+        the vertices found, in order of appearance.
+    """
+    lines = [line.expandtabs(TAB_WIDTH).rstrip() for line in source.splitlines()]
+    directives = _myst(lines) if path.endswith(".md") else _rst(lines)
+    return [_vertex(directive, docname, path, config) for directive in directives]
+
+
+def scan_file(
+    document: tuple[str, Path], config: FingerprintConfig
+) -> list[ScannedVertex]:
+    """Find the vertex directives in a source file.
+
+    Args:
+        document: the name of the document, and the path of its source file
+        config: the fingerprint configuration
+    """
+    docname, path = document
+    if "vertex" not in (source := path.read_text(encoding="utf-8")):
+        return []
+    return scan(source, docname, str(path), config)
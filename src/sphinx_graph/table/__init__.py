@@ -1,11 +1,14 @@
 """Types and methods specific to the vertex-table directive."""
 
+from .columns import Cell, Column
 from .directive import Directive
 from .info import Info
 from .node import TableNode
 from .registration import register
 
 __all__ = [
+    "Cell",
+    "Column",
     "Directive",
     "Info",
     "TableNode",
@@ -0,0 +1,222 @@
+"""Timing the query of each vertex table, and diagnosing slow queries."""
+
+from __future__ import annotations
+
+import marshal
+from cProfile import Profile
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from sphinx.util import logging
+
+from sphinx_graph.instrumentation import Instrumentation, Timer
+from sphinx_graph.table.pages import slug
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from sphinx.application import Sphinx
+    from sphinx.builders import Builder
+
+    from sphinx_graph import vertex
+    from sphinx_graph.config import Config
+    from sphinx_graph.table.info import Info
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Measurement",
+    "evaluate",
+    "record",
+    "report_slow_queries",
+    "reset_slowest",
+]
+
+# the prefix of the per-table timers
+TABLE_TIMER = "table."
+
+# the number of queries in the 'slowest queries' summary
+SLOWEST = 5
+
+
+def location(info: Info) -> str:
+    """A short description of where a table is, for messages and timer names."""
+    return info.docname if info.line is None else f"{info.docname}:{info.line}"
+
+
+def slowest(builder: Builder) -> dict[str, float]:
+    """The time taken by the slowest evaluation of each table in this build.
+
+    A table's query can be evaluated more than once in a build (for example, if the
+    table is split into pages), so each table is only timed (and warned about) by its
+    slowest evaluation. The times are stored on the builder, so they are never pickled
+    with the environment.
+    """
+    tables: dict[str, float] | None = getattr(builder, "graph_slowest_tables", None)
+    if tables is None:
+        tables = builder.graph_slowest_tables = {}  # type: ignore[attr-defined]
+    return tables
+
+
+def reset_slowest(app: Sphinx) -> None:
+    """Forget the tables timed by any previous build."""
+    app.builder.graph_slowest_tables = {}  # type: ignore[attr-defined]
+
+
+def profiled(config: Config) -> bool:
+    """Whether slow queries are profiled."""
+    return config.query_budget is not None and config.query_profiles is not None
+
+
+# the statistics collected by a profiler, as written to a profile file
+Stats = dict[Any, Any]
+
+
+class Measurement:
+    """The time taken by one evaluation of a query, and optionally its profile.
+
+    Measurements are made wherever the query is run (which may be a worker process),
+    and recorded in the main process.
+
+    Args:
+        elapsed: the time spent producing rows, in seconds
+    """
+
+    def __init__(self, *, profile: bool) -> None:
+        """Start a new measurement, with a profiler if the query is profiled."""
+        self.elapsed = 0.0
+        self._profiler = Profile() if profile else None
+
+    def run(
+        self, query: Callable[[vertex.State], Iterable[str]], state: vertex.State
+    ) -> Iterator[str]:
+        """Run a query, timing (and profiling) it while it produces rows.
+
+        Only the time spent producing rows is counted, so a query which is consumed
+        lazily (for a table with a limit, or pages) is timed until the last row shown.
+        """
+        iterator: Iterator[str] | None = None
+        while True:
+            start = perf_counter()
+            profiler = self._enable()
+            try:
+                if iterator is None:
+                    iterator = iter(query(state))
+                row = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                self.elapsed += perf_counter() - start
+            yield row
+
+    def _enable(self) -> Profile | None:
+        """Start (or resume) profiling the query.
+
+        Only one profiler can be active at a time (for example, if the build itself is
+        being profiled). If so, the query isn't profiled.
+        """
+        if self._profiler is None:
+            return None
+        try:
+            self._profiler.enable()
+        except ValueError:
+            self._profiler = None
+        return self._profiler
+
+    def stats(self) -> Stats | None:
+        """The statistics collected by the profiler, if the query was profiled."""
+        if self._profiler is None:
+            return None
+        self._profiler.create_stats()
+        stats: Stats = self._profiler.stats
+        return stats
+
+
+def evaluate(
+    app: Sphinx,
+    info: Info,
+    name: str,
+    query: Callable[[vertex.State], Iterable[str]],
+    state: vertex.State,
+) -> Iterator[str]:
+    """Run the query of a table, timing how long it takes to produce its results.
+
+    Once the query is exhausted (or abandoned), its time is checked against the
+    budget.
+    """
+    measurement = Measurement(profile=profiled(app.config.graph_config))
+    try:
+        yield from measurement.run(query, state)
+    finally:
+        record(app, info, name, measurement.elapsed, measurement.stats())
+
+
+def record(
+    app: Sphinx,
+    info: Info,
+    name: str,
+    elapsed: float,
+    stats: Stats | None,
+) -> None:
+    """Record the time taken by a query, and warn if it was over budget.
+
+    Every evaluation counts towards the timer of the query, but only the slowest
+    evaluation of each table counts towards the timer of the table. Each table is
+    warned about (and profiled) at most once per build.
+    """
+    instrumentation = Instrumentation.read(app.env)
+    instrumentation.record(f"query.{name}", elapsed)
+
+    table = location(info)
+    tables = slowest(app.builder)
+    previous = tables.get(table)
+    if previous is not None and elapsed <= previous:
+        return
+    tables[table] = elapsed
+    instrumentation.timers[f"{TABLE_TIMER}{table}"] = Timer(calls=1, seconds=elapsed)
+
+    config: Config = app.config.graph_config
+    budget = config.query_budget
+    if budget is None or elapsed <= budget:
+        return
+    if previous is not None and previous > budget:
+        # already warned about
+        return
+    message = (
+        f"vertex-table query '{name}' took {elapsed:.2f}s, over the budget of {budget}s"
+    )
+    if stats is not None and config.query_profiles is not None:
+        directory = app.outdir / config.query_profiles
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{slug(table)}.prof"
+        # the same format as cProfile.Profile.dump_stats
+        with path.open("wb") as file:
+            marshal.dump(stats, file)
+        message += f". profile written to {path}"
+    logger.warning(message, location=(info.docname, info.line))
+
+
+def report_slow_queries(app: Sphinx, _exception: Exception | None) -> None:
+    """Summarise the slowest vertex-table queries of the build.
+
+    The summary is logged if a query budget is set, and otherwise only with ``-v``.
+    Queries evaluated by parallel write workers aren't included.
+    """
+    timers = Instrumentation.read(app.env).timers
+    tables = sorted(
+        (
+            (timer.seconds, name.removeprefix(TABLE_TIMER))
+            for name, timer in timers.items()
+            if name.startswith(TABLE_TIMER)
+        ),
+        reverse=True,
+    )[:SLOWEST]
+    if not tables:
+        return
+    config: Config = app.config.graph_config
+    log = logger.verbose if config.query_budget is None else logger.info
+    log("slowest vertex-table queries:")
+    for seconds, table in tables:
+        log("  %8.3fs  %s", seconds, table)
@@ -0,0 +1,138 @@
+"""Columns which may be shown in a vertex table."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from docutils import nodes
+from sphinx.errors import ConfigError
+
+from sphinx_graph.formatting import comma_separated_list
+from sphinx_graph.vertex.events import relative_uris, vertex_reference
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from sphinx.builders import Builder
+
+    from sphinx_graph import vertex
+
+__all__ = [
+    "Cell",
+    "Column",
+]
+
+
+@dataclass(frozen=True)
+class Cell:
+    """The information available when rendering a cell of a vertex table.
+
+    Args:
+        builder: the sphinx builder
+        docname: the name of the document (or generated page) containing the table.
+            Links must be relative to this document.
+        state: the vertex state
+        uid: the UID of the vertex in this row
+    """
+
+    builder: Builder
+    docname: str
+    state: vertex.State
+    uid: str
+
+    @property
+    def info(self) -> vertex.Info:
+        """The vertex in this row."""
+        return self.state.vertices[self.uid]
+
+    def references(self, uids: Iterable[str]) -> nodes.paragraph:
+        """A comma-separated list of links to the given vertices."""
+        paragraph = nodes.paragraph()
+        paragraph.extend(
+            comma_separated_list(
+                relative_uris(self.builder, self.docname, self.state.vertices, uids)
+            )
+        )
+        return paragraph
+
+
+# A 'column' computes the contents of one cell of a vertex table. Returned strings
+# are displayed as plain text.
+Column = Callable[[Cell], "nodes.Node | str"]
+
+
+def uid(cell: Cell) -> nodes.Node:
+    """A link to the vertex."""
+    paragraph = nodes.paragraph()
+    paragraph += vertex_reference(
+        cell.builder, cell.docname, cell.state.vertices, cell.uid
+    )
+    return paragraph
+
+
+def tags(cell: Cell) -> str:
+    """The tags of the vertex."""
+    return ", ".join(cell.info.tags)
+
+
+def vertex_type(cell: Cell) -> str:
+    """The type of the vertex."""
+    return cell.info.type or ""
+
+
+def docname(cell: Cell) -> str:
+    """The document containing the vertex."""
+    return cell.info.docname
+
+
+def parents(cell: Cell) -> nodes.Node:
+    """Links to the parents of the vertex."""
+    return cell.references(cell.info.parents.keys())
+
+
+def children(cell: Cell) -> nodes.Node:
+    """Links to the children of the vertex."""
+    return cell.references(cell.state.children(cell.uid))
+
+
+COLUMNS: dict[str, Column] = {
+    "uid": uid,
+    "tags": tags,
+    "type": vertex_type,
+    "docname": docname,
+    "parents": parents,
+    "children": children,
+}
+
+DEFAULT_COLUMNS = ("uid", "tags", "parents", "children")
+
+
+def render(column: Column, cell: Cell) -> nodes.Node:
+    """Render a cell of a vertex table."""
+    content = column(cell)
+    if isinstance(content, str):
+        return nodes.paragraph(text=content)
+    return content
+
+
+def resolve(names: Sequence[str], custom: Mapping[str, Column]) -> dict[str, Column]:
+    """Find the columns to show in a vertex table, in order.
+
+    Args:
+        names: the names of the columns. If empty, the default columns are used.
+        custom: the columns registered in the configuration, which take precedence
+            over the built-in columns
+
+    Raises:
+        ConfigError: If a column isn't registered.
+    """
+    available = {**COLUMNS, **custom}
+    columns = {}
+    for name in names or DEFAULT_COLUMNS:
+        if name not in available:
+            msg = f"no column registered with name '{name}'"
+            raise ConfigError(msg)
+        columns[name] = available[name]
+    return columns
@@ -2,17 +2,19 @@
 
 from __future__ import annotations
 
-import uuid
 from typing import TYPE_CHECKING, ClassVar
 
 import toml
+from sphinx.errors import ConfigError
 from sphinx.util import logging
 from sphinx.util.docutils import SphinxDirective
 
 from sphinx_graph import parse
+from sphinx_graph.table.columns import resolve
 from sphinx_graph.table.info import Info
 from sphinx_graph.table.node import TableNode
 from sphinx_graph.table.state import State
+from sphinx_graph.vertex.plan import SELECT, Plan
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -20,6 +22,8 @@ if TYPE_CHECKING:
     from docutils import nodes
     from sphinx.util.typing import OptionSpec
 
+    from sphinx_graph.config import Config
+
 logger = logging.getLogger(__name__)
 
 __all__ = [
@@ -34,23 +38,63 @@ class Directive(SphinxDirective):
     required_arguments = 0
     option_spec: ClassVar[OptionSpec] = {
         "query": parse.string,
+        "name": parse.string,
+        "limit": parse.positive_integer,
+        "offset": parse.non_negative_integer,
+        "page-size": parse.positive_integer,
+        "columns": parse.comma_separated_list,
     }
 
     def run(self) -> Sequence[nodes.Node]:
         """Run the directive and return a Vertex node."""
-        uid = uuid.uuid4()
+        uid = self.table_id()
         node = TableNode(graph_uid=uid)
+        query = self.options.get("query")
+        args = toml.loads("\n".join(self.content))
+
+        plan = None
+        if query == SELECT:
+            try:
+                plan = Plan.compile(args)
+            except ConfigError as e:
+                msg = f"invalid select query in vertex-table '{uid}': {e}"
+                logger.exception(msg, location=(self.env.docname, self.lineno))
+                raise ConfigError(msg) from e
 
-        toml.loads("\n".join(self.content))
+        config: Config = self.config.graph_config
+        try:
+            resolve(self.options.get("columns", []), config.columns)
+        except ConfigError as e:
+            msg = f"invalid columns in vertex-table '{uid}': {e}"
+            logger.exception(msg, location=(self.env.docname, self.lineno))
+            raise ConfigError(msg) from e
 
         with State.get(self.env) as state:
             state.insert(
                 uid,
                 Info(
                     docname=self.env.docname,
-                    query=self.options.get("query"),
-                    args=toml.loads("\n".join(self.content)),
+                    query=query,
+                    args=args,
+                    plan=plan,
+                    limit=self.options.get("limit"),
+                    offset=self.options.get("offset", 0),
+                    page_size=self.options.get("page-size"),
+                    columns=self.options.get("columns", []),
+                    line=self.lineno,
                 ),
             )
 
         return [node]
+
+    def table_id(self) -> str:
+        """A stable identifier for this table.
+
+        The identifier is derived from the docname, and either the explicit ``:name:``
+        option or the position of the directive in the source. It is the same every
+        time an unchanged document is read.
+        """
+        name = self.options.get("name")
+        if name:
+            return f"{self.env.docname}#{name}"
+        return f"{self.env.docname}:{self.lineno}"
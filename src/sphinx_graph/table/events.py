@@ -2,77 +2,252 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from docutils import nodes
 from sphinx.errors import ConfigError
 
 from sphinx_graph import vertex
-from sphinx_graph.formatting import comma_separated_list
+from sphinx_graph.instrumentation import Instrumentation
+from sphinx_graph.table.budget import evaluate, report_slow_queries, reset_slowest
+from sphinx_graph.table.columns import Cell, render, resolve
 from sphinx_graph.table.node import TableNode
+from sphinx_graph.table.pages import (
+    is_paged,
+    navigation,
+    neighbours,
+    page_name,
+    paginate,
+    purge_pages,
+)
 from sphinx_graph.table.state import State
-from sphinx_graph.vertex.events import relative_uris, vertex_reference
+from sphinx_graph.util import may_contain
+from sphinx_graph.vertex.cache import is_impure
+from sphinx_graph.vertex.plan import SELECT
 from sphinx_graph.vertex.query import DEFAULT_QUERY, QUERIES
+from sphinx_graph.vertex.store import Store
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable, Iterator, Mapping
 
     from sphinx.application import Sphinx
     from sphinx.builders import Builder
+    from sphinx.environment import BuildEnvironment
+
+    from sphinx_graph.config import Config
+    from sphinx_graph.table.columns import Column
+    from sphinx_graph.table.info import Info
 
 __all__ = [
     "register",
 ]
 
 
-def relatives(
-    builder: Builder,
-    docname: str,
-    state: vertex.State,
-    uid: str,
-) -> tuple[Iterable[nodes.reference], Iterable[nodes.reference]]:
-    """Find the realtive URIs of the immediate 'relatives' of a given vertex.
+def purge(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
+    """Clear out the tables in a document which is about to be re-read (or removed)."""
+    with State.get(env) as state:
+        state.purge(docname)
 
-    Args:
-        builder: The sphinx builder instance
-        docname: the name of the current document
-        state: the global vertex information
-        uid: the UID of the vertex
+
+def merge(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    docnames: list[str],
+    other: BuildEnvironment,
+) -> None:
+    """Merge the tables from multiple environments during parallel builds."""
+    with State.get(env) as state:
+        state.merge(docnames, State.read(other))
+
+
+def process(app: Sphinx, doctree: nodes.document, fromdocname: str) -> None:
+    """Process Vertex nodes by formatting and adding links to graph neighbours.
+
+    Documents without any tables are skipped, without traversing the doctree.
+    """
+    state = State.read(app.env)
+    if not may_contain(app.env, fromdocname, state.docnames):
+        Instrumentation.read(app.env).count("table.skipped_documents")
+        return
+    builder = app.builder
+    config: Config = app.config.graph_config
+    vertex_state = vertex.State.read(app.env)
+    for node in doctree.findall(TableNode):
+        uid = node["graph_uid"]
+        info = state.tables[uid]
+        vertices = table_rows(app, vertex_state, info)
+        columns = resolve(info.columns, config.columns)
+        if info.page_size is None or not is_paged(builder):
+            node.replace_self(
+                build_vertex_table(
+                    builder, info.docname, vertex_state, vertices, columns
+                )
+            )
+            continue
+
+        rows, more = next(paginate(vertices, info.page_size), ([], False))
+        table = build_vertex_table(builder, info.docname, vertex_state, rows, columns)
+        paged_tables(builder)[uid] = more
+        if not more:
+            node.replace_self(table)
+            continue
+        node.replace_self([
+            table,
+            navigation(
+                builder, info.docname, 1, *neighbours(info.docname, uid, 1, more)
+            ),
+        ])
+
+
+def paged_tables(builder: Builder) -> dict[str, bool]:
+    """The tables split into pages which were written in this build.
+
+    The tables are stored on the builder, so they are never pickled with the
+    environment.
 
     Returns:
-        a tuple of (parents, children) where each is an iterable over
-        (target_uid, relative_uri)
+        a mapping from table ID to whether the table has more than one page
     """
-    info = state.vertices[uid]
-    [parents, children] = [
-        relative_uris(builder, docname, state.vertices, uids)
-        for uids in [info.parents.keys(), state.children(uid)]
-    ]
-    return (parents, children)
+    tables: dict[str, bool] | None = getattr(builder, "graph_paged_tables", None)
+    if tables is None:
+        tables = builder.graph_paged_tables = {}  # type: ignore[attr-defined]
+    return tables
+
+
+def reset_paged_tables(app: Sphinx) -> None:
+    """Forget the paged tables written by any previous build."""
+    app.builder.graph_paged_tables = {}  # type: ignore[attr-defined]
+
 
+def collect_pages(app: Sphinx) -> Iterator[tuple[str, dict[str, Any], str]]:
+    """Generate the second and later pages of each paged table.
 
-def process(app: Sphinx, doctree: nodes.document, _fromdocname: str) -> None:
-    """Process Vertex nodes by formatting and adding links to graph neighbours."""
+    The query is run again, and consumed lazily, one page at a time. The pages left
+    by an earlier build, of tables which were rewritten or no longer exist, are
+    removed first.
+
+    Yields:
+        tuples of (page name, template context, template name)
+    """
     builder = app.builder
+    config: Config = app.config.graph_config
     state = State.read(app.env)
     vertex_state = vertex.State.read(app.env)
+    tables = paged_tables(builder)
+    purge_pages(Path(builder.outdir), state.tables, tables)
+    for uid, more in sorted(tables.items()):
+        info = state.tables[uid]
+        if not more or info.page_size is None:
+            continue
+        columns = resolve(info.columns, config.columns)
+        pages = paginate(table_rows(app, vertex_state, info), info.page_size)
+        next(pages, None)  # the first page is in the document itself
+        for page, (rows, following) in enumerate(pages, start=2):
+            name = page_name(uid, page)
+            nav = navigation(
+                builder, name, page, *neighbours(info.docname, uid, page, following)
+            )
+            container = nodes.container()
+            container += nav
+            container += build_vertex_table(builder, name, vertex_state, rows, columns)
+            container += nav.deepcopy()
+            body = builder.render_partial(container)["fragment"]  # type: ignore[attr-defined]
+            yield name, {"title": f"{uid} (page {page})", "body": body}, "page.html"
+
+
+def table_rows(app: Sphinx, vertex_state: vertex.State, info: Info) -> Iterator[str]:
+    """The UIDs of the vertices shown in a table, after the offset and limit.
+
+    Unless the complete result of the query is already cached, the query is consumed
+    lazily if the table has a limit or is split into pages, so that only the rows
+    which are shown are computed. Otherwise, the complete result is cached.
+    """
+    stop = None if info.limit is None else info.offset + info.limit
+    if info.limit is None and info.page_size is None:
+        return islice(run_query(app, vertex_state, info), info.offset, None)
+    name, run, pure = resolve_query(app, info)
+    store = Store.read(app.env)
+    if pure and (name, info.args, store.version) in store.query_cache:
+        rows = run_query(app, vertex_state, info)
+    else:
+        rows = run(vertex_state)
+    return islice(rows, info.offset, stop)
+
+
+def find_query(
+    app: Sphinx, info: Info
+) -> tuple[str, Callable[[vertex.State], Iterable[str]], bool]:
+    """Find the query for a vertex table, with its arguments applied.
+
+    Returns:
+        a tuple of (query name, the query, whether the query is pure). Only the
+        results of pure queries may be cached.
+
+    Raises:
+        ConfigError: If the query isn't registered.
+    """
+    if info.plan is not None:
+        return SELECT, info.plan.run, True
+
     queries = QUERIES
     queries.update(app.config.graph_config.queries)
-    for node in doctree.findall(TableNode):
-        uid = node["graph_uid"]
-        info = state.tables[uid]
-        if info.query and info.query not in queries:
-            msg = f"no query registered with name '{info.query}'"
-            raise ConfigError(msg)
-        query = queries[info.query or DEFAULT_QUERY]
-        vertices = query(vertex_state, **info.args)
-        table = build_vertex_table(builder, info.docname, vertex_state, vertices)
-        node.replace_self(table)
+    if info.query and info.query not in queries:
+        msg = f"no query registered with name '{info.query}'"
+        raise ConfigError(msg)
+    name = info.query or DEFAULT_QUERY
+    query = queries[name]
+    return name, partial(query, **info.args), not is_impure(query)
+
+
+def resolve_query(
+    app: Sphinx, info: Info
+) -> tuple[str, Callable[[vertex.State], Iterable[str]], bool]:
+    """Find the query for a vertex table, timed against the query budget.
+
+    Returns:
+        a tuple of (query name, a function which runs the query, whether the query
+        is pure). Only the results of pure queries may be cached.
+
+    Raises:
+        ConfigError: If the query isn't registered.
+    """
+    name, query, pure = find_query(app, info)
+    return name, partial(evaluate, app, info, name, query), pure
+
+
+def run_query(app: Sphinx, vertex_state: vertex.State, info: Info) -> Iterable[str]:
+    """Run the query for a vertex table.
+
+    Results are cached for the current version of the graph, so identical tables
+    (with the same query and arguments) are only evaluated once. Queries marked as
+    impure are always run.
+
+    Raises:
+        ConfigError: If the query isn't registered.
+    """
+    name, run, pure = resolve_query(app, info)
+    if not pure:
+        return run(vertex_state)
+    store = Store.read(app.env)
+    return store.query_cache.get(
+        name, info.args, store.version, lambda: run(vertex_state)
+    )
+
+
+def record_cache(app: Sphinx, _exception: Exception | None) -> None:
+    """Record how effective the query cache was."""
+    cache = Store.read(app.env).query_cache
+    counters = Instrumentation.read(app.env).counters
+    counters["query_cache.hits"] = cache.hits
+    counters["query_cache.misses"] = cache.misses
 
 
 def build_table(
     headers: list[str],
-    items: list[dict[str, nodes.paragraph]],
+    items: list[dict[str, nodes.Node]],
 ) -> nodes.table:
     """Construct a docutils nodes.table from a header and a list of dicts.
 
@@ -115,34 +290,38 @@ def build_vertex_table(
     docname: str,
     state: vertex.State,
     vertices: Iterable[str],
+    columns: Mapping[str, Column] | None = None,
 ) -> nodes.table:
-    """Construct a table from a list of vertices."""
-    headers = ["uid", "tags", "parents", "children"]
-    items: list[dict[str, nodes.paragraph]] = []
-    for uid in vertices:
-        uid_para = nodes.paragraph()
-        uid_para += vertex_reference(builder, docname, state.vertices, uid)
-
-        item = {
-            "uid": uid_para,
-            "tags": nodes.paragraph(text=", ".join(state.vertices[uid].tags)),
-        }
-
-        [parent_refs, child_refs] = relatives(builder, docname, state, uid)
+    """Construct a table from a list of vertices.
 
-        parents = nodes.paragraph()
-        parents.extend(comma_separated_list(parent_refs))
-        item["parents"] = parents
-
-        children = nodes.paragraph()
-        children.extend(comma_separated_list(child_refs))
-        item["children"] = children
-
-        items.append(item)
-
-    return build_table(headers, items)
+    Args:
+        builder: the sphinx builder
+        docname: the name of the document (or generated page) containing the table
+        state: the vertex state
+        vertices: the UIDs of the vertices to show, in order
+        columns: a mapping from column header to the column which computes its cells,
+            in order. Only these columns are computed. Defaults to the default
+            columns.
+    """
+    if columns is None:
+        columns = resolve([], {})
+    items: list[dict[str, nodes.Node]] = [
+        {
+            header: render(column, Cell(builder, docname, state, uid))
+            for header, column in columns.items()
+        }
+        for uid in vertices
+    ]
+    return build_table(list(columns), items)
 
 
 def register(app: Sphinx) -> None:
     """Register the vertex-table lifecycle events."""
+    app.connect("env-purge-doc", purge)
+    app.connect("env-merge-info", merge)
+    app.connect("builder-inited", reset_paged_tables)
+    app.connect("builder-inited", reset_slowest)
     app.connect("doctree-resolved", process)
+    app.connect("html-collect-pages", collect_pages)
+    app.connect("build-finished", record_cache)
+    app.connect("build-finished", report_slow_queries)
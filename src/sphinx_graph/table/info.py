@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sphinx_graph.vertex.plan import Plan
 
 
 @dataclass
@@ -14,8 +17,22 @@ class Info:
         docname: the name of the document where the table is located
         query: the name of a query used to filter and sort vertices for display
         args: keyword arguments to be passed to the query
+        plan: the compiled plan, if the table uses a declarative 'select' query
+        limit: the maximum number of vertices to show, if any
+        offset: the number of vertices to skip
+        page_size: the number of vertices to show on each page, if the table is split
+            into pages
+        columns: the names of the columns to show, in order. If empty, the default
+            columns are shown.
+        line: the line number of the directive in the document, if known
     """
 
     docname: str
     query: str | None
     args: dict[str, Any]
+    plan: Plan | None = None
+    limit: int | None = None
+    offset: int = 0
+    page_size: int | None = None
+    columns: list[str] = field(default_factory=list)
+    line: int | None = None
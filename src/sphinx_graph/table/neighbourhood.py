@@ -0,0 +1,99 @@
+"""Fingerprints of the vertices shown in the tables of each document."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sphinx_graph import vertex
+from sphinx_graph.graphcheck import GraphCheckBuilder
+from sphinx_graph.table.events import resolve_query, table_rows
+from sphinx_graph.table.state import State
+from sphinx_graph.vertex.cache import canonical
+from sphinx_graph.vertex.neighbourhood import Neighbourhoods, digest
+from sphinx_graph.vertex.store import Store
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    from sphinx_graph.table.info import Info
+
+__all__ = [
+    "check_tables",
+]
+
+
+def _identity(app: Sphinx, info: Info) -> Iterable[str]:
+    """The parts of a table's fingerprint which describe its query, not its rows."""
+    name, _run, _pure = resolve_query(app, info)
+    yield from (name, canonical(info.args), str(info.offset))
+    yield from (str(info.limit), str(info.page_size))
+
+
+def fingerprint_tables(
+    app: Sphinx, env: BuildEnvironment, *, run: bool = True
+) -> dict[str, str]:
+    """Fingerprint the results of the tables in every document.
+
+    The fingerprint of a table covers every vertex it shows (in order, on every page),
+    and everything about those vertices which a column could show: their docname,
+    type, tags, content fingerprint, parents and children. The complete results of
+    queries are cached, so they aren't run again when the documents are written.
+
+    Limited, paged and impure tables don't cache their results, so their queries are
+    run again if their documents are written. Limited queries only compute the rows
+    shown, so this is cheap.
+
+    Args:
+        app: the Sphinx application
+        env: the build environment
+        run: if false, no query is run, and every table is fingerprinted by its query
+    """
+    state = State.read(env)
+    vertex_state = vertex.State.read(env)
+    vertices = vertex_state.vertices
+    fingerprints = Store.read(env).fingerprints
+
+    def parts(uids: list[str]) -> Iterable[str]:
+        for uid in uids:
+            yield uid
+            info = state.tables[uid]
+            if not run:
+                yield from _identity(app, info)
+                continue
+            for row in table_rows(app, vertex_state, info):
+                vertex_info = vertices[row]
+                yield from (row, vertex_info.docname, vertex_info.type or "")
+                yield from vertex_info.tags
+                yield fingerprints[row][1] if row in fingerprints else ""
+                yield from ("parents", *vertex_info.parents)
+                yield from ("children", *vertex_state.children(row))
+
+    return {docname: digest(parts(uids)) for docname, uids in state.docnames.items()}
+
+
+def check_tables(app: Sphinx, env: BuildEnvironment) -> list[str]:
+    """Find the documents whose tables show different vertices.
+
+    The queries are only run again if the graph has changed, and a document is only
+    written again if the rows shown by one of its tables have changed.
+
+    If the tables weren't fingerprinted by a previous build, every document is being
+    written anyway, so no query is run. The tables are only fingerprinted by their
+    queries, so their documents are written again the next time the graph changes.
+
+    Nothing is run by the graphcheck builder, which doesn't write any documents.
+
+    Returns:
+        the documents to write again.
+    """
+    if isinstance(app.builder, GraphCheckBuilder):
+        return []
+    neighbourhoods = Neighbourhoods.read(env, "table")
+    version = Store.read(env).version
+    if version == neighbourhoods.version:
+        return []
+    run = bool(neighbourhoods.fingerprints)
+    return neighbourhoods.update(version, lambda: fingerprint_tables(app, env, run=run))
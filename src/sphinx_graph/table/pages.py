@@ -0,0 +1,154 @@
+"""Splitting large vertex tables into multiple pages."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import shutil
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from docutils import nodes
+
+from sphinx_graph.vertex.uris import uri_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+    from sphinx.builders import Builder
+
+__all__ = [
+    "is_paged",
+    "navigation",
+    "neighbours",
+    "page_name",
+    "paginate",
+    "purge_pages",
+    "slug",
+]
+
+# builders which can write the extra pages of a table
+PAGED_BUILDERS = ("html", "dirhtml")
+
+# the directory containing the extra pages of every table, within the output
+PAGES = "_vertex_tables"
+
+
+def is_paged(builder: Builder) -> bool:
+    """Whether the builder can split tables into pages.
+
+    Other builders show every row of a table on a single page.
+    """
+    return builder.name in PAGED_BUILDERS
+
+
+def slug(text: str) -> str:
+    """A name for a file or directory, derived from a table's UID or location.
+
+    Characters which aren't safe in a file name are replaced, and a short hash of the
+    original text is appended, so that UIDs which only differ in the replaced
+    characters don't share a name.
+    """
+    safe = re.sub(r"[^\w-]+", "-", text)
+    short = hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
+    return f"{safe}-{short}"
+
+
+def page_name(uid: str, page: int) -> str:
+    """The name of a generated page of a table, for the second page onwards."""
+    return f"{PAGES}/{slug(uid)}/{page}"
+
+
+def purge_pages(outdir: Path, tables: Iterable[str], written: Iterable[str]) -> None:
+    """Remove the extra pages of tables which were rewritten, or no longer exist.
+
+    The extra pages of a table are all in one directory, which is removed. The pages
+    of a rewritten table are then generated again, so a table which has shrunk (or is
+    no longer split into pages) doesn't leave its later pages behind.
+
+    Args:
+        outdir: the output directory of the builder
+        tables: the IDs of every table in the project
+        written: the IDs of the paged tables which were written in this build
+    """
+    directory = outdir / PAGES
+    if not directory.is_dir():
+        return
+    keep = {slug(uid) for uid in tables} - {slug(uid) for uid in written}
+    for path in directory.iterdir():
+        if path.name in keep:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+
+def paginate(rows: Iterable[str], size: int) -> Iterator[tuple[list[str], bool]]:
+    """Split rows into pages, lazily.
+
+    Only one row beyond the current page is consumed, to find out whether there are
+    more pages.
+
+    Yields:
+        tuples of (rows, whether there are more pages)
+    """
+    rows = iter(rows)
+    page = list(islice(rows, size))
+    while page:
+        following = next(rows, None)
+        yield page, following is not None
+        if following is None:
+            return
+        page = [following, *islice(rows, size - 1)]
+
+
+def neighbours(
+    docname: str,
+    uid: str,
+    page: int,
+    more: bool,  # noqa: FBT001
+) -> tuple[str | None, str | None]:
+    """The names of the previous and next pages of a table, if any.
+
+    Args:
+        docname: the name of the document containing the table (the first page)
+        uid: the ID of the table
+        page: the current page number, starting at 1
+        more: whether there is a next page
+    """
+    previous = None
+    if page > 1:
+        previous = docname if page == 2 else page_name(uid, page - 1)  # noqa: PLR2004
+    following = page_name(uid, page + 1) if more else None
+    return previous, following
+
+
+def navigation(
+    builder: Builder,
+    from_docname: str,
+    page: int,
+    previous: str | None,
+    following: str | None,
+) -> nodes.paragraph:
+    """Construct links to the previous and next pages of a table.
+
+    Args:
+        builder: the sphinx builder
+        from_docname: the name of the document (or generated page) the links are in
+        page: the current page number, starting at 1
+        previous: the name of the previous page, if any
+        following: the name of the next page, if any
+    """
+    paragraph = nodes.paragraph(classes=["vertex-table-pages"])
+    if previous is not None:
+        uri = uri_cache(builder).get(from_docname, previous)
+        paragraph += nodes.reference("", "« previous", refuri=uri)
+        paragraph += nodes.Text(" ")
+    paragraph += nodes.Text(f"page {page}")
+    if following is not None:
+        uri = uri_cache(builder).get(from_docname, following)
+        paragraph += nodes.Text(" ")
+        paragraph += nodes.reference("", "next »", refuri=uri)
+    return paragraph
@@ -0,0 +1,125 @@
+"""Evaluate every vertex-table query up front, before the write phase."""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from sphinx.util import logging
+
+from sphinx_graph import vertex
+from sphinx_graph.graphcheck import GraphCheckBuilder
+from sphinx_graph.table.budget import Measurement, Stats, profiled, record
+from sphinx_graph.table.events import find_query
+from sphinx_graph.table.state import State
+from sphinx_graph.vertex.cache import canonical
+from sphinx_graph.vertex.store import Store
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    from sphinx_graph.config import Config
+    from sphinx_graph.table.info import Info
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "precompute",
+]
+
+# the queries being evaluated. Forked worker processes inherit these, so that neither
+# the queries nor the vertex state need to be pickled.
+_PENDING: list[Callable[[vertex.State], Iterable[str]]] = []
+_STATE: list[vertex.State] = []
+
+
+def _run(index: int, profile: bool) -> tuple[tuple[str, ...], float, Stats | None]:  # noqa: FBT001
+    """Run one of the pending queries.
+
+    The query is timed (and profiled) where it runs, but recorded by the main process,
+    since anything recorded by a worker process is lost.
+
+    Returns:
+        a tuple of (the rows, the time taken, the profile statistics if profiled)
+    """
+    measurement = Measurement(profile=profile)
+    rows = tuple(measurement.run(_PENDING[index], _STATE[0]))
+    return rows, measurement.elapsed, measurement.stats()
+
+
+def _executor(workers: int) -> Executor | None:
+    """A pool of forked worker processes, if processes can be forked.
+
+    Threads would give no parallelism for queries written in Python, so queries are
+    evaluated serially on platforms which can't fork.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        logger.verbose("vertex-table queries are evaluated serially: can't fork")
+        return None
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+
+
+def precompute(app: Sphinx, env: BuildEnvironment) -> list[str]:
+    """Evaluate the query of every vertex table, and cache the results.
+
+    This runs after the graph is finalised, and before any document is written. Each
+    distinct (pure) query is evaluated once. If more than one worker is configured,
+    queries are evaluated concurrently.
+
+    The results are cached in the main process, so they are also available to each
+    process in a parallel write.
+
+    Nothing is evaluated by the graphcheck builder, which doesn't write any documents.
+
+    Returns:
+        no extra documents to write.
+    """
+    config: Config = app.config.graph_config
+    workers = config.query_workers
+    if workers is None or isinstance(app.builder, GraphCheckBuilder):
+        return []
+
+    store = Store.read(env)
+    pending: dict[tuple[str, str], tuple[str, Info, Any]] = {}
+    for info in State.read(env).tables.values():
+        if info.limit is not None or info.page_size is not None:
+            # consumed lazily, so that only the rows shown are computed
+            continue
+        name, query, pure = find_query(app, info)
+        if pure and (name, info.args, store.version) not in store.query_cache:
+            pending.setdefault((name, canonical(info.args)), (name, info, query))
+    if not pending:
+        return []
+
+    logger.verbose(
+        "evaluating %d vertex-table queries with %d worker(s)", len(pending), workers
+    )
+    _PENDING[:] = [query for _name, _info, query in pending.values()]
+    _STATE[:] = [vertex.State.read(env)]
+    indices = range(len(_PENDING))
+    profiles = [profiled(config)] * len(_PENDING)
+    try:
+        executor = (
+            _executor(min(workers, len(_PENDING)))
+            if workers > 1 and len(_PENDING) > 1
+            else None
+        )
+        if executor is None:
+            results = list(map(_run, indices, profiles))
+        else:
+            with executor:
+                results = list(executor.map(_run, indices, profiles))
+    finally:
+        _PENDING.clear()
+        _STATE.clear()
+
+    for (name, info, _query), (rows, elapsed, stats) in zip(
+        pending.values(), results, strict=True
+    ):
+        record(app, info, name, elapsed, stats)
+        store.query_cache.put(name, info.args, store.version, rows)
+    return []
@@ -3,7 +3,7 @@
 from docutils import nodes
 from sphinx.application import Sphinx
 
-from . import events
+from . import events, neighbourhood, precompute
 from .directive import Directive
 from .node import TableNode
 
@@ -34,3 +34,6 @@ def register(app: Sphinx) -> None:
     app.add_directive("vertex-table", Directive)
 
     events.register(app)
+    # after the vertex graph is finalised
+    app.connect("env-updated", precompute.precompute, priority=600)
+    app.connect("env-get-updated", neighbourhood.check_tables)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 from sphinx.util import logging
@@ -12,7 +12,6 @@ from sphinx_graph.vertex.state import DuplicateIdError
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
-    from uuid import UUID
 
     from sphinx.environment import BuildEnvironment
 
@@ -28,11 +27,17 @@ __all__ = [
 
 @dataclass
 class State:
-    """State object for Sphinx Graph vertex tables."""
+    """State object for Sphinx Graph vertex tables.
 
-    tables: dict[UUID, table.Info]
+    Args:
+        tables: a mapping from table ID to table Info
+        docnames: a mapping from docname to the IDs of the tables in that document
+    """
 
-    def insert(self, uid: UUID, info: Info) -> None:
+    tables: dict[str, table.Info]
+    docnames: dict[str, list[str]] = field(default_factory=dict)
+
+    def insert(self, uid: str, info: Info) -> None:
         """Insert a vertex into the context.
 
         Raises:
@@ -42,12 +47,29 @@ class State:
             err_msg = f"Vertex table {uid} already exists."
             raise DuplicateIdError(err_msg)
         self.tables[uid] = info
+        self.docnames.setdefault(info.docname, []).append(uid)
+
+    def purge(self, docname: str) -> None:
+        """Remove all tables in the given document."""
+        for uid in self.docnames.pop(docname, []):
+            del self.tables[uid]
+
+    def merge(self, docnames: list[str], other: State) -> None:
+        """Merge the tables in the given documents from another State.
+
+        Raises:
+            DuplicateIdError: If a merged table already exists.
+        """
+        for docname in docnames:
+            for uid in other.docnames.get(docname, []):
+                self.insert(uid, other.tables[uid])
 
     @classmethod
     def read(cls, env: BuildEnvironment) -> State:
         """Get the State object for the given environment."""
         tables = getattr(env, "graph_tables", {})
-        return State(tables)
+        docnames = getattr(env, "graph_table_docnames", {})
+        return State(tables, docnames)
 
     @classmethod
     @contextmanager
@@ -56,3 +78,4 @@ class State:
         state = cls.read(env)
         yield state
         env.graph_tables = state.tables  # type: ignore[attr-defined]
+        env.graph_table_docnames = state.docnames  # type: ignore[attr-defined]
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
-from typing import TypeVar
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Container
+
+    from sphinx.environment import BuildEnvironment
 
 T = TypeVar("T")
 
@@ -23,3 +28,30 @@ def unwrap(option: T | None) -> T:
         err_msg = "attempted to 'unwrap' a None value!"
         raise ValueError(err_msg)
     return option
+
+
+def may_contain(env: BuildEnvironment, docname: str, docnames: Container[str]) -> bool:
+    """Whether a resolved doctree may contain nodes from any of the given documents.
+
+    Most builders resolve each document separately. Some (such as ``singlehtml`` and
+    ``latex``) resolve one doctree for the root document, with every document in its
+    toctree inlined, so the documents included (recursively) by its toctrees are
+    checked too.
+
+    Args:
+        env: the sphinx build environment
+        docname: the name of the document being resolved
+        docnames: the documents which contain the nodes of interest
+    """
+    includes = env.toctree_includes
+    pending = [docname]
+    seen = {docname}
+    while pending:
+        current = pending.pop()
+        if current in docnames:
+            return True
+        for included in includes.get(current, ()):
+            if included not in seen:
+                seen.add(included)
+                pending.append(included)
+    return False
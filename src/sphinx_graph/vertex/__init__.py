@@ -1,6 +1,8 @@
 """Types and methods specific to the vertex directive."""
 
+from .cache import impure
 from .config import Config
+from .fingerprint import FingerprintConfig
 from .info import Info
 from .node import VertexNode
 from .query import Query
@@ -9,9 +11,11 @@ from .state import State
 
 __all__ = [
     "Config",
+    "FingerprintConfig",
     "Info",
     "Query",
     "State",
     "VertexNode",
+    "impure",
     "register",
 ]
@@ -0,0 +1,112 @@
+"""A cache of vertex query results, shared between vertex tables."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+__all__ = [
+    "QueryCache",
+    "impure",
+]
+
+F = TypeVar("F", bound="Callable[..., Iterable[str]]")
+
+
+def impure(query: F) -> F:
+    """Mark a query as impure, so that its results are never cached.
+
+    A query is impure if its result depends on anything other than the vertex graph
+    and its arguments (for example, the current time, or external files).
+
+    Example::
+
+        from sphinx_graph.vertex import impure
+
+        @impure
+        def recently_changed(state: State) -> Iterable[str]:
+            ...
+    """
+    query.graph_impure = True  # type: ignore[attr-defined]
+    return query
+
+
+def is_impure(query: Callable[..., Iterable[str]]) -> bool:
+    """Whether the query has been marked as impure."""
+    return getattr(query, "graph_impure", False)
+
+
+def canonical(args: dict[str, Any]) -> str:
+    """A canonical representation of query arguments, independent of their order."""
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+class QueryCache:
+    """A cache of query results, keyed by query name, arguments and graph version.
+
+    Identical vertex tables (with the same query and arguments) are common, and each
+    is only evaluated once per version of the graph. When the graph changes, every
+    cached result is dropped.
+
+    Args:
+        hits: the number of results found in the cache
+        misses: the number of results which had to be computed
+    """
+
+    def __init__(self) -> None:
+        """Create a new, empty cache."""
+        self._results: dict[tuple[str, str], tuple[str, ...]] = {}
+        self._version: int | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        name: str,
+        args: dict[str, Any],
+        version: int,
+        run: Callable[[], Iterable[str]],
+    ) -> tuple[str, ...]:
+        """Get the result of a query, running it if it isn't cached.
+
+        Args:
+            name: the name of the query
+            args: the arguments the query is run with
+            version: the version of the graph the query is run against
+            run: a function which runs the query
+        """
+        self._check_version(version)
+        key = (name, canonical(args))
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            result = self._results[key] = tuple(run())
+        else:
+            self.hits += 1
+        return result
+
+    def __contains__(self, key: tuple[str, dict[str, Any], int]) -> bool:
+        """Whether a result is cached for the given (name, args, version)."""
+        name, args, version = key
+        return version == self._version and (name, canonical(args)) in self._results
+
+    def put(
+        self,
+        name: str,
+        args: dict[str, Any],
+        version: int,
+        result: Iterable[str],
+    ) -> None:
+        """Cache a precomputed query result. This counts as a miss."""
+        self._check_version(version)
+        self.misses += 1
+        self._results[name, canonical(args)] = tuple(result)
+
+    def _check_version(self, version: int) -> None:
+        """Drop every cached result if the graph has changed."""
+        if version != self._version:
+            self._results.clear()
+            self._version = version
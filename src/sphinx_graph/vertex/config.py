@@ -2,14 +2,22 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Collection, Iterator
     from re import Pattern
 
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
 
-@dataclass
+# a vertex type, along with the configuration options set on a directive
+ConfigKey = tuple[str | None, bool | None, bool | None, str | None]
+
+
+@dataclass(slots=True)
 class Config:
     """Optional additional configuration for a vertex directive.
 
@@ -44,3 +52,43 @@ class Config:
             if other.require_parent is None
             else other.require_parent,
         )
+
+    def violation(self, uid: str, parents: Collection[str]) -> str | None:
+        """Check a vertex against this configuration.
+
+        Args:
+            uid: the UID of the vertex
+            parents: the UIDs of the parents of the vertex
+
+        Returns:
+            a description of the first way the vertex violates this configuration, or
+            ``None`` if it doesn't.
+        """
+        if self.regex and not self.regex.match(uid):
+            return (
+                f"vertex '{uid}' doesn't satisfy the configured regex"
+                f" ('{self.regex.pattern}')"
+            )
+        if self.require_parent and len(parents) < 1:
+            return (
+                f"vertex '{uid}' is required to have at least one parent but has none"
+            )
+        return None
+
+
+@contextmanager
+def resolved_configs(env: BuildEnvironment) -> Iterator[dict[ConfigKey, Config]]:
+    """Resolved vertex configurations, keyed by vertex type and directive options.
+
+    Vertices with the same type and options share a single Config object.
+    """
+    configs: dict[ConfigKey, Config] = getattr(env, "graph_resolved_configs", {})
+    yield configs
+    env.graph_resolved_configs = configs  # type: ignore[attr-defined]
+
+
+def reset_resolved_configs(
+    _app: Sphinx, env: BuildEnvironment, _docnames: list[str]
+) -> None:
+    """Discard the resolved configurations, in case the configuration has changed."""
+    env.graph_resolved_configs = {}  # type: ignore[attr-defined]
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-import base64
-import hashlib
+import sys
 from typing import TYPE_CHECKING, ClassVar
 
 from docutils import nodes
@@ -13,8 +12,11 @@ from sphinx.util.docutils import SphinxDirective
 from sphinx.util.nodes import nested_parse_with_titles
 
 from sphinx_graph import parse
+from sphinx_graph.instrumentation import Instrumentation
 from sphinx_graph.vertex import state
 from sphinx_graph.vertex.config import Config as VertexConfig
+from sphinx_graph.vertex.config import resolved_configs
+from sphinx_graph.vertex.fingerprint import fingerprint as vertex_fingerprint
 from sphinx_graph.vertex.info import Info
 from sphinx_graph.vertex.node import VertexNode
 
@@ -48,29 +50,25 @@ class Directive(SphinxDirective):
 
     def run(self) -> Sequence[nodes.Node]:
         """Run the directive and return a Vertex node."""
-        uid = self.arguments[0]
+        with Instrumentation.read(self.env).time("vertex.directive"):
+            return self._run()
+
+    def _run(self) -> Sequence[nodes.Node]:
+        uid = sys.intern(self.arguments[0])
         parents = self.options.get("parents", {})
         content_node = VertexNode(graph_uid=uid)
         nested_parse_with_titles(self.state, self.content, content_node)
 
-        fingerprint = base64.b64encode(
-            hashlib.md5(content_node.astext().encode()).digest(),  # noqa: S324
-        )[:4].decode()
+        fingerprint, legacy_fingerprint = vertex_fingerprint(
+            self.env,
+            uid,
+            "\n".join(self.content),
+            content_node,
+        )
 
         vertex_config = self.vertex_config()
-        if vertex_config.regex and not vertex_config.regex.match(uid):
-            msg = (
-                f"vertex '{uid}' doesn't satisfy the configured regex"
-                f" ('{vertex_config.regex.pattern}')"
-            )
-            logger.error(
-                msg,
-                location=(self.env.docname, self.lineno),
-            )
-            raise SphinxError(msg)
-
-        if vertex_config.require_parent and len(parents) < 1:
-            msg = f"vertex '{uid}' is required to have at least one parent but has none"
+        msg = vertex_config.violation(uid, parents)
+        if msg is not None:
             logger.error(
                 msg,
                 location=(self.env.docname, self.lineno),
@@ -86,6 +84,8 @@ class Directive(SphinxDirective):
                 parents=parents,
                 fingerprint=fingerprint,
                 tags=self.options.get("tags", []),
+                legacy_fingerprint=legacy_fingerprint,
+                type=self.options.get("type"),
             ),
         )
 
@@ -125,10 +125,23 @@ class Directive(SphinxDirective):
         1. default configuration (globally configured)
         2. 'type' configuration (set by vertex type)
         3. directive configuration (local config set on the directive)
+
+        The combined configuration is shared with every other vertex with the same
+        type and directive options.
         """
-        return (
-            self
-            ._default_config()
-            .override(self._type_config())
-            .override(self._directive_config())
+        key = (
+            self.options.get("type"),
+            self.options.get("require_fingerprints"),
+            self.options.get("require_parents"),
+            self.options.get("layout"),
         )
+        with resolved_configs(self.env) as configs:
+            config = configs.get(key)
+            if config is None:
+                config = configs[key] = (
+                    self
+                    ._default_config()
+                    .override(self._type_config())
+                    .override(self._directive_config())
+                )
+            return config
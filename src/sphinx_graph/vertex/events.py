@@ -6,18 +6,28 @@ from typing import TYPE_CHECKING
 
 from docutils import nodes
 
+from sphinx_graph.instrumentation import Instrumentation
+from sphinx_graph.util import may_contain
 from sphinx_graph.vertex import layout
+from sphinx_graph.vertex.config import reset_resolved_configs
+from sphinx_graph.vertex.fingerprint import check_config as check_fingerprint_config
 from sphinx_graph.vertex.info import Info, InfoParsed
+from sphinx_graph.vertex.neighbourhood import check_neighbourhoods
 from sphinx_graph.vertex.node import VertexNode
-from sphinx_graph.vertex.state import build_and_check_graph
+from sphinx_graph.vertex.state import State, build_and_check_graph
 from sphinx_graph.vertex.state import merge as state_merge
 from sphinx_graph.vertex.state import purge as state_purge
+from sphinx_graph.vertex.state import purge_all as state_purge_all
+from sphinx_graph.vertex.store import Store, finish_reading, start_reading
+from sphinx_graph.vertex.store import check_valid as check_store_valid
+from sphinx_graph.vertex.uris import reset_uri_cache, uri_cache
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Mapping
 
     from sphinx.application import Sphinx
     from sphinx.builders import Builder
+    from sphinx.environment import BuildEnvironment
 
 
 def vertex_reference(
@@ -38,7 +48,7 @@ def vertex_reference(
     Returns:
         A nodes.reference, ready for insertion into the document
     """
-    uri = builder.get_relative_uri(from_docname, vertices[target_uid].docname)
+    uri = uri_cache(builder).get(from_docname, vertices[target_uid].docname)
     refuri = f"{uri}#{target_uid}"
     reference = nodes.reference(refuri=refuri)
     reference.append(nodes.Text(target_uid))
@@ -59,34 +69,74 @@ def relative_uris(
     )
 
 
-def process(app: Sphinx, doctree: nodes.document, _fromdocname: str) -> None:
-    """Process Vertex nodes by formatting and adding links to graph neighbours."""
+def finalise(_app: Sphinx, env: BuildEnvironment) -> None:
+    """Build and check the vertex graph once all documents have been read.
+
+    The finalised graph is stored on the environment, and shared by the vertex
+    and vertex-table resolvers. Any problems with the graph are reported once per
+    build, rather than once per resolved document.
+    """
+    build_and_check_graph(env)
+
+
+def process(app: Sphinx, doctree: nodes.document, fromdocname: str) -> None:
+    """Process Vertex nodes by formatting and adding links to graph neighbours.
+
+    Documents without any vertices are skipped, without traversing the doctree.
+    """
+    instrumentation = Instrumentation.read(app.env)
+    if not may_contain(app.env, fromdocname, Store.read(app.env).docnames):
+        instrumentation.count("vertex.skipped_documents")
+        return
     builder = app.builder
-    state = build_and_check_graph(app.env)
-    for vertex_node in doctree.findall(VertexNode):
+    state = State.read(app.env)
+    for vertex_node in list(doctree.findall(VertexNode)):
         uid = vertex_node["graph_uid"]
         info = state.vertices[uid]
         [parents, children] = [
             relative_uris(builder, info.docname, state.vertices, uids)
             for uids in [info.parents.keys(), state.children(uid)]
         ]
+        # detach the vertex node, so that the layout can move it into its output
+        # rather than copying its (possibly large) content
+        parent = vertex_node.parent
+        index = parent.index(vertex_node)
+        parent.remove(vertex_node)
         parsed_info = InfoParsed(
-            content=vertex_node.deepcopy(),
+            content=vertex_node,
             parents=parents,
             children=children,
             tags=info.tags,
         )
-        vertex_node.replace_self(
-            layout.apply_formatting(
-                uid,
-                parsed_info,
-                info.config.layout,
-            ),
-        )
+        with instrumentation.time(f"layout.{info.config.layout or layout.DEFAULT}"):
+            formatted = layout.apply_formatting(uid, parsed_info, info.config.layout)
+        parent.insert(index, formatted)
+
+
+def record_uri_cache(app: Sphinx, _exception: Exception | None) -> None:
+    """Record how many relative URIs were found in the cache.
+
+    Only links resolved in the main process are counted (not those resolved by
+    parallel write workers).
+    """
+    cache = uri_cache(app.builder)
+    counters = Instrumentation.read(app.env).counters
+    counters["uri_cache.hits"] = cache.hits
+    counters["uri_cache.misses"] = cache.misses
 
 
 def register(app: Sphinx) -> None:
     """Register the vertex directive lifecycle events."""
     app.connect("env-purge-doc", state_purge)
+    app.connect("env-before-read-docs", state_purge_all)
+    app.connect("env-before-read-docs", reset_resolved_configs)
+    app.connect("env-before-read-docs", start_reading)
+    app.connect("env-get-outdated", check_store_valid)
+    app.connect("env-get-outdated", check_fingerprint_config)
     app.connect("env-merge-info", state_merge)
+    app.connect("env-updated", finish_reading)
+    app.connect("env-updated", finalise)
+    app.connect("env-get-updated", check_neighbourhoods)
+    app.connect("builder-inited", reset_uri_cache)
     app.connect("doctree-resolved", process)
+    app.connect("build-finished", record_uri_cache)
@@ -0,0 +1,177 @@
+"""Vertex 'fingerprints'; short hashes of the content of a vertex."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sphinx.errors import ConfigError
+
+from sphinx_graph.instrumentation import Instrumentation
+from sphinx_graph.vertex.store import Store
+
+if TYPE_CHECKING:
+    from docutils import nodes
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    from sphinx_graph.config import Config
+
+__all__ = [
+    "FingerprintConfig",
+]
+
+
+# an include directive in reStructuredText or MyST, which makes the content of a vertex
+# depend on a file other than its own source
+INCLUDE = re.compile(r"\.\.\s+(?:literal)?include::|\{(?:literal)?include\}")
+
+
+def _encode(digest: bytes) -> str:
+    return base64.b64encode(digest).decode()
+
+
+@dataclass(frozen=True)
+class FingerprintConfig:
+    """Configuration for computing vertex fingerprints.
+
+    The defaults reproduce the fingerprints computed by earlier versions of
+    Sphinx-Graph.
+
+    Args:
+        algorithm: The name of the hash algorithm to use. Any fixed-length algorithm
+            supported by :py:mod:`hashlib` may be used. ``"blake2b"`` is faster and
+            more collision-resistant than the default ``"md5"``.
+        length: The number of (base64) characters to keep from the digest.
+        normalise_whitespace: Whether to ignore changes to whitespace.
+        ignore_markup: Whether to hash the rendered text of the vertex (ignoring
+            changes to markup), rather than its raw source.
+        accept_legacy: Whether to also accept legacy fingerprints (4 characters of an
+            MD5 digest of the rendered text) on parent links. This allows existing
+            links to be migrated to a new fingerprint configuration gradually.
+    """
+
+    algorithm: str = "md5"
+    length: int = 4
+    normalise_whitespace: bool = False
+    ignore_markup: bool = True
+    accept_legacy: bool = False
+
+    def __post_init__(self) -> None:
+        """Check that the configuration is valid.
+
+        Raises:
+            ConfigError: If the algorithm is unknown, or the length is out of range.
+        """
+        if self.algorithm not in hashlib.algorithms_available or self.algorithm in {
+            "shake_128",
+            "shake_256",
+        }:
+            err_msg = f"unsupported fingerprint algorithm: '{self.algorithm}'"
+            raise ConfigError(err_msg)
+        max_length = len(_encode(hashlib.new(self.algorithm).digest()))
+        if not 1 <= self.length <= max_length:
+            err_msg = (
+                f"fingerprint length must be between 1 and {max_length} for"
+                f" '{self.algorithm}', but was {self.length}"
+            )
+            raise ConfigError(err_msg)
+
+    def is_legacy(self) -> bool:
+        """Whether this configuration produces legacy fingerprints."""
+        return (
+            self.algorithm == LEGACY.algorithm
+            and self.length == LEGACY.length
+            and self.normalise_whitespace == LEGACY.normalise_whitespace
+            and self.ignore_markup == LEGACY.ignore_markup
+        )
+
+
+LEGACY = FingerprintConfig()
+
+
+def digest(text: str, config: FingerprintConfig) -> str:
+    """Compute the fingerprint of some text."""
+    if config.normalise_whitespace:
+        text = " ".join(text.split())
+    hasher = hashlib.new(config.algorithm, text.encode(), usedforsecurity=False)
+    return _encode(hasher.digest())[: config.length]
+
+
+def fingerprint(
+    env: BuildEnvironment,
+    uid: str,
+    source: str,
+    content: nodes.Node,
+) -> tuple[str, str | None]:
+    """Compute the fingerprint of a vertex.
+
+    If the raw source of the vertex is unchanged since it was last read, the cached
+    fingerprint is returned without hashing. This assumes that the content of a
+    vertex is determined by its source, so vertices which include other files aren't
+    cached. Only a short digest of the source is kept in the cache.
+
+    Args:
+        env: the sphinx build environment
+        uid: the UID of the vertex
+        source: the raw source of the vertex content
+        content: the parsed vertex content
+
+    Returns:
+        a tuple of (fingerprint, legacy fingerprint). The legacy fingerprint is only
+        computed if legacy fingerprints are accepted, and differ from the fingerprint.
+    """
+    instrumentation = Instrumentation.read(env)
+    cache = Store.read(env).fingerprints
+    key = None if INCLUDE.search(source) else source_digest(source)
+    cached = cache.get(uid)
+    if key is not None and cached is not None and cached[0] == key:
+        instrumentation.count("fingerprint_cache.hits")
+        return cached[1], cached[2]
+
+    instrumentation.count("fingerprint_cache.misses")
+    with instrumentation.time("vertex.fingerprint"):
+        config: Config = env.config.graph_config
+        fingerprints = config.fingerprints
+        text = content.astext() if fingerprints.ignore_markup else source
+        value = digest(text, fingerprints)
+        legacy = (
+            digest(content.astext(), LEGACY)
+            if fingerprints.accept_legacy and not fingerprints.is_legacy()
+            else None
+        )
+    if key is None:
+        cache.pop(uid, None)
+    else:
+        cache[uid] = (key, value, legacy)
+    return value, legacy
+
+
+def source_digest(source: str) -> bytes:
+    """A short digest of the raw source of a vertex, to key the fingerprint cache."""
+    return hashlib.blake2b(source.encode(), digest_size=16).digest()
+
+
+def check_config(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    _added: set[str],
+    _changed: set[str],
+    _removed: set[str],
+) -> list[str]:
+    """Re-read every document containing vertices if the fingerprint config changes.
+
+    Returns:
+        the documents which must be re-read.
+    """
+    config: Config = env.config.graph_config
+    previous: FingerprintConfig | None = getattr(env, "graph_fingerprint_config", None)
+    env.graph_fingerprint_config = config.fingerprints  # type: ignore[attr-defined]
+    if previous is None or previous == config.fingerprints:
+        return []
+    store = Store.read(env)
+    store.fingerprints.clear()
+    return list(store.docnames)
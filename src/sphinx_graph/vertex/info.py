@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import sys
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
@@ -13,31 +15,132 @@ if TYPE_CHECKING:
     from sphinx_graph.vertex.config import Config
 
 
-@dataclass
+class Parents(Mapping[str, "str | None"]):
+    """A compact, immutable mapping from parent vertex UID to link fingerprint.
+
+    Parent UIDs and fingerprints are stored in two parallel tuples. Vertices have few
+    parents, so a linear search is faster (and much smaller) than a dict.
+    """
+
+    __slots__ = ("_fingerprints", "_uids")
+
+    def __init__(self, parents: Mapping[str, str | None] | None = None) -> None:
+        """Create a new mapping from parent UID to link fingerprint."""
+        parents = parents or {}
+        self._uids = tuple(sys.intern(uid) for uid in parents)
+        self._fingerprints = tuple(parents.values())
+
+    def __getitem__(self, key: str) -> str | None:
+        """Get the link fingerprint for a parent UID."""
+        try:
+            return self._fingerprints[self._uids.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the parent UIDs."""
+        return iter(self._uids)
+
+    def __len__(self) -> int:
+        """The number of parents."""
+        return len(self._uids)
+
+    def __repr__(self) -> str:
+        """Represent the parents as a dict."""
+        return f"Parents({dict(self.items())!r})"
+
+    def __getstate__(self) -> tuple[tuple[str, ...], tuple[str | None, ...]]:
+        """Pickle the parents as a pair of tuples."""
+        return self._uids, self._fingerprints
+
+    def __setstate__(
+        self, state: tuple[tuple[str, ...], tuple[str | None, ...]]
+    ) -> None:
+        """Unpickle the parents from a pair of tuples."""
+        self._uids, self._fingerprints = state
+
+
+NO_PARENTS = Parents()
+
+
+@dataclass(slots=True)
 class Info:
     """Vertex information dataclass.
 
+    Vertex records are slotted, and share their strings and configuration with other
+    vertices wherever possible, since there may be a great many of them.
+
     Args:
         docname: The name of the current sphinx document
             used for generating interdoc links
-        config: Additional configuration for a Vertex
+        config: Additional configuration for a Vertex. This is shared between all
+            vertices with the same configuration, and must not be modified.
         parents: A mapping from any parent vertices to their last known fingerprint,
             if any
         fingerprint: the 'fingerprint' of this Vertex
             effectively a hash of the Vertices contents
         tags: User-defined tags added to a vertex
+        legacy_fingerprint: the legacy 'fingerprint' of this Vertex, if legacy
+            fingerprints are accepted and differ from the fingerprint
+        type: The 'type' of this Vertex, if any
     """
 
     docname: str
     config: Config
-    parents: dict[str, str | None]
+    parents: Mapping[str, str | None]
     fingerprint: str
     tags: list[str]
+    legacy_fingerprint: str | None = None
+    type: str | None = None
+
+    def __post_init__(self) -> None:
+        """Store the parents and strings compactly."""
+        self.docname = sys.intern(self.docname)
+        self.tags = [sys.intern(tag) for tag in self.tags]
+        if self.type is not None:
+            self.type = sys.intern(self.type)
+        if not self.parents:
+            self.parents = NO_PARENTS
+        elif not isinstance(self.parents, Parents):
+            self.parents = Parents(self.parents)
+
+    def __getstate__(self) -> tuple[object, ...]:
+        """Pickle the record as a plain tuple, which is faster and smaller."""
+        return (
+            self.docname,
+            self.config,
+            self.parents,
+            self.fingerprint,
+            self.tags,
+            self.legacy_fingerprint,
+            self.type,
+        )
+
+    def __setstate__(self, state: tuple[object, ...]) -> None:
+        """Unpickle the record from a plain tuple."""
+        (
+            self.docname,
+            self.config,
+            self.parents,
+            self.fingerprint,
+            self.tags,
+            self.legacy_fingerprint,
+            self.type,
+        ) = state  # type: ignore[assignment]
 
 
 @dataclass
 class InfoParsed:
-    """Information about a vertex which is available after parsing the graph."""
+    """Information about a vertex which is available after parsing the graph.
+
+    Args:
+        content: the vertex node itself, with its resolved content. It has been
+            detached from the document, and is owned by the layout: it may be inserted
+            into the formatted output once, without copying.
+        parents: references to the parents of the vertex
+        children: references to the children of the vertex
+        tags: the tags of the vertex
+    """
 
     content: nodes.Node
     parents: Iterable[nodes.reference]
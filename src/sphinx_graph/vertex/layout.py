@@ -1,4 +1,11 @@
-"""Tools and methods for formatting vertex nodes into docutils nodes."""
+"""Tools and methods for formatting vertex nodes into docutils nodes.
+
+A layout (:py:data:`Formatter`) receives the vertex content as an owned node: the vertex
+node is detached from the document before formatting, so the layout may move it into
+its output as-is. A node can only have one parent, so a layout which uses the content
+more than once (or keeps it for later) must call :py:meth:`FormatHelper.copy_content`
+for every additional use.
+"""
 
 from __future__ import annotations
 
@@ -43,6 +50,13 @@ class FormatHelper:
     uid: str
     info: InfoParsed
 
+    def copy_content(self) -> nodes.Node:
+        """A copy of the vertex content, for layouts which use it more than once.
+
+        ``info.content`` itself may be inserted into the output without copying.
+        """
+        return self.info.content.deepcopy()
+
     def child_list(self) -> nodes.line | None:
         """Format the list of child vertex references as a comma-separated list.
 
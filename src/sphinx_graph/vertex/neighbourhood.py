@@ -0,0 +1,129 @@
+"""Fingerprints of the graph 'neighbourhood' of each document.
+
+A document shows information about vertices in other documents (such as the links to
+the children of its vertices), which Sphinx doesn't know about. When the graph changes,
+the neighbourhood of each document is fingerprinted again, and the documents whose
+neighbourhood has changed are written again, even if they weren't re-read.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING
+
+from sphinx_graph.vertex.state import State
+from sphinx_graph.vertex.store import Store
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+__all__ = [
+    "Neighbourhoods",
+    "check_neighbourhoods",
+    "digest",
+]
+
+
+def digest(parts: Iterable[str]) -> str:
+    """A short hash of a sequence of strings."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(part.encode())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class Neighbourhoods:
+    """The neighbourhood fingerprint of each document, as of the last build.
+
+    Args:
+        fingerprints: a mapping from docname to neighbourhood fingerprint
+        version: the version of the graph the fingerprints were computed for. This
+            isn't serialised.
+    """
+
+    def __init__(self) -> None:
+        """Create a new, empty set of fingerprints."""
+        self.fingerprints: dict[str, str] = {}
+        self.version = 0
+
+    def __getstate__(self) -> dict[str, str]:
+        """Pickle the fingerprints only."""
+        return self.fingerprints
+
+    def __setstate__(self, state: dict[str, str]) -> None:
+        """Unpickle the fingerprints."""
+        self.fingerprints = state
+        self.version = 0
+
+    @classmethod
+    def read(cls, env: BuildEnvironment, name: str) -> Neighbourhoods:
+        """Get the named fingerprints, creating them if necessary."""
+        attr = f"graph_{name}_neighbourhoods"
+        neighbourhoods: Neighbourhoods | None = getattr(env, attr, None)
+        if neighbourhoods is None:
+            neighbourhoods = Neighbourhoods()
+            setattr(env, attr, neighbourhoods)
+        return neighbourhoods
+
+    def update(
+        self, version: int, fingerprints: Callable[[], dict[str, str]]
+    ) -> list[str]:
+        """Fingerprint every document again, if the graph has changed.
+
+        Args:
+            version: the current version of the graph
+            fingerprints: a function which fingerprints every document
+
+        Returns:
+            the documents whose fingerprint has changed. Documents which weren't
+            fingerprinted before are being written anyway, so they aren't included.
+        """
+        if version == self.version:
+            return []
+        self.version = version
+        previous, self.fingerprints = self.fingerprints, fingerprints()
+        return [
+            docname
+            for docname, fingerprint in self.fingerprints.items()
+            if previous.get(docname, fingerprint) != fingerprint
+        ]
+
+
+def fingerprint_documents(
+    state: State, docnames: dict[str, list[str]]
+) -> dict[str, str]:
+    """Fingerprint the neighbourhood of every document containing vertices.
+
+    The neighbourhood of a document is everything shown in its vertex layouts which
+    comes from other documents: the UIDs and docnames of the parents and children of
+    each vertex, in order.
+    """
+    vertices = state.vertices
+
+    def parts(uids: list[str]) -> Iterable[str]:
+        for uid in uids:
+            yield uid
+            for parent in vertices[uid].parents:
+                if parent in vertices:
+                    yield from ("parent", parent, vertices[parent].docname)
+            for child in state.children(uid):
+                yield from ("child", child, vertices[child].docname)
+
+    return {docname: digest(parts(uids)) for docname, uids in docnames.items()}
+
+
+def check_neighbourhoods(_app: Sphinx, env: BuildEnvironment) -> list[str]:
+    """Find the documents whose vertices have new (or different) neighbours.
+
+    Returns:
+        the documents to write again.
+    """
+    store = Store.read(env)
+    return Neighbourhoods.read(env, "vertex").update(
+        store.version,
+        lambda: fingerprint_documents(State.read(env), store.docnames),
+    )
@@ -0,0 +1,278 @@
+"""Declarative 'select' queries, compiled into plans which run against the indexes."""
+
+from __future__ import annotations
+
+import heapq
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from sphinx.errors import ConfigError, SphinxError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from collections.abc import Set as AbstractSet
+
+    from sphinx_graph.vertex.state import State
+
+__all__ = [
+    "SELECT",
+    "Plan",
+]
+
+# the query name which marks the table body as a declarative query
+SELECT = "select"
+
+MATCHES = ("all", "any")
+SORT_KEYS = ("uid", "docname", "type")
+
+_KEYS = {
+    "tags",
+    "types",
+    "docnames",
+    "id",
+    "ancestors_of",
+    "descendants_of",
+    "depth",
+    "include_self",
+    "match",
+    "sort",
+    "limit",
+}
+
+
+def _strings(args: dict[str, Any], key: str) -> tuple[str, ...]:
+    """Read a string, or list of strings, from the query arguments."""
+    value = args.get(key, [])
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return tuple(value)
+    err_msg = f"'{key}' must be a string or a list of strings"
+    raise ConfigError(err_msg)
+
+
+def _optional_int(args: dict[str, Any], key: str) -> int | None:
+    """Read an optional positive integer from the query arguments."""
+    value = args.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        err_msg = f"'{key}' must be a positive integer"
+        raise ConfigError(err_msg)
+    return value
+
+
+def _choice(args: dict[str, Any], key: str, choices: tuple[str, ...]) -> str:
+    """Read one of a set of strings from the query arguments."""
+    value = args.get(key, choices[0])
+    if value not in choices:
+        err_msg = f"'{key}' must be one of {', '.join(choices)}"
+        raise ConfigError(err_msg)
+    return str(value)
+
+
+@dataclass(frozen=True)
+class Plan:
+    """A compiled 'select' query.
+
+    Each filter is a set of vertex UIDs, found using the indexes on
+    :py:class:`sphinx_graph.vertex.State` rather than by scanning every vertex. A
+    vertex matches a filter if it matches any of the values given for it. The filters
+    are then combined by intersection (``match = "all"``) or union
+    (``match = "any"``).
+
+    Args:
+        tags: match vertices with any of these tags
+        types: match vertices of any of these types
+        docnames: match vertices in any of these documents
+        pattern: match vertices with a UID matching this regular expression
+        ancestors_of: match the ancestors of any of these vertices
+        descendants_of: match the descendants of any of these vertices
+        depth: the maximum number of links to follow when finding ancestors and
+            descendants. If ``None``, there is no limit.
+        include_self: whether ``ancestors_of`` and ``descendants_of`` also match the
+            vertices themselves
+        match: how the filters are combined; either ``"all"`` or ``"any"``
+        sort: the key to sort the vertices by; ``"uid"``, ``"docname"`` or ``"type"``
+        reverse: whether to sort in descending order
+        limit: the maximum number of vertices to return. If ``None``, all are returned.
+    """
+
+    tags: tuple[str, ...] = ()
+    types: tuple[str, ...] = ()
+    docnames: tuple[str, ...] = ()
+    pattern: re.Pattern[str] | None = None
+    ancestors_of: tuple[str, ...] = ()
+    descendants_of: tuple[str, ...] = ()
+    depth: int | None = None
+    include_self: bool = False
+    match: str = "all"
+    sort: str = "uid"
+    reverse: bool = False
+    limit: int | None = None
+
+    @classmethod
+    def compile(cls, args: dict[str, Any]) -> Plan:
+        """Compile the (TOML) body of a vertex-table into a plan.
+
+        Example::
+
+            tags = ["P1", "P2"]
+            types = "req"
+            descendants_of = "REQ-0001"
+            depth = 2
+            sort = "-uid"
+            limit = 10
+
+        Raises:
+            ConfigError: If the query is invalid.
+        """
+        unknown = sorted(set(args) - _KEYS)
+        if unknown:
+            err_msg = (
+                f"unknown select query option(s): {', '.join(unknown)}."
+                f" expected one of: {', '.join(sorted(_KEYS))}"
+            )
+            raise ConfigError(err_msg)
+
+        pattern = args.get("id")
+        if pattern is not None:
+            if not isinstance(pattern, str):
+                err_msg = "'id' must be a regular expression string"
+                raise ConfigError(err_msg)
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                err_msg = f"invalid 'id' regular expression: {e}"
+                raise ConfigError(err_msg) from e
+
+        include_self = args.get("include_self", False)
+        if not isinstance(include_self, bool):
+            err_msg = "'include_self' must be a boolean"
+            raise ConfigError(err_msg)
+
+        sort = args.get("sort", "uid")
+        if not isinstance(sort, str):
+            err_msg = "'sort' must be a string"
+            raise ConfigError(err_msg)
+        reverse = sort.startswith("-")
+        sort = _choice({"sort": sort.removeprefix("-")}, "sort", SORT_KEYS)
+
+        return cls(
+            tags=_strings(args, "tags"),
+            types=_strings(args, "types"),
+            docnames=_strings(args, "docnames"),
+            pattern=compiled if pattern is not None else None,
+            ancestors_of=_strings(args, "ancestors_of"),
+            descendants_of=_strings(args, "descendants_of"),
+            depth=_optional_int(args, "depth"),
+            include_self=include_self,
+            match=_choice(args, "match", MATCHES),
+            sort=sort,
+            reverse=reverse,
+            limit=_optional_int(args, "limit"),
+        )
+
+    def run(self, state: State) -> list[str]:
+        """Run the plan, and return the UIDs of the matching vertices.
+
+        Raises:
+            SphinxError: If ``ancestors_of`` or ``descendants_of`` refer to a vertex
+                which doesn't exist.
+        """
+        groups = self._groups(state)
+        if self.pattern is not None:
+            pattern = self.pattern
+            if groups and self.match == "all":
+                # cheaper to filter the other matches than to scan every vertex
+                candidates: Iterable[str] = (
+                    uid for uid in state.all_of(*groups) if pattern.match(uid)
+                )
+            else:
+                groups.append({uid for uid in state.vertices if pattern.match(uid)})
+                candidates = self._combine(state, groups)
+        elif groups:
+            candidates = self._combine(state, groups)
+        else:
+            candidates = state.vertices.keys()
+
+        key = _sort_key(state, self.sort)
+        if self.limit is None:
+            return sorted(candidates, key=key, reverse=self.reverse)
+        # only the first few vertices are needed, so avoid sorting all of them
+        select = heapq.nlargest if self.reverse else heapq.nsmallest
+        return select(self.limit, candidates, key=key)
+
+    def _groups(self, state: State) -> list[AbstractSet[str]]:
+        """Find the vertices matching each of the index-backed filters."""
+        groups: list[AbstractSet[str]] = []
+        for values, lookup in (
+            (self.tags, state.tagged),
+            (self.types, state.of_type),
+            (self.docnames, state.in_document),
+        ):
+            if values:
+                groups.append(state.any_of(*(lookup(value) for value in values)))
+        for uids, ancestors in (
+            (self.ancestors_of, True),
+            (self.descendants_of, False),
+        ):
+            if uids:
+                groups.append(
+                    state.any_of(
+                        *(
+                            self._relatives(state, uid, ancestors=ancestors)
+                            for uid in uids
+                        )
+                    )
+                )
+        return groups
+
+    def _combine(
+        self, state: State, groups: list[AbstractSet[str]]
+    ) -> AbstractSet[str]:
+        """Combine the filters, as configured."""
+        if self.match == "all":
+            return state.all_of(*groups)
+        return state.any_of(*groups)
+
+    def _relatives(
+        self, state: State, uid: str, *, ancestors: bool
+    ) -> AbstractSet[str]:
+        """Find the ancestors or descendants of a vertex, up to the configured depth."""
+        if uid not in state.node_ids:
+            err_msg = f"select query refers to vertex '{uid}', but it doesn't exist"
+            raise SphinxError(err_msg)
+        found: dict[str, None] = {uid: None} if self.include_self else {}
+        if self.depth is None:
+            relatives = state.ancestors(uid) if ancestors else state.descendants(uid)
+            found.update(dict.fromkeys(relatives))
+            return found.keys()
+
+        graph = state.graph
+        step = graph.predecessor_indices if ancestors else graph.successor_indices
+        start = state.node_ids[uid]
+        seen = {start}
+        queue = deque([(start, 0)])
+        while queue:
+            node_id, depth = queue.popleft()
+            if depth == self.depth:
+                continue
+            for next_id in step(node_id):
+                if next_id not in seen:
+                    seen.add(next_id)
+                    found[graph[next_id]] = None
+                    queue.append((next_id, depth + 1))
+        return found.keys()
+
+
+def _sort_key(state: State, sort: str) -> Callable[[str], Any]:
+    """The key function to sort vertex UIDs with."""
+    vertices = state.vertices
+    if sort == "docname":
+        return lambda uid: (vertices[uid].docname, uid)
+    if sort == "type":
+        return lambda uid: (vertices[uid].type or "", uid)
+    return lambda uid: uid
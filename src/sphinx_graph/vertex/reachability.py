@@ -0,0 +1,172 @@
+"""A precomputed index of which vertices can reach which others."""
+
+from __future__ import annotations
+
+import rustworkx as rx
+
+__all__ = [
+    "ReachabilityIndex",
+]
+
+# a bitset shifted down to its lowest set bit, as (offset, bits)
+Bitset = tuple[int, int]
+
+_EMPTY: Bitset = (0, 0)
+
+
+class ReachabilityIndex:
+    """A precomputed index of the ancestors and descendants of every vertex.
+
+    The graph is condensed into its strongly connected components, which form a
+    directed acyclic graph. The ancestors and descendants of each component are then
+    computed once, in topological order, and stored as bitsets (Python integers with
+    one bit per vertex, in topological order).
+
+    Each bitset is stored shifted down to its lowest set bit, with that offset. Its
+    size is then proportional to the span of topological positions it covers, rather
+    than the number of vertices: the descendants of a vertex near the end of a long
+    chain cost almost nothing, for example.
+
+    Ancestor checks are then a single bit test, rather than a search. The ancestors
+    and descendants of each vertex are decoded from the bitsets on first use, visiting
+    only the set bits, and cached.
+
+    The index uses memory quadratic in the number of vertices in the worst case (a
+    single long chain of vertices). It must be rebuilt whenever the graph changes.
+
+    Args:
+        graph: the vertex graph. Node weights must be vertex UIDs.
+    """
+
+    def __init__(self, graph: rx.PyDiGraph[str, str | None]) -> None:
+        """Build the index for the given graph."""
+        condensed: rx.PyDiGraph[list[str], None] = rx.digraph_condensation(graph)
+        order = rx.topological_sort(condensed)
+
+        self._uids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._components: dict[str, int] = {}
+        self._ranks: list[int] = [0] * condensed.num_nodes()
+        # the vertices of each component have consecutive positions
+        self._members: list[Bitset] = [_EMPTY] * condensed.num_nodes()
+        for rank, component in enumerate(order):
+            self._ranks[component] = rank
+            uids = condensed[component]
+            self._members[component] = (len(self._uids), (1 << len(uids)) - 1)
+            for uid in uids:
+                self._positions[uid] = len(self._uids)
+                self._components[uid] = component
+                self._uids.append(uid)
+
+        self._ancestors: list[Bitset] = [_EMPTY] * condensed.num_nodes()
+        for component in order:
+            bits = 0
+            for parent in condensed.predecessor_indices(component):
+                bits |= _expand(self._members[parent]) | _expand(
+                    self._ancestors[parent]
+                )
+            self._ancestors[component] = _compact(bits)
+
+        self._descendants: list[Bitset] = [_EMPTY] * condensed.num_nodes()
+        for component in reversed(order):
+            bits = 0
+            for child in condensed.successor_indices(component):
+                bits |= _expand(self._members[child]) | _expand(
+                    self._descendants[child]
+                )
+            self._descendants[component] = _compact(bits)
+
+        self._ancestors_cache: dict[str, tuple[str, ...]] = {}
+        self._descendants_cache: dict[str, tuple[str, ...]] = {}
+
+    def __contains__(self, uid: object) -> bool:
+        """Whether the given vertex is in the index."""
+        return uid in self._positions
+
+    def is_ancestor(self, ancestor: str, uid: str) -> bool:
+        """Whether there is a path from one vertex to another.
+
+        Consistent with `rustworkx.ancestors`, a vertex is never its own ancestor, even
+        if it is part of a cycle.
+        """
+        if ancestor == uid:
+            return False
+        component = self._components[ancestor]
+        other = self._components[uid]
+        if component == other:
+            # mutually dependent vertices are each other's ancestors
+            return True
+        if self._ranks[component] > self._ranks[other]:
+            # ancestors always come first in topological order
+            return False
+        offset, bits = self._descendants[component]
+        shift = self._positions[uid] - offset
+        return shift >= 0 and bool((bits >> shift) & 1)
+
+    def ancestors(self, uid: str) -> tuple[str, ...]:
+        """Find all direct parents and ancestors of the given vertex.
+
+        The result is cached, so repeated lookups don't decode the bitset again.
+        """
+        ancestors = self._ancestors_cache.get(uid)
+        if ancestors is None:
+            ancestors = self._ancestors_cache[uid] = self._decode(
+                self._ancestors[self._components[uid]], uid
+            )
+        return ancestors
+
+    def descendants(self, uid: str) -> tuple[str, ...]:
+        """Find all direct children and descendants of the given vertex.
+
+        The result is cached, so repeated lookups don't decode the bitset again.
+        """
+        descendants = self._descendants_cache.get(uid)
+        if descendants is None:
+            descendants = self._descendants_cache[uid] = self._decode(
+                self._descendants[self._components[uid]], uid
+            )
+        return descendants
+
+    def _cycle(self, uid: str) -> tuple[str, ...]:
+        """The other vertices in the same strongly connected component."""
+        offset, bits = self._members[self._components[uid]]
+        if bits == 1:
+            # the vertex is alone in its component
+            return ()
+        return tuple(other for other in self._decode_bits(bits, offset) if other != uid)
+
+    def _decode(self, bitset: Bitset, uid: str) -> tuple[str, ...]:
+        """Convert a bitset into vertex UIDs, adding the rest of the vertex's cycle."""
+        offset, bits = bitset
+        return self._decode_bits(bits, offset) + self._cycle(uid)
+
+    def _decode_bits(self, bits: int, offset: int) -> tuple[str, ...]:
+        """Convert a compacted bitset into vertex UIDs, in reverse topological order.
+
+        Only the set bits are visited: the string representation is built in linear
+        time (in the size of the bitset), and the set bits found in C. The least
+        significant bit is the last character.
+        """
+        digits = bin(bits)
+        last = len(digits) - 1 + offset
+        uids = self._uids
+        found: list[str] = []
+        index = digits.find("1", 2)
+        while index >= 0:
+            found.append(uids[last - index])
+            index = digits.find("1", index + 1)
+        return tuple(found)
+
+
+def _compact(bits: int) -> Bitset:
+    """Shift a bitset down to its lowest set bit."""
+    if not bits:
+        return _EMPTY
+    offset = (bits & -bits).bit_length() - 1
+    return offset, bits >> offset
+
+
+def _expand(bitset: Bitset) -> int:
+    """Shift a compacted bitset back up to its original positions."""
+    offset, bits = bitset
+    return bits << offset
@@ -2,20 +2,29 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator, Mapping
-from contextlib import contextmanager
+from collections import deque
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 import rustworkx as rx
 from sphinx.errors import DocumentError, SphinxError
 from sphinx.util import logging
 
-from sphinx_graph.vertex.info import Info
+from sphinx_graph.instrumentation import Instrumentation
+from sphinx_graph.vertex.reachability import ReachabilityIndex
+from sphinx_graph.vertex.store import Store
 
 if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable, Mapping
+    from collections.abc import Set as AbstractSet
+
     from sphinx.application import Sphinx
     from sphinx.environment import BuildEnvironment
 
+    from sphinx_graph.config import Config
+    from sphinx_graph.vertex.info import Info
+
 logger = logging.getLogger(__name__)
 
 __all__ = [
@@ -29,66 +38,124 @@ class DuplicateIdError(DocumentError):
     category = "Document Error"
 
 
-@contextmanager
-def _vertices_tmp(env: BuildEnvironment) -> Iterator[dict[str, Info]]:
-    vertices: dict[str, Info] = getattr(env, "graph_vertices_tmp", {})
-    yield vertices
-    env.graph_vertices_tmp = vertices  # type: ignore[attr-defined]
-
-
 def purge(_app: Sphinx, env: BuildEnvironment, docname: str) -> None:
     """Clear out all stale vertices.
 
-    All vertices whose docname matches the given one from the graph_all_vertices list
-    will be removed.
+    All vertices in the given document are removed from the environment. This scales
+    with the number of vertices in the document, not the size of the graph.
 
     If there are vertices left in the document, they will be added again during parsing.
     """
-    with _vertices_tmp(env) as vertices:
-        vertices = {  # noqa: PLW2901
-            uid: vert for uid, vert in vertices.items() if vert.docname != docname
-        }
+    store = Store.read(env)
+    stale = store.docnames.pop(docname, [])
+    for uid in stale:
+        store.remove(uid)
+    store.dirty.update(stale)
+
+
+def purge_all(app: Sphinx, env: BuildEnvironment, docnames: list[str]) -> None:
+    """Clear out the vertices of every document that is about to be read.
+
+    Sphinx purges each document just before reading it when building serially. Purging
+    them all up front means that a vertex which has moved between two changed documents
+    isn't mistaken for a duplicate.
+    """
+    for docname in docnames:
+        purge(app, env, docname)
 
 
 def merge(
     _app: Sphinx,
     env: BuildEnvironment,
-    _docnames: list[str],
+    docnames: list[str],
     other: BuildEnvironment,
 ) -> None:
-    """Merge the vertices from multiple environments during parallel builds."""
-    with _vertices_tmp(env) as vertices, _vertices_tmp(other) as other_vertices:
-        vertices.update(other_vertices)
+    """Merge the vertices from multiple environments during parallel builds.
 
+    Only the vertices from the documents read by the other environment are merged.
 
-def insert_vertex(env: BuildEnvironment, uid: str, info: Info) -> None:
-    """Insert a vertex into the build environment."""
-    with _vertices_tmp(env) as vertices:
-        if uid in vertices:
-            err_msg = f"Vertex {uid} already exists."
-            raise DuplicateIdError(err_msg)
-        vertices[uid] = info
+    Raises:
+        DuplicateIdError: If a merged vertex already exists.
+    """
+    store = Store.read(env)
+    other_store = Store.read(other)
+    for docname in docnames:
+        for uid in other_store.docnames.get(docname, []):
+            insert_vertex(env, uid, other_store.vertices[uid])
+            if uid in other_store.fingerprints:
+                store.fingerprints[uid] = other_store.fingerprints[uid]
 
 
-def build_and_check_graph(env: BuildEnvironment) -> State:
-    """Build the graph from the collected vertices.
+def insert_vertex(env: BuildEnvironment, uid: str, info: Info) -> None:
+    """Insert a vertex into the build environment.
 
-    Also checks the graph for consistency.
+    Raises:
+        DuplicateIdError: If the vertex already exists.
     """
-    vertices_tmp: dict[str, Info] = env.graph_vertices_tmp  # type: ignore[attr-defined]
-    vertices: dict[str, tuple[int, Info]] = {}
-    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    store = Store.read(env)
+    if uid in store.vertices:
+        err_msg = f"Vertex {uid} already exists."
+        raise DuplicateIdError(err_msg)
+    store.add(uid, info)
+    store.dirty.add(uid)
+
+
+def build_and_check_graph(env: BuildEnvironment) -> State:
+    """Bring the graph up to date with the collected vertices.
 
-    for uid, info in vertices_tmp.items():
-        node_id = graph.add_node(uid)
-        vertices[uid] = node_id, info
+    The graph is kept in the environment between builds. Only the vertices which have
+    been added or removed since the last build (and the links to and from them) are
+    updated, and only those links and the components they belong to are checked for
+    consistency.
 
-    build_graph_edges(vertices, graph)
+    This is called once per build, after all documents have been read.
+    """
+    store = Store.read(env)
+    instrumentation = Instrumentation.read(env)
+    vertices, node_ids, graph = store.vertices, store.node_ids, store.graph
+
+    # sorted, so that graph node IDs are assigned deterministically
+    changed = sorted(store.dirty)
+    store.dirty.clear()
+    if changed:
+        store.version += 1
+    instrumentation.count("graph.changed_vertices", len(changed))
+
+    with instrumentation.time("graph.build"):
+        for uid in changed:
+            # replace the graph node, removing all of its edges
+            node_id = node_ids.pop(uid, None)
+            if node_id is not None:
+                graph.remove_node(node_id)
+            if uid in vertices:
+                node_ids[uid] = graph.add_node(uid)
+            else:
+                # forget the fingerprints of vertices which no longer exist
+                store.fingerprints.pop(uid, None)
+
+        # links both to and from changed vertices need to be rebuilt and checked
+        affected = {uid for uid in changed if uid in vertices}
+        for uid in changed:
+            affected.update(store.referrers.get(uid, ()))
+
+        build_graph_edges(vertices, node_ids, graph, affected)
+
+    config: Config = env.config.graph_config
+    with instrumentation.time("graph.check_cycles"):
+        check_cycles(
+            graph,
+            [node_ids[uid] for uid in affected],
+            limit=config.max_reported_cycles,
+            members=config.report_cycle_members,
+        )
 
-    env.graph_vertices = vertices  # type: ignore[attr-defined]
-    env.graph_graph = graph  # type: ignore[attr-defined]
+    if not config.reachability_index:
+        store.reachability = None
+    elif changed or store.reachability is None:
+        with instrumentation.time("graph.reachability"):
+            store.reachability = ReachabilityIndex(graph)
 
-    return State(vertices, graph)
+    return State.read(env)
 
 
 class State:
@@ -96,12 +163,22 @@ class State:
 
     def __init__(
         self,
-        vertices: dict[str, tuple[int, Info]],
+        vertices: Mapping[str, Info],
+        node_ids: Mapping[str, int],
         graph: rx.PyDiGraph[str, str | None],
+        reachability: ReachabilityIndex | None = None,
+        indexes: Indexes | None = None,
     ) -> None:
-        """Create a new state object."""
+        """Create a new state object.
+
+        If not given, the tag, type and docname indexes are built from the vertices
+        when first used.
+        """
         self._vertices = vertices
+        self._node_ids = node_ids
         self._graph = graph
+        self._reachability = reachability
+        self._indexes = indexes
 
     @classmethod
     def read(cls, env: BuildEnvironment) -> State:
@@ -109,11 +186,14 @@ class State:
 
         This is a read-only view of the state. Changes will not be saved.
         """
-        vertices = getattr(env, "graph_vertices", {})
-        graph: rx.PyDiGraph[str, str | None] = getattr(
-            env, "graph_graph", rx.PyDiGraph(multigraph=False)
+        store = Store.read(env)
+        return State(
+            store.vertices,
+            store.node_ids,
+            store.graph,
+            store.reachability,
+            Indexes(store.tags, store.types, store.docnames),
         )
-        return State(vertices, graph)
 
     @property
     def graph(self) -> rx.PyDiGraph[str, str | None]:
@@ -127,110 +207,374 @@ class State:
     @property
     def vertices(self) -> Mapping[str, Info]:
         """A mapping from vertex uid to vertex Info."""
-        return Vertices(self._vertices)
+        return MappingProxyType(self._vertices)
 
     @property
     def node_ids(self) -> Mapping[str, int]:
         """A mapping from vertex uid to graph node ID."""
-        return NodeIds(self._vertices)
+        return MappingProxyType(self._node_ids)
+
+    @property
+    def indexes(self) -> Indexes:
+        """Indexes of vertex UIDs by tag, type and docname."""
+        if self._indexes is None:
+            self._indexes = Indexes.build(self._vertices)
+        return self._indexes
+
+    def tagged(self, tag: str) -> AbstractSet[str]:
+        """The UIDs of the vertices with the given tag.
+
+        This is an index lookup, and doesn't scan the vertices.
+        """
+        return self.indexes.tags.get(tag, _EMPTY).keys()
+
+    def of_type(self, vertex_type: str) -> AbstractSet[str]:
+        """The UIDs of the vertices of the given type.
+
+        This is an index lookup, and doesn't scan the vertices.
+        """
+        return self.indexes.types.get(vertex_type, _EMPTY).keys()
+
+    def in_document(self, docname: str) -> AbstractSet[str]:
+        """The UIDs of the vertices in the given document.
+
+        This is an index lookup, and doesn't scan the vertices.
+        """
+        return dict.fromkeys(self.indexes.docnames.get(docname, ())).keys()
+
+    @staticmethod
+    def all_of(*groups: AbstractSet[str]) -> AbstractSet[str]:
+        """The UIDs which are in every one of the given groups.
+
+        The intersection is computed starting from the smallest group. The result is
+        ordered as the smallest group.
+        """
+        if not groups:
+            return frozenset()
+        smallest, *rest = sorted(groups, key=len)
+        return dict.fromkeys(
+            uid for uid in smallest if all(uid in group for group in rest)
+        ).keys()
+
+    @staticmethod
+    def any_of(*groups: AbstractSet[str]) -> AbstractSet[str]:
+        """The UIDs which are in any of the given groups.
+
+        The result is ordered as the groups, in the order given.
+        """
+        return dict.fromkeys(uid for group in groups for uid in group).keys()
 
     def children(self, uid: str) -> Iterable[str]:
         """Iterate over the children of the given node."""
-        node_id, _info = self._vertices[uid]
-        yield from self._graph.successors(node_id)
+        yield from self._graph.successors(self._node_ids[uid])
+
+    def is_ancestor(self, ancestor: str, uid: str) -> bool:
+        """Whether there is a path from one node to another.
+
+        A node is never its own ancestor.
+        """
+        if self._reachability is not None:
+            return self._reachability.is_ancestor(ancestor, uid)
+        return ancestor != uid and rx.has_path(
+            self._graph, self._node_ids[ancestor], self._node_ids[uid]
+        )
 
     def ancestors(self, uid: str) -> Iterable[str]:
-        """Recursively find all direct parents and ancestors of the given node."""
-        node_id = self.node_ids[uid]
+        """Recursively find all direct parents and ancestors of the given node.
+
+        If the reachability index is enabled, this is a lookup rather than a search.
+        """
+        if self._reachability is not None:
+            yield from self._reachability.ancestors(uid)
+            return
+        node_id = self._node_ids[uid]
         yield from (
             self.graph[anc_node_id] for anc_node_id in rx.ancestors(self.graph, node_id)
         )
 
     def descendants(self, uid: str) -> Iterable[str]:
-        """Recursively find all direct children and descendants of the given node."""
-        node_id = self.node_ids[uid]
+        """Recursively find all direct children and descendants of the given node.
+
+        If the reachability index is enabled, this is a lookup rather than a search.
+        """
+        if self._reachability is not None:
+            yield from self._reachability.descendants(uid)
+            return
+        node_id = self._node_ids[uid]
         yield from (
             self.graph[desc_node_id]
             for desc_node_id in rx.descendants(self.graph, node_id)
         )
 
 
-class Vertices(Mapping[str, Info]):
-    """A dict-like view of vertex Info keyed by vertex ID."""
-
-    def __init__(self, vertices: dict[str, tuple[int, Info]]) -> None:
-        self._vertices = vertices
-
-    def __getitem__(self, key: str) -> Info:
-        _node_id, info = self._vertices[key]
-        return info
-
-    def __iter__(self) -> Iterator[str]:
-        return iter(self._vertices)
-
-    def __len__(self) -> int:
-        return len(self._vertices)
+_EMPTY: Mapping[str, None] = MappingProxyType({})
 
 
-class NodeIds(Mapping[str, int]):
-    """A dict-like view of graph node IDs keyed by vertex ID."""
+@dataclass(frozen=True)
+class Indexes:
+    """Indexes of vertex UIDs, so that vertices can be found without a full scan.
 
-    def __init__(self, vertices: dict[str, tuple[int, Info]]) -> None:
-        self._vertices = vertices
+    The indexes are kept up to date as documents are read and purged. Each index maps
+    a key to the UIDs of the matching vertices, as an insertion-ordered set.
 
-    def __getitem__(self, key: str) -> int:
-        node_id, _info = self._vertices[key]
-        return node_id
+    Args:
+        tags: a mapping from tag to the UIDs of the vertices with that tag
+        types: a mapping from vertex type to the UIDs of the vertices of that type
+        docnames: a mapping from docname to the UIDs of the vertices in that document
+    """
 
-    def __iter__(self) -> Iterator[str]:
-        return iter(self._vertices)
+    tags: Mapping[str, Mapping[str, None]]
+    types: Mapping[str, Mapping[str, None]]
+    docnames: Mapping[str, list[str]]
 
-    def __len__(self) -> int:
-        return len(self._vertices)
+    @classmethod
+    def build(cls, vertices: Mapping[str, Info]) -> Indexes:
+        """Build the indexes from scratch."""
+        tags: dict[str, dict[str, None]] = {}
+        types: dict[str, dict[str, None]] = {}
+        docnames: dict[str, list[str]] = {}
+        for uid, info in vertices.items():
+            for tag in info.tags:
+                tags.setdefault(tag, {})[uid] = None
+            if info.type is not None:
+                types.setdefault(info.type, {})[uid] = None
+            docnames.setdefault(info.docname, []).append(uid)
+        return cls(tags, types, docnames)
 
 
 def build_graph_edges(
-    vertices: Mapping[str, tuple[int, Info]], graph: rx.PyDiGraph[str, str | None]
+    vertices: Mapping[str, Info],
+    node_ids: Mapping[str, int],
+    graph: rx.PyDiGraph[str, str | None],
+    uids: Iterable[str] | None = None,
 ) -> None:
-    """Build the graph from the list of vertices.
+    """Add the 'parent' edges to the graph from the list of vertices.
 
-    This is called during setup, and doesn't need to be called again.
+    Also checks each link for missing parents and suspect fingerprints.
+
+    Args:
+        vertices: a mapping from vertex UID to vertex Info
+        node_ids: a mapping from vertex UID to graph node ID
+        graph: the vertex graph
+        uids: the vertices whose parent links should be (re)built. Any existing links
+            to their parents are replaced. If ``None``, the links of every vertex are
+            built.
     """
-    # add all 'parent' edges
-    for uid, (node_id, info) in vertices.items():
-        fingerprints_required = info.config.require_fingerprints
+    for uid in vertices if uids is None else uids:
+        node_id = node_ids[uid]
+        info = vertices[uid]
+        graph.remove_edges_from([
+            (parent_node_id, node_id)
+            for parent_node_id in graph.predecessor_indices(node_id)
+        ])
         for parent_uid, fingerprint in info.parents.items():
             try:
-                parent_node_id, parent = vertices[parent_uid]
-                graph.add_edge(parent_node_id, node_id, fingerprint)
+                parent_node_id = node_ids[parent_uid]
+                parent = vertices[parent_uid]
             except KeyError as e:
-                msg = (
-                    f"vertex '{uid}' has a parent link to '{parent_uid}',"
-                    f" but '{parent_uid}' doesn't exist"
-                )
+                msg = missing_parent(uid, parent_uid)
                 logger.exception(msg)
                 raise SphinxError(msg) from e
-            if fingerprints_required and fingerprint is None:
-                logger.warning(
-                    f"link fingerprints are required, but {uid} doesn't have a"
-                    f" fingerprint for its link to its parent {parent_uid}.\nthe"
-                    f" fingerprint can be added by changing the parent reference on"
-                    f" {uid} to '{parent_uid}:{parent.fingerprint}'.",
-                )
-            if fingerprint and fingerprint != parent.fingerprint:
-                logger.warning(
-                    f"suspect link found. vertex {uid} is linked to vertex"
-                    f" {parent_uid} with a fingerprint of '{fingerprint}', but"
-                    f" {parent_uid}'s fingerprint is '{parent.fingerprint}'.\n{uid}"
-                    " should be reviewed, and the link fingerprint manually updated.",
-                )
-    cycles = [
-        [graph[node_id] for node_id in node_ids] for node_ids in rx.simple_cycles(graph)
-    ]
-    if cycles:
-        suffix = ", ".join(
-            f"[{uids[0]} -> {' -> '.join(uids[1:])} -> {uids[0]}]" for uids in cycles
+            graph.add_edge(parent_node_id, node_id, fingerprint)
+            check_link(uid, info, parent_uid, parent)
+
+
+def missing_parent(uid: str, parent_uid: str) -> str:
+    """The error message for a link to a parent which doesn't exist."""
+    return (
+        f"vertex '{uid}' has a parent link to '{parent_uid}',"
+        f" but '{parent_uid}' doesn't exist"
+    )
+
+
+def missing_fingerprint(uid: str, parent_uid: str, fingerprint: str | None) -> str:
+    """The warning message for a link without a fingerprint, when one is required.
+
+    Args:
+        uid: the UID of the vertex
+        parent_uid: the UID of the parent
+        fingerprint: the fingerprint of the parent, if it's known
+    """
+    msg = (
+        f"link fingerprints are required, but {uid} doesn't have a"
+        f" fingerprint for its link to its parent {parent_uid}."
+    )
+    if fingerprint is None:
+        return msg
+    return (
+        f"{msg}\nthe fingerprint can be added by changing the parent reference on"
+        f" {uid} to '{parent_uid}:{fingerprint}'."
+    )
+
+
+def check_link(
+    uid: str,
+    info: Info,
+    parent_uid: str,
+    parent: Info,
+    *,
+    location: tuple[str, int] | None = None,
+) -> None:
+    """Check the fingerprint of the link from a vertex to one of its parents.
+
+    Args:
+        uid: the UID of the vertex
+        info: the vertex
+        parent_uid: the UID of the parent
+        parent: the parent vertex
+        location: the (docname, line) of the vertex, for any messages
+    """
+    fingerprint = info.parents[parent_uid]
+    if info.config.require_fingerprints and fingerprint is None:
+        logger.warning(
+            missing_fingerprint(uid, parent_uid, parent.fingerprint),
+            location=location,
+        )
+    if fingerprint and fingerprint == parent.legacy_fingerprint:
+        logger.info(
+            f"vertex {uid} is linked to vertex {parent_uid} with a legacy"
+            f" fingerprint. the link can be migrated by changing the parent"
+            f" reference on {uid} to '{parent_uid}:{parent.fingerprint}'.",
+            location=location,
         )
+    elif fingerprint and fingerprint != parent.fingerprint:
+        logger.warning(
+            f"suspect link found. vertex {uid} is linked to vertex"
+            f" {parent_uid} with a fingerprint of '{fingerprint}', but"
+            f" {parent_uid}'s fingerprint is '{parent.fingerprint}'.\n{uid}"
+            " should be reviewed, and the link fingerprint manually updated.",
+            location=location,
+        )
+
+
+def reachable(
+    graph: rx.PyDiGraph[str, str | None],
+    node_ids: Iterable[int],
+) -> set[int]:
+    """Find the given nodes and every node reachable from them."""
+    seen = set(node_ids)
+    queue = deque(seen)
+    while queue:
+        for successor in graph.successor_indices(queue.popleft()):
+            if successor not in seen:
+                seen.add(successor)
+                queue.append(successor)
+    return seen
+
+
+def find_cycles(graph: rx.PyDiGraph[str, str | None]) -> list[list[int]]:
+    """Find the non-trivial strongly connected components of the graph.
+
+    Every component returned contains at least one cycle. This runs in linear time,
+    unlike enumerating every elementary cycle.
+
+    Returns:
+        a list of components, each of which is a list of graph node IDs sorted by
+        vertex UID. Components are ordered by their first vertex UID.
+    """
+    components = [
+        sorted(component, key=graph.__getitem__)
+        for component in rx.strongly_connected_components(graph)
+        if len(component) > 1 or graph.has_edge(component[0], component[0])
+    ]
+    return sorted(components, key=lambda component: graph[component[0]])
+
+
+def representative_cycle(
+    graph: rx.PyDiGraph[str, str | None],
+    component: list[int],
+) -> list[int]:
+    """Find the shortest cycle through the first node of a strongly connected component.
+
+    Args:
+        graph: the vertex graph
+        component: the node IDs of a non-trivial strongly connected component
+
+    Returns:
+        the node IDs of the cycle, in order, starting at the first node of the
+        component. The first node is not repeated at the end.
+    """
+    start = component[0]
+    members = set(component)
+    predecessors: dict[int, int] = {}
+    queue = deque([start])
+    while queue:
+        node_id = queue.popleft()
+        for successor in graph.successor_indices(node_id):
+            if successor == start:
+                cycle = [node_id]
+                while cycle[-1] != start:
+                    cycle.append(predecessors[cycle[-1]])
+                cycle.reverse()
+                return cycle
+            if successor in members and successor not in predecessors:
+                predecessors[successor] = node_id
+                queue.append(successor)
+    err_msg = f"node {start} is not part of a cycle"
+    raise ValueError(err_msg)
+
+
+def check_cycles(
+    graph: rx.PyDiGraph[str, str | None],
+    node_ids: Collection[int] | None = None,
+    *,
+    limit: int | None = None,
+    members: bool = False,
+) -> None:
+    """Check the graph for cyclic dependencies, and report any that are found.
+
+    One representative cycle is reported for each strongly connected component which
+    contains a cycle.
+
+    Args:
+        graph: the vertex graph
+        node_ids: if set, only components containing at least one of these nodes are
+            checked. Only the part of the graph reachable from these nodes is
+            searched.
+        limit: the maximum number of cycles to report. If ``None``, all are reported.
+            If zero, only the number of cycles is reported.
+        members: whether to also list every vertex in each strongly connected
+            component.
+    """
+    if node_ids is not None:
+        reachable_ids = reachable(graph, node_ids)
+        if len(reachable_ids) < graph.num_nodes():
+            # any cycle through the given nodes lies entirely in the reachable subgraph
+            affected = {graph[node_id] for node_id in node_ids}
+            graph = graph.subgraph(sorted(reachable_ids))
+            components = [
+                component
+                for component in find_cycles(graph)
+                if any(graph[node_id] in affected for node_id in component)
+            ]
+        else:
+            components = find_cycles(graph)
+    else:
+        components = find_cycles(graph)
+    if not components:
+        return
+
+    if limit == 0:
+        count = len(components)
         logger.warning(
-            f"vertices must not have cyclic dependencies. cycles detected: {suffix}"
+            "vertices must not have cyclic dependencies."
+            f" {count} {'cycle' if count == 1 else 'cycles'} detected"
         )
+        return
+
+    reported = components if limit is None else components[:limit]
+    descriptions = []
+    for component in reported:
+        uids = [graph[node_id] for node_id in representative_cycle(graph, component)]
+        description = f"[{' -> '.join([*uids, uids[0]])}]"
+        if members:
+            member_uids = ", ".join(graph[node_id] for node_id in component)
+            description += f" (members: {member_uids})"
+        descriptions.append(description)
+
+    suffix = ", ".join(descriptions)
+    if len(reported) < len(components):
+        suffix += f", and {len(components) - len(reported)} more"
+    logger.warning(
+        f"vertices must not have cyclic dependencies. cycles detected: {suffix}"
+    )
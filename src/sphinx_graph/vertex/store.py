@@ -0,0 +1,341 @@
+"""Storage for the vertex graph, and its serialised form.
+
+Sphinx pickles the build environment after every build, and worker processes pickle
+it back to the main process during parallel reads. The vertex store is pickled in a
+compact, columnar form rather than as a graph of Python objects.
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import rustworkx as rx
+from sphinx.util import logging
+
+from sphinx_graph.vertex.cache import QueryCache
+from sphinx_graph.vertex.info import Info
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+    from sphinx_graph.vertex.config import Config
+    from sphinx_graph.vertex.reachability import ReachabilityIndex
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Store",
+]
+
+# the version of the serialised form. This must be incremented whenever it changes.
+VERSION = 4
+
+# a mapping from vertex UID to (source digest, fingerprint, legacy fingerprint)
+Cache = dict[str, tuple[bytes, str, str | None]]
+
+
+class Columns(NamedTuple):
+    """The serialised form of a store, as parallel columns.
+
+    It is pickled as a dict keyed by field name (under the version), so that a
+    missing or unexpected field is detected when it's restored.
+
+    Args:
+        uids: the UID of each vertex
+        docnames: each distinct docname
+        docname_index: the index of the docname of each vertex
+        configs: each distinct vertex configuration
+        config_index: the index of the configuration of each vertex
+        fingerprints: the fingerprint of each vertex
+        legacy_fingerprints: the legacy fingerprint of each vertex
+        tags: the tags of each vertex
+        types: the type of each vertex
+        parent_offsets: the offsets into the parent columns of the links of each
+            vertex. The links of the i-th vertex are between the i-th and the
+            (i+1)-th offsets.
+        parent_uids: the UIDs of the parents, for every link
+        parent_fingerprints: the fingerprints, for every link
+        graph_uids: the UID of each graph node
+        edges: pairs of indices into ``graph_uids``, for each edge
+        edge_fingerprints: the fingerprint of each edge
+        dirty: the UIDs of the dirty vertices
+        fingerprint_cache: the cached fingerprints of the vertices
+    """
+
+    uids: list[str]
+    docnames: list[str]
+    docname_index: array[int]
+    configs: list[Config]
+    config_index: array[int]
+    fingerprints: list[str]
+    legacy_fingerprints: list[str | None]
+    tags: list[list[str]]
+    types: list[str | None]
+    parent_offsets: array[int]
+    parent_uids: list[str]
+    parent_fingerprints: list[str | None]
+    graph_uids: list[str]
+    edges: array[int]
+    edge_fingerprints: list[str | None]
+    dirty: list[str]
+    fingerprint_cache: Cache
+
+
+class Store:
+    """Storage for all vertex information in a build environment.
+
+    Args:
+        vertices: a mapping from vertex UID to vertex Info
+        docnames: a mapping from docname to the UIDs of the vertices in that document
+        referrers: a mapping from parent UID to the UIDs of the vertices which link
+            to it
+        tags: a mapping from tag to the UIDs of the vertices with that tag
+        types: a mapping from vertex type to the UIDs of the vertices of that type
+        dirty: the UIDs of vertices which have been added or removed since the graph
+            was last built
+        node_ids: a mapping from vertex UID to graph node ID
+        graph: the graph of relationships between vertices
+        fingerprints: a cache of vertex fingerprints, keyed by vertex UID
+        reachability: an index of the ancestors and descendants of each vertex, if
+            enabled. This isn't serialised, and is rebuilt after the store is restored.
+        version: incremented whenever the graph changes. This isn't serialised.
+        query_cache: a cache of query results for the current version of the graph.
+            This isn't serialised.
+        valid: whether the store was restored successfully. If not, the store is
+            empty and every document must be re-read.
+        reading: whether documents are being read. If so, only the vertices read
+            since (the dirty vertices) are serialised, without the graph, for a
+            worker process in a parallel read to send back. This isn't serialised.
+    """
+
+    def __init__(self) -> None:
+        """Create a new, empty store."""
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty the store, and mark it as valid."""
+        self.vertices: dict[str, Info] = {}
+        self.docnames: dict[str, list[str]] = {}
+        # dicts are used as insertion-ordered sets, so that iteration is deterministic
+        self.referrers: dict[str, dict[str, None]] = {}
+        self.tags: dict[str, dict[str, None]] = {}
+        self.types: dict[str, dict[str, None]] = {}
+        self.dirty: set[str] = set()
+        self.node_ids: dict[str, int] = {}
+        self.graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+        self.fingerprints: Cache = {}
+        self.reachability: ReachabilityIndex | None = None
+        self.version = 0
+        self.query_cache = QueryCache()
+        self.valid = True
+        self.reading = False
+
+    @classmethod
+    def read(cls, env: BuildEnvironment) -> Store:
+        """Get the Store for the given environment, creating it if necessary."""
+        store: Store | None = getattr(env, "graph_store", None)
+        if store is None:
+            store = Store()
+            env.graph_store = store  # type: ignore[attr-defined]
+        return store
+
+    def add(self, uid: str, info: Info) -> None:
+        """Add a vertex, and index it."""
+        self.vertices[uid] = info
+        self.docnames.setdefault(info.docname, []).append(uid)
+        for parent_uid in info.parents:
+            self.referrers.setdefault(parent_uid, {})[uid] = None
+        for tag in info.tags:
+            self.tags.setdefault(tag, {})[uid] = None
+        if info.type is not None:
+            self.types.setdefault(info.type, {})[uid] = None
+
+    def remove(self, uid: str) -> Info:
+        """Remove a vertex, and remove it from every index except ``docnames``."""
+        info = self.vertices.pop(uid)
+        for parent_uid in info.parents:
+            _discard(self.referrers, parent_uid, uid)
+        for tag in info.tags:
+            _discard(self.tags, tag, uid)
+        if info.type is not None:
+            _discard(self.types, info.type, uid)
+        return info
+
+    def __getstate__(self) -> tuple[int, dict[str, Any]]:
+        """Serialise the store in a compact, columnar form.
+
+        Vertex records are stored as parallel columns, with repeated docnames and
+        configuration stored once. The graph is stored as pairs of indices into a
+        column of vertex UIDs.
+
+        While documents are being read (by a worker process in a parallel read), only
+        the vertices read are serialised (without the graph), since they are all the
+        main process needs.
+        """
+        uids = [uid for uid in self.vertices if not self.reading or uid in self.dirty]
+        infos = [self.vertices[uid] for uid in uids]
+
+        docnames: dict[str, int] = {}
+        configs: dict[int, tuple[int, Config]] = {}
+        docname_index = array("L")
+        config_index = array("L")
+        parent_offsets = array("L", [0])
+        parent_uids: list[str] = []
+        parent_fingerprints: list[str | None] = []
+        for info in infos:
+            docname_index.append(docnames.setdefault(info.docname, len(docnames)))
+            config_index.append(
+                configs.setdefault(id(info.config), (len(configs), info.config))[0]
+            )
+            parent_uids.extend(info.parents)
+            parent_fingerprints.extend(info.parents.values())
+            parent_offsets.append(len(parent_uids))
+
+        graph_uids = [] if self.reading else list(self.node_ids)
+        positions = {self.node_ids[uid]: i for i, uid in enumerate(graph_uids)}
+        edges = array("L")
+        edge_fingerprints: list[str | None] = []
+        if not self.reading:
+            for parent_id, child_id, fingerprint in self.graph.weighted_edge_list():
+                edges.extend((positions[parent_id], positions[child_id]))
+                edge_fingerprints.append(fingerprint)
+
+        columns = Columns(
+            uids=uids,
+            docnames=list(docnames),
+            docname_index=docname_index,
+            configs=[config for _index, config in configs.values()],
+            config_index=config_index,
+            fingerprints=[info.fingerprint for info in infos],
+            legacy_fingerprints=[info.legacy_fingerprint for info in infos],
+            tags=[info.tags for info in infos],
+            types=[info.type for info in infos],
+            parent_offsets=parent_offsets,
+            parent_uids=parent_uids,
+            parent_fingerprints=parent_fingerprints,
+            graph_uids=graph_uids,
+            edges=edges,
+            edge_fingerprints=edge_fingerprints,
+            dirty=list(self.dirty),
+            fingerprint_cache={
+                uid: self.fingerprints[uid] for uid in uids if uid in self.fingerprints
+            },
+        )
+        return VERSION, columns._asdict()
+
+    def __setstate__(self, state: tuple[int, dict[str, Any]]) -> None:
+        """Restore the store from its serialised form.
+
+        If the serialised form is from a different version, or is corrupt, the store
+        is left empty and marked as invalid.
+        """
+        self._reset()
+        try:
+            self._restore(state)
+        except (TypeError, ValueError, IndexError, KeyError):
+            self._reset()
+            self.valid = False
+
+    def _restore(self, state: tuple[int, dict[str, Any]]) -> None:
+        """Restore the store from its serialised form.
+
+        Raises:
+            ValueError: If the serialised form is from a different version.
+            TypeError: If a column is missing, or unexpected.
+        """
+        version, fields = state
+        if version != VERSION:
+            err_msg = f"unsupported vertex store version: {version}"
+            raise ValueError(err_msg)
+        columns = Columns(**fields)
+        for uid, info in _decode_vertices(columns):
+            self.add(uid, info)
+        self._restore_graph(columns)
+        self.dirty = set(columns.dirty)
+        self.fingerprints = dict(columns.fingerprint_cache)
+
+    def _restore_graph(self, columns: Columns) -> None:
+        """Restore the graph from pairs of indices into a column of vertex UIDs."""
+        graph_uids, edges = columns.graph_uids, columns.edges
+        node_ids = self.graph.add_nodes_from(graph_uids)
+        self.node_ids = dict(zip(graph_uids, node_ids, strict=True))
+        self.graph.add_edges_from([
+            (node_ids[edges[i]], node_ids[edges[i + 1]], fingerprint)
+            for i, fingerprint in zip(
+                range(0, len(edges), 2), columns.edge_fingerprints, strict=True
+            )
+        ])
+
+
+def _decode_vertices(columns: Columns) -> Iterator[tuple[str, Info]]:
+    """Decode the columns of vertex records into (UID, Info) pairs."""
+    parents = _decode_parents(
+        columns.parent_offsets, columns.parent_uids, columns.parent_fingerprints
+    )
+    for i, (uid, vertex_parents) in enumerate(zip(columns.uids, parents, strict=True)):
+        yield (
+            uid,
+            Info(
+                docname=columns.docnames[columns.docname_index[i]],
+                config=columns.configs[columns.config_index[i]],
+                parents=vertex_parents,
+                fingerprint=columns.fingerprints[i],
+                tags=columns.tags[i],
+                legacy_fingerprint=columns.legacy_fingerprints[i],
+                type=columns.types[i],
+            ),
+        )
+
+
+def _decode_parents(
+    offsets: array[int], uids: list[str], fingerprints: list[str | None]
+) -> Iterator[dict[str, str | None]]:
+    """Decode the parent links of each vertex from the columns of parent links.
+
+    The links of the i-th vertex are between the i-th and the (i+1)-th offsets.
+    """
+    for start, end in pairwise(offsets):
+        yield dict(zip(uids[start:end], fingerprints[start:end], strict=True))
+
+
+def _discard(index: dict[str, dict[str, None]], key: str, uid: str) -> None:
+    """Remove a UID from an index, removing the key if nothing is left."""
+    uids = index[key]
+    uids.pop(uid, None)
+    if not uids:
+        del index[key]
+
+
+def start_reading(_app: Sphinx, env: BuildEnvironment, _docnames: list[str]) -> None:
+    """Serialise only the vertices read from now on, for parallel read workers."""
+    Store.read(env).reading = True
+
+
+def finish_reading(_app: Sphinx, env: BuildEnvironment) -> None:
+    """Serialise the whole store again, once every document has been read."""
+    Store.read(env).reading = False
+
+
+def check_valid(
+    _app: Sphinx,
+    env: BuildEnvironment,
+    _added: set[str],
+    _changed: set[str],
+    _removed: set[str],
+) -> list[str]:
+    """Re-read every document if the vertex store couldn't be restored.
+
+    Returns:
+        the documents which must be re-read.
+    """
+    store = Store.read(env)
+    if store.valid:
+        return []
+    logger.info("vertex data is missing or out of date. re-reading all documents.")
+    store.valid = True
+    return list(env.found_docs)
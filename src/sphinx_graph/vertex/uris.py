@@ -0,0 +1,65 @@
+"""A cache of relative URIs between documents, for links between vertices."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sphinx_graph.instrumentation import Instrumentation
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.builders import Builder
+
+__all__ = [
+    "UriCache",
+    "reset_uri_cache",
+    "uri_cache",
+]
+
+
+class UriCache:
+    """A cache of relative URIs, keyed by (from_docname, to_docname).
+
+    Every parent and child of every vertex, and every row of every vertex table, links
+    to another document. Most links on a page point into the same few documents, so
+    each relative URI is only computed once per build.
+
+    Args:
+        hits: the number of URIs found in the cache
+        misses: the number of URIs which had to be computed by the builder
+    """
+
+    def __init__(self, builder: Builder) -> None:
+        """Create a new, empty cache for the given builder."""
+        self._builder = builder
+        self._uris: dict[tuple[str, str], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, from_docname: str, to_docname: str) -> str:
+        """The URI of one document, relative to another."""
+        key = (from_docname, to_docname)
+        uri = self._uris.get(key)
+        if uri is None:
+            self.misses += 1
+            with Instrumentation.read(self._builder.env).time("uri.resolve"):
+                uri = self._uris[key] = self._builder.get_relative_uri(*key)
+        else:
+            self.hits += 1
+        return uri
+
+
+def uri_cache(builder: Builder) -> UriCache:
+    """The relative URI cache for the current build.
+
+    The cache is stored on the builder, so it is never pickled with the environment.
+    """
+    cache: UriCache | None = getattr(builder, "graph_uri_cache", None)
+    if cache is None:
+        cache = builder.graph_uri_cache = UriCache(builder)  # type: ignore[attr-defined]
+    return cache
+
+
+def reset_uri_cache(app: Sphinx) -> None:
+    """Start each build with an empty cache."""
+    app.builder.graph_uri_cache = UriCache(app.builder)  # type: ignore[attr-defined]
@@ -0,0 +1,7 @@
+from sphinx_graph import Config
+
+extensions = [
+    "sphinx_graph",
+]
+
+graph_config = Config(max_reported_cycles=1, report_cycle_members=True)
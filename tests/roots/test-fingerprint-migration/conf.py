@@ -0,0 +1,11 @@
+from sphinx_graph import Config, FingerprintConfig, VertexConfig
+
+extensions = [
+    "sphinx_graph",
+]
+
+
+graph_config = Config(
+    vertex_config=VertexConfig(require_fingerprints=True),
+    fingerprints=FingerprintConfig(algorithm="blake2b", length=8, accept_legacy=True),
+)
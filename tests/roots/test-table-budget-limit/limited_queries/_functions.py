@@ -0,0 +1,18 @@
+"""Query functions for limited table budget tests."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sphinx_graph.vertex import State
+
+
+def slow(state: State) -> Iterable[str]:
+    """Every vertex, slowly."""
+    for uid in sorted(state.vertices):
+        time.sleep(0.02)
+        yield uid
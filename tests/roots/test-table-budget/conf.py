@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+from sphinx_graph import Config
+
+sys.path.append(str(Path.cwd()))
+
+from slow_queries import slow
+
+graph_config = Config(
+    queries={"slow": slow}, query_budget=0.01, query_profiles="profiles"
+)
+
+extensions = [
+    "sphinx_graph",
+]
@@ -0,0 +1,5 @@
+from ._functions import slow
+
+__all__ = [
+    "slow",
+]
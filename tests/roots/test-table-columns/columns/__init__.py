@@ -0,0 +1,5 @@
+from ._functions import parent_count
+
+__all__ = [
+    "parent_count",
+]
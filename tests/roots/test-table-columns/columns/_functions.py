@@ -0,0 +1,13 @@
+"""Column functions for table column tests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sphinx_graph.table import Cell
+
+
+def parent_count(cell: Cell) -> str:
+    """The number of parents of the vertex."""
+    return str(len(cell.info.parents))
@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+from sphinx_graph import Config, VertexConfig
+
+sys.path.append(str(Path.cwd()))
+
+from columns import parent_count
+
+graph_config = Config(
+    types={"req": VertexConfig()},
+    columns={"parent count": parent_count},
+)
+
+extensions = [
+    "sphinx_graph",
+]
@@ -0,0 +1,8 @@
+from sphinx_graph import Config
+
+extensions = [
+    "sphinx_graph",
+]
+
+
+graph_config = Config(query_workers=2)
@@ -1,3 +1,12 @@
+from sphinx_graph import Config, VertexConfig
+
 extensions = [
     "sphinx_graph",
 ]
+
+
+graph_config = Config(
+    types={
+        "req": VertexConfig(),
+    },
+)
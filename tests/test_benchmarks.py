@@ -0,0 +1,46 @@
+import subprocess  # noqa: S404
+from pathlib import Path
+
+import pytest
+
+from benchmarks.generate import Corpus, generate
+from benchmarks.run import build, compare, measure
+
+
+@pytest.mark.parametrize("reachability", [False, True])
+def test_generated_project_builds(tmp_path: Path, reachability: bool) -> None:  # noqa: FBT001
+    corpus = Corpus(
+        vertices=60,
+        documents=6,
+        tables=3,
+        fingerprints=True,
+        reachability=reachability,
+    )
+    generate(corpus, tmp_path / "src")
+    metrics = build(tmp_path / "src", tmp_path / "out", jobs=1)
+
+    assert (tmp_path / "out" / "doc-0005.html").exists()
+    assert metrics["read.seconds"] > 0
+    assert metrics["graph_build.seconds"] > 0
+    assert (metrics["reachability.seconds"] > 0) == reachability
+
+
+def test_compare() -> None:
+    baselines = {"small-j1": {"read.seconds": 1.0, "peak_memory.megabytes": 100.0}}
+    results = {"small-j1": {"read.seconds": 1.2, "peak_memory.megabytes": 200.0}}
+
+    assert compare(results, baselines, threshold=0.25) == [
+        "small-j1 peak_memory.megabytes: 200.000 (baseline 100.000, +100%)"
+    ]
+    # small absolute differences are ignored
+    results = {"small-j1": {"read.seconds": 0.04}}
+    assert compare(results, {"small-j1": {"read.seconds": 0.01}}, 0.25) == []
+
+
+def test_measure_shows_errors(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "conf.py").write_text('raise RuntimeError("broken project")\n')
+    with pytest.raises(subprocess.CalledProcessError):
+        measure(tmp_path, jobs=1, repeat=1)
+    assert "broken project" in capsys.readouterr().err
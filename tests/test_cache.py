@@ -0,0 +1,34 @@
+from collections.abc import Iterable
+
+from sphinx_graph.vertex import impure
+from sphinx_graph.vertex.cache import QueryCache, is_impure
+
+
+def test_query_cache() -> None:
+    cache = QueryCache()
+    calls: list[str] = []
+
+    def run() -> Iterable[str]:
+        calls.append("run")
+        yield from ["01", "02"]
+
+    assert cache.get("query", {"a": 1, "b": [2]}, 1, run) == ("01", "02")
+    assert cache.get("query", {"b": [2], "a": 1}, 1, run) == ("01", "02")
+    assert (cache.hits, cache.misses, len(calls)) == (1, 1, 1)
+
+    cache.get("query", {"a": 2, "b": [2]}, 1, run)
+    cache.get("other", {"a": 1, "b": [2]}, 1, run)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # results are discarded when the graph changes
+    cache.get("query", {"a": 1, "b": [2]}, 2, run)
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_impure() -> None:
+    def query() -> Iterable[str]:
+        return []
+
+    assert not is_impure(query)
+    assert impure(query) is query
+    assert is_impure(query)
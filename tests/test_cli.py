@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import pytest
+
+from sphinx_graph.cli import main
+from sphinx_graph.vertex.fingerprint import FingerprintConfig, digest
+
+CONF = (
+    "from sphinx_graph import Config, VertexConfig\n\n"
+    'extensions = ["sphinx_graph"]\n'
+    "graph_config = Config(vertex_config=VertexConfig(require_fingerprints=True))\n"
+)
+
+
+def generate(path: Path, vertices: int, documents: int) -> None:
+    """Write a project of chained vertices, with fingerprinted links."""
+    (path / "conf.py").write_text(CONF)
+    sources: list[list[str]] = [[] for _ in range(documents)]
+    for index in range(vertices):
+        source = f".. vertex:: V-{index:03d}\n"
+        if index:
+            fingerprint = digest(f"content {index - 1}", FingerprintConfig())
+            source += f"   :parents: V-{index - 1:03d}:{fingerprint}\n"
+        sources[index % documents].append(f"{source}\n   content {index}\n")
+    for document, document_sources in enumerate(sources):
+        (path / f"doc-{document}.rst").write_text("\n".join(document_sources))
+
+
+def test_check_passes(rootdir: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["check", str(rootdir / "test-parallel"), "--jobs", "2"]) == 0
+    captured = capsys.readouterr()
+    assert not captured.out
+    assert captured.err == "checked 5 vertices in 7 documents: 0 problems found\n"
+
+
+@pytest.mark.parametrize(
+    ("root", "expected"),
+    [
+        (
+            "test-finalise",
+            "child.rst:4: warning: suspect link found. vertex 02 is linked to",
+        ),
+        (
+            "test-missing-fingerprint",
+            "index.rst:5: warning: link fingerprints are required",
+        ),
+        ("test-cycle", "warning: vertices must not have cyclic dependencies"),
+        ("test-duplicate-ids", "index.rst:5: error: Vertex 001 already exists."),
+        (
+            "test-invalid-parent",
+            (
+                "index.rst:5: error: vertex '02' has a parent link to '03', but '03'"
+                " doesn't exist"
+            ),
+        ),
+        (
+            "test-regex",
+            "index.rst:6: error: vertex '02' doesn't satisfy the configured regex",
+        ),
+    ],
+)
+def test_check_reports_problems(
+    rootdir: Path, capsys: pytest.CaptureFixture[str], root: str, expected: str
+) -> None:
+    assert main(["check", str(rootdir / root), "--jobs", "1"]) == 1
+    assert capsys.readouterr().out.startswith(expected)
+
+
+def test_check_generated_project(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    generate(tmp_path, vertices=200, documents=10)
+    assert main(["check", str(tmp_path), "--jobs", "2"]) == 0
+    assert capsys.readouterr().err == (
+        "checked 200 vertices in 10 documents: 0 problems found\n"
+    )
+
+
+def test_check_unverified_fingerprints(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "conf.py").write_text('extensions = ["sphinx_graph"]\n')
+    (tmp_path / "index.rst").write_text(
+        ".. vertex:: 01\n\n   *emphasised* content\n\n"
+        ".. vertex:: 02\n   :parents: 01:abcd\n\n   plain content\n"
+    )
+    assert main(["check", str(tmp_path)]) == 0
+    assert capsys.readouterr().err == (
+        "checked 2 vertices in 1 documents: 0 problems found, 1 link fingerprints"
+        " not checked (content has markup)\n"
+    )
+
+
+def test_check_missing_fingerprint_unknown_parent(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "conf.py").write_text(CONF)
+    (tmp_path / "index.rst").write_text(
+        ".. vertex:: 01\n\n   *emphasised* content\n\n"
+        ".. vertex:: 02\n   :parents: 01\n\n   plain content\n"
+    )
+    assert main(["check", str(tmp_path)]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == (
+        "index.rst:5: warning: link fingerprints are required, but 02 doesn't have a"
+        " fingerprint for its link to its parent 01.\n"
+    )
+    assert captured.err == "checked 2 vertices in 1 documents: 1 problems found\n"
+
+
+def test_check_skips_build_output(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "conf.py").write_text(
+        'extensions = ["sphinx_graph"]\n'
+        'html_static_path = ["_static"]\n'
+        'html_extra_path = ["_extra"]\n'
+    )
+    source = ".. vertex:: 01\n\n   content\n"
+    # copies of the source in the build output, and the HTML builder's assets
+    for path in ("index.rst", "_static/index.rst", "_extra/index.rst", "out/index.rst"):
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text(source)
+
+    assert main(["check", str(tmp_path), "--outdir", str(tmp_path / "out")]) == 0
+    assert capsys.readouterr().err == (
+        "checked 1 vertices in 1 documents: 0 problems found\n"
+    )
@@ -1,4 +1,8 @@
-from sphinx_graph import vertex
+import pytest
+from sphinx.errors import ConfigError
+
+from sphinx_graph import Config, vertex
+from sphinx_graph.vertex.query import noop
 
 
 def test_vertex_config_override_fingerprints() -> None:
@@ -9,3 +13,25 @@ def test_vertex_config_override_fingerprints() -> None:
     vertex_config = default_config.override(type_config).override(directive_config)
 
     assert vertex_config.require_fingerprints
+
+
+def test_select_query_name_reserved() -> None:
+    with pytest.raises(ConfigError, match="the query name 'select' is reserved"):
+        Config(queries={"select": noop})
+
+
+@pytest.mark.parametrize("workers", [0, -3])
+def test_query_workers_positive(workers: int) -> None:
+    with pytest.raises(ConfigError, match="query_workers must be at least 1"):
+        Config(query_workers=workers)
+
+
+@pytest.mark.parametrize("budget", [0, -1])
+def test_query_budget_positive(budget: float) -> None:
+    with pytest.raises(ConfigError, match="query_budget must be positive"):
+        Config(query_budget=budget)
+
+
+def test_query_profiles_require_budget() -> None:
+    with pytest.raises(ConfigError, match="query_profiles is set, but query_budget"):
+        Config(query_profiles="profiles")
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from docutils import nodes
+from sphinx.application import Sphinx
+from sphinx.errors import ConfigError
+
+from sphinx_graph import Config, FingerprintConfig
+from sphinx_graph.vertex import fingerprint
+from sphinx_graph.vertex.state import State
+from sphinx_graph.vertex.store import Store
+
+if TYPE_CHECKING:
+    from sphinx.environment import BuildEnvironment
+
+
+def test_legacy_digest() -> None:
+    assert (
+        fingerprint.digest("this is a vertex directive", fingerprint.LEGACY) == "/470"
+    )
+
+
+def test_digest_length() -> None:
+    config = FingerprintConfig(algorithm="blake2b", length=12)
+    assert len(fingerprint.digest("this is a vertex directive", config)) == 12  # noqa: PLR2004
+
+
+def test_normalise_whitespace() -> None:
+    config = FingerprintConfig(normalise_whitespace=True)
+    assert fingerprint.digest("a  b\n c", config) == fingerprint.digest("a b c", config)
+
+
+@pytest.mark.parametrize(
+    ("algorithm", "length"),
+    [("unknown", 4), ("shake_128", 4), ("md5", 0), ("md5", 25)],
+)
+def test_invalid_config(algorithm: str, length: int) -> None:
+    with pytest.raises(ConfigError):
+        FingerprintConfig(algorithm=algorithm, length=length)
+
+
+def test_fingerprint_cache() -> None:
+    env = cast(
+        "BuildEnvironment",
+        SimpleNamespace(config=SimpleNamespace(graph_config=Config())),
+    )
+    content = nodes.paragraph(text="this is a vertex directive")
+    assert fingerprint.fingerprint(env, "01", "source", content) == ("/470", None)
+
+    # unchanged source is not hashed again
+    changed = nodes.paragraph(text="this content has changed")
+    assert fingerprint.fingerprint(env, "01", "source", changed) == ("/470", None)
+    assert fingerprint.fingerprint(env, "01", "new", changed) != ("/470", None)
+
+
+def test_fingerprint_cache_keeps_digest() -> None:
+    env = cast(
+        "BuildEnvironment",
+        SimpleNamespace(config=SimpleNamespace(graph_config=Config())),
+    )
+    content = nodes.paragraph(text="this is a vertex directive")
+    fingerprint.fingerprint(env, "01", "this is a vertex directive", content)
+    key, _value, _legacy = Store.read(env).fingerprints["01"]
+    assert key == fingerprint.source_digest("this is a vertex directive")
+    assert len(key) == 16  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "source", [".. include:: other.rst", "```{include} other.md\n```"]
+)
+def test_fingerprint_includes_not_cached(source: str) -> None:
+    env = cast(
+        "BuildEnvironment",
+        SimpleNamespace(config=SimpleNamespace(graph_config=Config())),
+    )
+    content = nodes.paragraph(text="this is a vertex directive")
+    assert fingerprint.fingerprint(env, "01", source, content) == ("/470", None)
+    assert "01" not in Store.read(env).fingerprints
+
+    # the included file has changed, but the source of the vertex hasn't
+    changed = nodes.paragraph(text="this content has changed")
+    assert fingerprint.fingerprint(env, "01", source, changed) != ("/470", None)
+
+
+@pytest.mark.sphinx(testroot="fingerprint-migration", warningiserror=True)
+def test_accept_legacy_fingerprints(app: Sphinx) -> None:
+    app.build()
+    state = State.read(app.env)
+    assert len(state.vertices["01"].fingerprint) == 8  # noqa: PLR2004
+    assert state.vertices["01"].legacy_fingerprint == "/470"
@@ -1,8 +1,20 @@
+from collections.abc import Callable
+from io import StringIO
+
 import pytest
+import rustworkx as rx
 from sphinx.application import Sphinx
-from sphinx.errors import SphinxError
+from sphinx.errors import ConfigError, SphinxError
+from sphinx.testing.util import SphinxTestApp
 
-from sphinx_graph.vertex.state import DuplicateIdError, State
+from sphinx_graph import Config
+from sphinx_graph.instrumentation import Instrumentation
+from sphinx_graph.vertex.state import (
+    DuplicateIdError,
+    State,
+    find_cycles,
+    representative_cycle,
+)
 
 
 @pytest.mark.sphinx(
@@ -12,13 +24,66 @@ def test_dependency_cycle(app: Sphinx) -> None:
     with pytest.raises(
         SphinxError,
         match=(
-            r"^vertices must not have cyclic dependencies. cycles detected: \[REQ-03"
-            r" -> REQ-01 -> REQ-02 -> REQ-03\]$"
+            r"^vertices must not have cyclic dependencies. cycles detected: \[REQ-01"
+            r" -> REQ-02 -> REQ-03 -> REQ-01\]$"
         ),
     ):
         app.build()
 
 
+@pytest.mark.sphinx(
+    testroot="cycle-limit",
+    freshenv=True,
+    warningiserror=True,
+    exception_on_warning=True,
+)
+def test_dependency_cycle_limit(app: Sphinx) -> None:
+    with pytest.raises(
+        SphinxError,
+        match=(
+            r"^vertices must not have cyclic dependencies. cycles detected: \[REQ-01"
+            r" -> REQ-03 -> REQ-01\] \(members: REQ-01, REQ-02, REQ-03\), and 1 more$"
+        ),
+    ):
+        app.build()
+
+
+@pytest.mark.sphinx(
+    testroot="cycle-limit",
+    confoverrides={"graph_config": Config(max_reported_cycles=0)},
+    freshenv=True,
+    warningiserror=True,
+    exception_on_warning=True,
+)
+def test_dependency_cycle_limit_zero(app: Sphinx) -> None:
+    with pytest.raises(
+        SphinxError,
+        match=r"^vertices must not have cyclic dependencies. 2 cycles detected$",
+    ):
+        app.build()
+
+
+def test_negative_cycle_limit_not_allowed() -> None:
+    with pytest.raises(ConfigError, match="max_reported_cycles must not be negative"):
+        Config(max_reported_cycles=-1)
+
+
+def test_find_cycles() -> None:
+    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    a, b, c, d, e = graph.add_nodes_from(["A", "B", "C", "D", "E"])
+    graph.add_edges_from([
+        (a, b, None),
+        (b, c, None),
+        (c, a, None),
+        (c, d, None),
+        (e, e, None),
+    ])
+
+    assert find_cycles(graph) == [[a, b, c], [e]]
+    assert representative_cycle(graph, [a, b, c]) == [a, b, c]
+    assert representative_cycle(graph, [e]) == [e]
+
+
 @pytest.mark.sphinx(testroot="duplicate-ids", warningiserror=True)
 def test_duplicate_ids(app: Sphinx) -> None:
     with pytest.raises(DuplicateIdError):
@@ -48,3 +113,139 @@ def test_missing_required_parent(app: Sphinx) -> None:
         ),
     ):
         app.build()
+
+
+@pytest.mark.sphinx(testroot="finalise", freshenv=True)
+def test_graph_warnings_emitted_once(app: Sphinx, warning: StringIO) -> None:
+    app.build()
+    assert warning.getvalue().count("suspect link found") == 1
+
+
+@pytest.mark.sphinx(testroot="incremental", freshenv=True, warningiserror=True)
+def test_incremental_rebuild(
+    app: Sphinx, make_app: Callable[..., SphinxTestApp]
+) -> None:
+    app.build()
+    state = State.read(app.env)
+    assert set(state.vertices) == {"01", "02", "03"}
+    assert sorted(state.children("01")) == ["02", "03"]
+
+    (app.srcdir / "child.rst").write_text(
+        "Child\n-----\n\n"
+        ".. vertex:: 02\n   :parents: 01\n\n   this is a vertex directive\n\n"
+        ".. vertex:: 04\n   :parents: 02\n\n   this is a vertex directive\n",
+    )
+    app = make_app(srcdir=app.srcdir, warningiserror=True)
+    app.build()
+    state = State.read(app.env)
+    assert set(state.vertices) == {"01", "02", "04"}
+    assert list(state.children("01")) == ["02"]
+    assert list(state.children("02")) == ["04"]
+
+    # re-reading a parent must preserve the links from its (unchanged) children
+    (app.srcdir / "parent.rst").write_text(
+        "Parent\n------\n\n.. vertex:: 01\n\n   this vertex has changed\n",
+    )
+    app = make_app(srcdir=app.srcdir, warningiserror=True)
+    app.build()
+    state = State.read(app.env)
+    assert state.graph.num_nodes() == len(state.vertices)
+    assert state.graph.num_edges() == 2  # noqa: PLR2004
+    assert list(state.children("01")) == ["02"]
+    assert set(state.ancestors("04")) == {"01", "02"}
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+@pytest.mark.sphinx(testroot="incremental", freshenv=True, warningiserror=True)
+def test_incremental_move_vertex(
+    app: Sphinx,
+    make_app: Callable[..., SphinxTestApp],
+    parallel: int,
+) -> None:
+    app.build()
+
+    # move vertex '01' from 'parent' (read last) to 'child' (read first)
+    (app.srcdir / "parent.rst").write_text(
+        "Parent\n------\n\n.. vertex:: 00\n\n   this is a vertex directive\n",
+    )
+    (app.srcdir / "child.rst").write_text(
+        "Child\n-----\n\n"
+        ".. vertex:: 01\n   :parents: 00\n\n   this is a vertex directive\n\n"
+        ".. vertex:: 02\n   :parents: 01\n\n   this is a vertex directive\n",
+    )
+    app = make_app(srcdir=app.srcdir, warningiserror=True, parallel=parallel)
+    app.build()
+    state = State.read(app.env)
+    assert set(state.vertices) == {"00", "01", "02"}
+    assert state.vertices["01"].docname == "child"
+    assert list(state.children("00")) == ["01"]
+    assert state.graph.num_nodes() == len(state.vertices)
+
+
+@pytest.mark.sphinx(
+    "html", testroot="neighbourhood", freshenv=True, warningiserror=True
+)
+def test_rewrite_changed_neighbourhoods(
+    app: Sphinx, make_app: Callable[..., SphinxTestApp]
+) -> None:
+    app.build()
+    assert 'href="child.html#03"' in (app.outdir / "parent.html").read_text()
+    assert 'href="child.html#03"' in (app.outdir / "summary.html").read_text()
+
+    # only 'child' is re-read, but the vertex in 'parent' and the table in 'summary'
+    # show its vertices, so they are written again
+    (app.srcdir / "child.rst").write_text(
+        "Child\n-----\n\n"
+        ".. vertex:: 02\n   :parents: 01\n\n   this is a vertex directive\n",
+    )
+    app = make_app("html", srcdir=app.srcdir, warningiserror=True)
+    app.build()
+    assert 'href="child.html#02"' in (app.outdir / "parent.html").read_text()
+    assert 'href="child.html#03"' not in (app.outdir / "parent.html").read_text()
+    assert 'href="child.html#03"' not in (app.outdir / "summary.html").read_text()
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="neighbourhood",
+    srcdir="neighbourhood-limited",
+    freshenv=True,
+    warningiserror=True,
+)
+def test_limited_table_rewritten_when_rows_change(
+    app: Sphinx, make_app: Callable[..., SphinxTestApp]
+) -> None:
+    (app.srcdir / "summary.rst").write_text(
+        "Summary\n-------\n\n.. vertex-table::\n   :limit: 1\n"
+    )
+    app.build()
+    # the tables weren't fingerprinted before, so the query is only run to write them
+    assert Instrumentation.read(app.env).timers["query.noop"].calls == 1
+    assert 'href="parent.html#01"' in (app.outdir / "summary.html").read_text()
+
+    def add_vertex(uid: str) -> Sphinx:
+        child = (app.srcdir / "child.rst").read_text()
+        (app.srcdir / "child.rst").write_text(
+            f"{child}\n.. vertex:: {uid}\n\n   this is a vertex directive\n"
+        )
+        rebuilt = make_app("html", srcdir=app.srcdir, warningiserror=True)
+        rebuilt.build()
+        return rebuilt
+
+    # the table was only fingerprinted by its query, so the query is run to
+    # fingerprint the rows it shows, and the table is written once more
+    rebuilt = add_vertex("04")
+    assert Instrumentation.read(rebuilt.env).timers["query.noop"].calls == 2  # noqa: PLR2004
+
+    # the rows shown haven't changed, so the table isn't written again
+    rebuilt = add_vertex("05")
+    assert Instrumentation.read(rebuilt.env).timers["query.noop"].calls == 1
+
+    # the row shown has lost a child, so the table is written again
+    (app.srcdir / "child.rst").write_text(
+        "Child\n-----\n\n"
+        ".. vertex:: 02\n   :parents: 01\n\n   this is a vertex directive\n",
+    )
+    rebuilt = make_app("html", srcdir=app.srcdir, warningiserror=True)
+    rebuilt.build()
+    assert Instrumentation.read(rebuilt.env).timers["query.noop"].calls == 2  # noqa: PLR2004
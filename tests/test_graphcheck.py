@@ -0,0 +1,84 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sphinx.application import Sphinx
+from sphinx.errors import SphinxError
+from sphinx.testing.util import SphinxTestApp
+
+from sphinx_graph.instrumentation import Instrumentation
+
+
+def diagnostics(app: Sphinx) -> dict[str, Any]:
+    report: dict[str, Any] = json.loads((app.outdir / "diagnostics.json").read_text())
+    return report
+
+
+@pytest.mark.sphinx("graphcheck", testroot="parallel", parallel=2, freshenv=True)
+def test_graphcheck_passes(app: Sphinx) -> None:
+    app.build()
+    report = diagnostics(app)
+    assert report["passed"]
+    assert report["diagnostics"] == []
+    assert report["vertices"] > 0
+    # no documents are written
+    assert not list(app.outdir.glob("*.graphcheck"))
+    assert sorted(path.name for path in app.outdir.iterdir()) == ["diagnostics.json"]
+
+
+@pytest.mark.sphinx("graphcheck", testroot="finalise", freshenv=True)
+def test_graphcheck_reports_warnings(
+    app: Sphinx, make_app: Callable[..., SphinxTestApp]
+) -> None:
+    app.build()
+    report = diagnostics(app)
+    assert not report["passed"]
+    [diagnostic] = report["diagnostics"]
+    assert diagnostic["level"] == "warning"
+    assert diagnostic["message"].startswith("suspect link found. vertex 02")
+    assert diagnostic["source"] == "vertex.state"
+
+    # the whole graph is checked again, even though nothing has changed
+    app = make_app("graphcheck", srcdir=app.srcdir)
+    app.build()
+    assert diagnostics(app)["diagnostics"] == report["diagnostics"]
+
+
+@pytest.mark.sphinx("graphcheck", testroot="cycle", freshenv=True)
+def test_graphcheck_reports_cycles(app: Sphinx) -> None:
+    app.build()
+    [diagnostic] = diagnostics(app)["diagnostics"]
+    assert "cycles detected" in diagnostic["message"]
+
+
+@pytest.mark.sphinx("graphcheck", testroot="invalid-parent", freshenv=True)
+def test_graphcheck_reports_errors(app: Sphinx) -> None:
+    with pytest.raises(SphinxError):
+        app.build()
+    report = diagnostics(app)
+    assert not report["passed"]
+    assert "'03' doesn't exist" in report["exception"]
+    [diagnostic] = report["diagnostics"]
+    assert diagnostic["level"] == "error"
+
+
+@pytest.mark.sphinx("graphcheck", testroot="regex", freshenv=True)
+def test_graphcheck_reports_locations(app: Sphinx) -> None:
+    with pytest.raises(SphinxError):
+        app.build()
+    [diagnostic] = diagnostics(app)["diagnostics"]
+    assert Path(diagnostic["path"]).name == "index.rst"
+    assert diagnostic["line"] is not None
+    assert "doesn't satisfy the configured regex" in diagnostic["message"]
+
+
+@pytest.mark.sphinx("graphcheck", testroot="table-budget", freshenv=True)
+def test_graphcheck_runs_no_queries(app: Sphinx) -> None:
+    app.build()
+    # the slow query would be over budget, if it were run
+    assert diagnostics(app)["passed"]
+    assert not (app.outdir / "profiles").exists()
+    timers = Instrumentation.read(app.env).timers
+    assert not [name for name in timers if name.startswith(("query.", "table."))]
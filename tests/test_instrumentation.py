@@ -0,0 +1,75 @@
+import json
+import pickle  # noqa: S403  # only round-trips instrumentation created by the tests
+
+import pytest
+from sphinx.application import Sphinx
+
+from sphinx_graph.instrumentation import Instrumentation, Timer
+from sphinx_graph.vertex.store import Store
+
+
+def test_timers_and_counters() -> None:
+    instrumentation = Instrumentation()
+    with instrumentation.time("block"):
+        pass
+    with instrumentation.time("block"):
+        pass
+    instrumentation.record("recorded", 0.5)
+    instrumentation.count("counter")
+    instrumentation.count("counter", 2)
+
+    assert instrumentation.timers["block"].calls == 2  # noqa: PLR2004
+    assert instrumentation.timers["recorded"] == Timer(calls=1, seconds=0.5)
+    assert instrumentation.counters == {"counter": 3}
+
+    other = Instrumentation(worker=True)
+    other.count("counter")
+    with other.time("block"):
+        pass
+    instrumentation.merge(pickle.loads(pickle.dumps(other)))  # noqa: S301
+    assert instrumentation.timers["block"].calls == 3  # noqa: PLR2004
+    assert instrumentation.counters == {"counter": 4}
+
+
+def test_not_pickled() -> None:
+    # only the instrumentation of a worker process is sent back with the environment
+    instrumentation = Instrumentation()
+    instrumentation.count("counter")
+    restored: Instrumentation = pickle.loads(pickle.dumps(instrumentation))  # noqa: S301
+    assert not restored.counters
+    assert not restored.worker
+
+
+@pytest.mark.sphinx(testroot="table", freshenv=True, warningiserror=True)
+def test_report(app: Sphinx) -> None:
+    app.config.graph_config.report = "reports/graph.json"
+    app.build()
+
+    report = json.loads((app.outdir / "reports" / "graph.json").read_text())
+    assert report["version"] == 1
+    assert {
+        "vertex.directive",
+        "vertex.fingerprint",
+        "graph.build",
+        "graph.check_cycles",
+        "layout.subtle",
+        "query.noop",
+        "uri.resolve",
+    } <= set(report["timers"])
+    assert report["timers"]["vertex.directive"]["calls"] == 5  # noqa: PLR2004
+    assert report["counters"]["graph.changed_vertices"] == 5  # noqa: PLR2004
+    assert report["counters"]["uri_cache.misses"] == 1
+
+    # the timers and counters aren't kept in the pickled environment
+    with (app.doctreedir / "environment.pickle").open("rb") as f:
+        env = pickle.load(f)  # noqa: S301
+    assert not env.graph_instrumentation.timers
+
+
+@pytest.mark.sphinx(testroot="parallel", parallel=2, freshenv=True)
+def test_parallel_read_merged(app: Sphinx) -> None:
+    app.build()
+    # the work done by each worker process is counted once
+    instrumentation = Instrumentation.read(app.env)
+    vertices = Store.read(app.env).vertices
+    assert instrumentation.timers["vertex.directive"].calls == len(vertices)
@@ -7,6 +7,8 @@ from docutils import nodes
 from sphinx.errors import SphinxError
 
 from sphinx_graph import formatting
+from sphinx_graph.vertex import layout
+from sphinx_graph.vertex.info import InfoParsed
 
 if TYPE_CHECKING:
     from sphinx.application import Sphinx
@@ -46,3 +48,12 @@ def test_unknown_layout(app: Sphinx) -> None:
         match=r"vertex .* has unknown layout '.*'. Defaulting to '.*' layout.",
     ):
         app.build()
+
+
+@pytest.mark.parametrize("name", sorted(layout.LAYOUTS))
+def test_layout_moves_content(name: str) -> None:
+    content = nodes.paragraph(text="content")
+    info = InfoParsed(content=content, parents=[], children=[], tags=["a"])
+    output = layout.apply_formatting("01", info, name)
+    # the content is moved into the output, not copied
+    assert any(node is content for node in output.findall(nodes.paragraph))
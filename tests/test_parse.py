@@ -72,3 +72,28 @@ def test_parse_str(value: str, expected: str | None) -> None:
 def test_parse_list(value: str, expected: list[str]) -> None:
     output = parse.comma_separated_list(value)
     assert output == expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected", "expectation"),
+    [
+        ("0", 0, does_not_raise()),
+        ("25", 25, does_not_raise()),
+        ("-1", None, pytest.raises(ConfigError)),
+        ("ten", None, pytest.raises(ConfigError)),
+        (None, None, pytest.raises(ConfigError)),
+    ],
+)
+def test_parse_non_negative_integer(
+    value: str | None,
+    expected: int | None,
+    expectation: AbstractContextManager[None],
+) -> None:
+    with expectation:
+        assert parse.non_negative_integer(value) == expected
+
+
+def test_parse_positive_integer() -> None:
+    assert parse.positive_integer("1") == 1
+    with pytest.raises(ConfigError):
+        parse.positive_integer("0")
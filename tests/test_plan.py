@@ -0,0 +1,83 @@
+import pytest
+import rustworkx as rx
+from sphinx.errors import ConfigError, SphinxError
+
+from sphinx_graph.vertex.config import Config
+from sphinx_graph.vertex.info import Info
+from sphinx_graph.vertex.plan import Plan
+from sphinx_graph.vertex.state import State
+
+
+@pytest.fixture
+def state() -> State:
+    config = Config()
+    vertices = {
+        "REQ-01": Info("a", config, parents={}, fingerprint="", tags=["x"], type="req"),
+        "REQ-02": Info(
+            "a",
+            config,
+            parents={"REQ-01": None},
+            fingerprint="",
+            tags=["y"],
+            type="req",
+        ),
+        "TST-01": Info(
+            "b", config, parents={"REQ-02": None}, fingerprint="", tags=["x"]
+        ),
+        "TST-02": Info("b", config, parents={"TST-01": None}, fingerprint="", tags=[]),
+    }
+    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    node_ids = dict(zip(vertices, graph.add_nodes_from(list(vertices)), strict=True))
+    for uid, info in vertices.items():
+        for parent in info.parents:
+            graph.add_edge(node_ids[parent], node_ids[uid], None)
+    return State(vertices, node_ids, graph)
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        ({}, ["REQ-01", "REQ-02", "TST-01", "TST-02"]),
+        ({"tags": "x"}, ["REQ-01", "TST-01"]),
+        ({"tags": ["x", "y"], "types": "req"}, ["REQ-01", "REQ-02"]),
+        (
+            {"tags": "y", "docnames": "b", "match": "any"},
+            ["REQ-02", "TST-01", "TST-02"],
+        ),
+        ({"id": "^TST-", "tags": "x"}, ["TST-01"]),
+        ({"id": "^TST-", "tags": "y", "match": "any"}, ["REQ-02", "TST-01", "TST-02"]),
+        ({"descendants_of": "REQ-01"}, ["REQ-02", "TST-01", "TST-02"]),
+        ({"descendants_of": "REQ-01", "depth": 2}, ["REQ-02", "TST-01"]),
+        (
+            {"ancestors_of": "TST-01", "include_self": True},
+            ["REQ-01", "REQ-02", "TST-01"],
+        ),
+        ({"sort": "-uid", "limit": 2}, ["TST-02", "TST-01"]),
+        ({"sort": "type", "limit": 3}, ["TST-01", "TST-02", "REQ-01"]),
+        ({"sort": "docname", "types": "req"}, ["REQ-01", "REQ-02"]),
+    ],
+)
+def test_plan(state: State, args: dict[str, object], expected: list[str]) -> None:
+    assert Plan.compile(args).run(state) == expected
+
+
+@pytest.mark.parametrize(
+    ("args", "message"),
+    [
+        ({"unknown": 1}, "unknown select query option"),
+        ({"tags": 1}, "'tags' must be a string or a list of strings"),
+        ({"depth": 0}, "'depth' must be a positive integer"),
+        ({"match": "some"}, "'match' must be one of all, any"),
+        ({"sort": "-fingerprint"}, "'sort' must be one of uid, docname, type"),
+        ({"id": "("}, "invalid 'id' regular expression"),
+        ({"include_self": "yes"}, "'include_self' must be a boolean"),
+    ],
+)
+def test_invalid_plan(args: dict[str, object], message: str) -> None:
+    with pytest.raises(ConfigError, match=message):
+        Plan.compile(args)
+
+
+def test_plan_unknown_vertex(state: State) -> None:
+    with pytest.raises(SphinxError, match="'REQ-03', but it doesn't exist"):
+        Plan.compile({"ancestors_of": "REQ-03"}).run(state)
@@ -0,0 +1,146 @@
+from pathlib import Path
+
+import pytest
+from sphinx.application import Sphinx
+
+from sphinx_graph.scan import scan, scan_file
+from sphinx_graph.vertex.fingerprint import FingerprintConfig
+from sphinx_graph.vertex.store import Store
+
+RST = """\
+Title
+=====
+
+.. vertex:: A
+   :tags: x, y
+   :type: req
+
+   first line
+   second line
+
+
+   second para
+
+.. vertex:: B
+   :parents: A:abcd,
+      C
+   :require_parents:
+
+   only line
+.. vertex:: C
+
+      indented more
+   less
+
+An example::
+
+   .. vertex:: NOT-A-VERTEX
+
+.. code-block:: rst
+
+   .. vertex:: NOT-A-VERTEX-EITHER
+
+.. note::
+
+   .. vertex:: D
+
+      nested in another directive
+"""
+
+MYST = """\
+# Title
+
+```{vertex} A
+:tags: x, y
+
+first line
+second line
+```
+
+:::{vertex} B
+---
+parents: A
+type: req
+---
+only line
+:::
+
+````{note}
+```{vertex} C
+nested
+```
+````
+
+```rst
+.. vertex:: NOT-A-VERTEX
+```
+
+```{code-block} md
+```{vertex} NOT-A-VERTEX-EITHER
+```
+"""
+
+
+def test_scan_rst() -> None:
+    vertices = scan(RST, "index", "index.rst", FingerprintConfig())
+    assert [(vertex.uid, vertex.line) for vertex in vertices] == [
+        ("A", 4),
+        ("B", 14),
+        ("C", 20),
+        ("D", 35),
+    ]
+    a, b, _c, _d = vertices
+    assert a.tags == ["x", "y"]
+    assert a.type == "req"
+    assert b.parents == {"A": "abcd", "C": None}
+    assert b.require_parents is True
+    assert b.require_fingerprints is None
+    assert all(vertex.error is None for vertex in vertices)
+
+
+def test_scan_myst() -> None:
+    vertices = scan(MYST, "index", "index.md", FingerprintConfig())
+    assert [(vertex.uid, vertex.line) for vertex in vertices] == [
+        ("A", 3),
+        ("B", 10),
+        ("C", 19),
+    ]
+    a, b, _c = vertices
+    assert a.tags == ["x", "y"]
+    assert b.parents == {"A": None}
+    assert b.type == "req"
+
+
+def test_scan_invalid_options() -> None:
+    source = ".. vertex:: A\n   :unknown: 1\n\n.. vertex:: B\n   :require_parents: no\n"
+    a, b = scan(source, "index", "index.rst", FingerprintConfig())
+    assert a.error == 'unknown option: "unknown"'
+    assert b.error == "invalid option: invalid boolean value: no"
+
+
+def test_scan_fingerprints() -> None:
+    a, b, c, d = scan(RST, "index", "index.rst", FingerprintConfig())
+    # vertices whose content contains markup can't be fingerprinted
+    assert a.fingerprint is not None
+    assert b.fingerprint is not None
+    assert c.fingerprint is None
+    assert d.fingerprint is not None
+
+    raw = FingerprintConfig(ignore_markup=False)
+    assert all(vertex.fingerprint for vertex in scan(RST, "index", "index.rst", raw))
+
+
+@pytest.mark.parametrize("ignore_markup", [True, False])
+@pytest.mark.sphinx(testroot="fingerprints", freshenv=True)
+def test_scan_fingerprints_match_sphinx(app: Sphinx, ignore_markup: bool) -> None:  # noqa: FBT001
+    config = FingerprintConfig(
+        algorithm="blake2b", length=8, ignore_markup=ignore_markup
+    )
+    app.config.graph_config.fingerprints = config
+    app.build()
+
+    vertices = scan_file(("index", Path(app.srcdir) / "index.rst"), config)
+    store = Store.read(app.env)
+    assert vertices
+    for vertex in vertices:
+        assert vertex.fingerprint == store.vertices[vertex.uid].fingerprint
@@ -1,16 +1,167 @@
+import pickle  # noqa: S403  # only round-trips stores created by the tests
+import random
+
+import rustworkx as rx
+
 from sphinx_graph.vertex.config import Config
-from sphinx_graph.vertex.info import Info
-from sphinx_graph.vertex.state import NodeIds
+from sphinx_graph.vertex.info import Info, Parents
+from sphinx_graph.vertex.reachability import ReachabilityIndex
+from sphinx_graph.vertex.state import State
+from sphinx_graph.vertex.store import Store
 
 
 def test_state() -> None:
-    vertices: dict[str, tuple[int, Info]] = {
-        "01": (
-            1,
-            Info("docname", Config(), parents={}, fingerprint="fingerprint", tags=[]),
-        )
+    vertices: dict[str, Info] = {
+        "01": Info("docname", Config(), parents={}, fingerprint="fingerprint", tags=[]),
     }
+    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    node_ids = {"01": graph.add_node("01")}
+
+    state = State(vertices, node_ids, graph)
+
+    assert list(iter(state.node_ids)) == ["01"]
+    assert list(iter(state.vertices)) == ["01"]
+
+
+def test_parents() -> None:
+    parents = Parents({"01": "abcd", "02": None})
+
+    assert parents == {"01": "abcd", "02": None}
+    assert list(parents) == ["01", "02"]
+    assert parents["02"] is None
+    assert "03" not in parents
+
+
+def test_store_pickle() -> None:
+    store = Store()
+    config = Config()
+    store.add("01", Info("doc", config, parents={}, fingerprint="aaaa", tags=[]))
+    store.add(
+        "02",
+        Info(
+            "doc",
+            config,
+            parents={"01": "aaaa"},
+            fingerprint="bbbb",
+            tags=["t"],
+            type="r",
+        ),
+    )
+    store.node_ids = {uid: store.graph.add_node(uid) for uid in ("01", "02")}
+    store.graph.add_edge(store.node_ids["01"], store.node_ids["02"], "aaaa")
+    store.fingerprints["01"] = (b"source", "aaaa", None)
+
+    restored: Store = pickle.loads(pickle.dumps(store))  # noqa: S301
+
+    assert restored.valid
+    assert restored.vertices == store.vertices
+    assert restored.vertices["01"].config is restored.vertices["02"].config
+    assert restored.docnames == store.docnames
+    assert restored.referrers == store.referrers
+    assert restored.tags == store.tags
+    assert restored.types == store.types
+    assert restored.fingerprints == store.fingerprints
+    state = State(restored.vertices, restored.node_ids, restored.graph)
+    assert list(state.children("01")) == ["02"]
+
+
+def test_store_invalid() -> None:
+    store = Store()
+    store.add("01", Info("doc", Config(), parents={}, fingerprint="a", tags=[]))
+    version, fields = store.__getstate__()
+
+    restored = Store.__new__(Store)
+    restored.__setstate__((version + 1, fields))
+    assert not restored.valid
+    assert not restored.vertices
 
-    node_ids = NodeIds(vertices)
+    restored = Store.__new__(Store)
+    restored.__setstate__((version, {**fields, "unexpected": []}))
+    assert not restored.valid
+
+    del fields["tags"]
+    restored = Store.__new__(Store)
+    restored.__setstate__((version, fields))
+    assert not restored.valid
+
+
+def test_store_reading() -> None:
+    store = Store()
+    store.add("01", Info("doc", Config(), parents={}, fingerprint="a", tags=[]))
+    store.add("02", Info("doc", Config(), parents={}, fingerprint="b", tags=[]))
+    store.node_ids = {uid: store.graph.add_node(uid) for uid in ("01", "02")}
+    store.dirty = {"02"}
+
+    # while reading (as in a parallel read worker), only the vertices read are sent
+    store.reading = True
+    restored: Store = pickle.loads(pickle.dumps(store))  # noqa: S301
+    assert list(restored.vertices) == ["02"]
+    assert not restored.node_ids
+    assert not restored.reading
+
+    store.reading = False
+    restored = pickle.loads(pickle.dumps(store))  # noqa: S301
+    assert list(restored.vertices) == ["01", "02"]
+    assert list(restored.node_ids) == ["01", "02"]
+
+
+def test_reachability_index() -> None:
+    rng = random.Random(0)  # noqa: S311
+    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    uids = [f"{i:02}" for i in range(40)]
+    node_ids = dict(zip(uids, graph.add_nodes_from(uids), strict=True))
+    # mostly acyclic, with a few back edges and a self-loop
+    for _ in range(60):
+        parent, child = sorted(rng.sample(range(40), 2))
+        graph.add_edge(parent, child, None)
+    graph.add_edges_from([(30, 10, None), (35, 5, None), (7, 7, None)])
+
+    index = ReachabilityIndex(graph)
+    for uid, node_id in node_ids.items():
+        assert set(index.ancestors(uid)) == {
+            graph[i] for i in rx.ancestors(graph, node_id)
+        }
+        assert set(index.descendants(uid)) == {
+            graph[i] for i in rx.descendants(graph, node_id)
+        }
+        for other, other_id in node_ids.items():
+            assert index.is_ancestor(uid, other) == (
+                other_id in rx.descendants(graph, node_id)
+            )
+
+
+def test_state_reachability() -> None:
+    graph: rx.PyDiGraph[str, str | None] = rx.PyDiGraph()
+    a, b, c = graph.add_nodes_from(["A", "B", "C"])
+    graph.add_edges_from([(a, b, None), (b, c, None)])
+    node_ids = {"A": a, "B": b, "C": c}
+
+    for index in (None, ReachabilityIndex(graph)):
+        state = State({}, node_ids, graph, index)
+        assert sorted(state.ancestors("C")) == ["A", "B"]
+        assert sorted(state.descendants("A")) == ["B", "C"]
+        assert state.is_ancestor("A", "C")
+        assert not state.is_ancestor("C", "A")
+        assert not state.is_ancestor("A", "A")
+
+
+def test_indexes() -> None:
+    config = Config()
+    vertices = {
+        "01": Info("a", config, parents={}, fingerprint="", tags=["x"], type="req"),
+        "02": Info("a", config, parents={}, fingerprint="", tags=["x", "y"]),
+        "03": Info("b", config, parents={}, fingerprint="", tags=["y"], type="req"),
+    }
+    state = State(vertices, {}, rx.PyDiGraph())
 
-    assert list(iter(node_ids)) == ["01"]
+    assert list(state.tagged("x")) == ["01", "02"]
+    assert list(state.of_type("req")) == ["01", "03"]
+    assert list(state.in_document("b")) == ["03"]
+    assert list(state.all_of(state.tagged("x"), state.tagged("y"))) == ["02"]
+    assert list(state.any_of(state.tagged("y"), state.of_type("req"))) == [
+        "02",
+        "03",
+        "01",
+    ]
+    assert not state.all_of()
+    assert state.tagged("x") - state.of_type("req") == {"02"}
@@ -1,12 +1,21 @@
-from uuid import uuid4
+import pstats
+import re
+from collections.abc import Callable
+from io import StringIO
 
 import pytest
 from sphinx.application import Sphinx
 from sphinx.errors import ConfigError
+from sphinx.testing.util import SphinxTestApp
 
+from sphinx_graph import vertex
+from sphinx_graph.instrumentation import Instrumentation
+from sphinx_graph.table.events import table_rows
 from sphinx_graph.table.info import Info
+from sphinx_graph.table.pages import page_name, slug
 from sphinx_graph.table.state import State
 from sphinx_graph.vertex.state import DuplicateIdError
+from sphinx_graph.vertex.store import Store
 
 
 @pytest.mark.sphinx(testroot="table", warningiserror=True)
@@ -14,6 +23,13 @@ def test_it_builds(app: Sphinx) -> None:
     app.build()
 
 
+@pytest.mark.sphinx(testroot="table-names", warningiserror=True)
+def test_table_ids(app: Sphinx) -> None:
+    app.build()
+    state = State.read(app.env)
+    assert list(state.tables) == ["index:5", "index#summary"]
+
+
 @pytest.mark.sphinx(testroot="table-query", warningiserror=True)
 def test_query_builds(app: Sphinx) -> None:
     app.build()
@@ -28,15 +44,184 @@ def test_query_unknown_fails(app: Sphinx) -> None:
         app.build()
 
 
+@pytest.mark.sphinx(testroot="table-select", warningiserror=True)
+def test_select_query(app: Sphinx) -> None:
+    app.build()
+    state = State.read(app.env)
+    vertex_state = vertex.State.read(app.env)
+
+    plans = {uid: info.plan for uid, info in state.tables.items()}
+    assert plans["index#p1-requirements"] is not None
+    assert plans["index#p1-requirements"].run(vertex_state) == ["REQ-01"]
+    assert plans["index#below"] is not None
+    assert plans["index#below"].run(vertex_state) == ["TST-01", "REQ-02"]
+
+    # the identical table (with its arguments in a different order) is cached
+    cache = Store.read(app.env).query_cache
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.sphinx(testroot="table-precompute", freshenv=True, warningiserror=True)
+def test_precompute_queries(app: Sphinx, workers: int) -> None:
+    app.config.graph_config.query_workers = workers
+    app.build()
+
+    # each distinct query is evaluated once, before any table is written
+    cache = Store.read(app.env).query_cache
+    assert (cache.hits, cache.misses) == (4, 3)
+    assert ("select", {"descendants_of": "01"}, 1) in cache
+
+
+@pytest.mark.sphinx("html", testroot="table-pages", warningiserror=True)
+def test_table_pages(app: Sphinx) -> None:
+    app.build()
+    outdir = app.outdir
+
+    index = (outdir / "index.html").read_text()
+    pages = outdir / "_vertex_tables" / slug("index#all")
+    assert f'href="_vertex_tables/{slug("index#all")}/2.html">next' in index
+
+    page_2 = (pages / "2.html").read_text()
+    assert 'href="../../index.html#03"' in page_2
+    assert 'href="../../index.html">« previous' in page_2
+    assert 'href="3.html">next' in page_2
+
+    page_3 = (pages / "3.html").read_text()
+    assert 'href="../../index.html#05"' in page_3
+    assert "next »" not in page_3
+    assert not (pages / "4.html").exists()
+
+    state = State.read(app.env)
+    vertex_state = vertex.State.read(app.env)
+    rows = table_rows(app, vertex_state, state.tables["index#some"])
+    assert list(rows) == ["02", "03"]
+
+
+@pytest.mark.sphinx(
+    "html", testroot="table-pages", srcdir="stale-pages", warningiserror=True
+)
+def test_stale_table_pages_removed(
+    app: Sphinx, make_app: Callable[..., SphinxTestApp]
+) -> None:
+    app.build()
+    pages = app.outdir / "_vertex_tables" / slug("index#all")
+    assert (pages / "3.html").exists()
+    assert not hasattr(app.env, "graph_paged_tables")
+
+    # the table shrinks to two pages
+    index = app.srcdir / "index.rst"
+    index.write_text(index.read_text().replace(":page-size: 2", ":page-size: 3"))
+    app = make_app("html", srcdir=app.srcdir, warningiserror=True)
+    app.build()
+    assert (pages / "2.html").exists()
+    assert not (pages / "3.html").exists()
+
+    # the table is removed
+    source = index.read_text()
+    index.write_text(source[: source.index(".. vertex-table::\n   :name: all")])
+    app = make_app("html", srcdir=app.srcdir, warningiserror=True)
+    app.build()
+    assert not pages.exists()
+
+
+def test_page_names_unique() -> None:
+    # UIDs which only differ in characters which aren't safe in a file name
+    assert page_name("index#all", 2) != page_name("index-all", 2)
+    assert page_name("index#all", 2).startswith("_vertex_tables/index-all-")
+    assert page_name("index#all", 2).endswith("/2")
+
+
+@pytest.mark.sphinx("html", testroot="table-columns", warningiserror=True)
+def test_table_columns(app: Sphinx) -> None:
+    app.build()
+    state = State.read(app.env)
+    assert state.tables["index:11"].columns == ["uid", "type", "parent count"]
+
+    index = (app.outdir / "index.html").read_text()
+    headers = re.findall(r"<th class=\"head\"><p>(.*?)</p></th>", index)
+    assert headers == ["uid", "type", "parent count"]
+    cells = re.findall(r"<td><p>(.*?)</p></td>", index)
+    assert cells[1:3] == ["req", "0"]
+    assert cells[4:6] == ["", "1"]
+
+
+@pytest.mark.sphinx(testroot="table-columns-unknown", warningiserror=True)
+def test_table_columns_unknown_fails(app: Sphinx) -> None:
+    with pytest.raises(
+        ConfigError,
+        match="no column registered with name 'unknown'",
+    ):
+        app.build()
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+@pytest.mark.sphinx("html", testroot="table-budget", freshenv=True)
+def test_table_over_budget(app: Sphinx, warning: StringIO, workers: int | None) -> None:
+    # with workers, the queries are timed in worker processes, and recorded here
+    app.config.graph_config.query_workers = workers
+    app.build()
+    for line in (10, 13):
+        assert re.search(
+            rf"index\.rst:{line}: WARNING: vertex-table query 'slow' took .*s, over the"
+            rf" budget of 0\.01s\. profile written to .*index-{line}-[0-9a-f]+\.prof",
+            warning.getvalue(),
+        )
+        profile = app.outdir / "profiles" / f"{slug(f'index:{line}')}.prof"
+        assert pstats.Stats(str(profile)).total_calls > 0  # type: ignore[attr-defined]
+        timer = Instrumentation.read(app.env).timers[f"table.index:{line}"]
+        assert timer.calls == 1
+        assert timer.seconds > app.config.graph_config.query_budget
+    assert Instrumentation.read(app.env).timers["query.slow"].calls == 2  # noqa: PLR2004
+    assert not hasattr(app.env, "graph_slowest_tables")
+
+
+@pytest.mark.sphinx(testroot="table-budget-limit", freshenv=True)
+def test_table_over_budget_once(app: Sphinx, warning: StringIO) -> None:
+    app.build()
+    timers = Instrumentation.read(app.env).timers
+    # the query of a paged table is run again for its later pages
+    assert timers["query.slow"].calls > 1
+    # but the table is only timed, warned about and profiled once
+    assert timers["table.index:10"].calls == 1
+    assert warning.getvalue().count("vertex-table query 'slow' took") == 1
+    assert [path.name for path in (app.outdir / "profiles").iterdir()] == [
+        f"{slug('index:10')}.prof"
+    ]
+
+
 def test_duplicate_tables_not_allowed() -> None:
     state = State(tables={})
-    uuid = uuid4()
+    uid = "docname:1"
 
-    state.insert(uuid, info=Info(docname="docname", query=None, args={}))
+    state.insert(uid, info=Info(docname="docname", query=None, args={}))
 
     with pytest.raises(
         DuplicateIdError,
         match=r"^Vertex table .* already exists.$",
     ):
-        # try to insert an existing uuid
-        state.insert(uuid, info=Info(docname="docname", query=None, args={}))
+        # try to insert an existing uid
+        state.insert(uid, info=Info(docname="docname", query=None, args={}))
+
+
+def test_purge_tables() -> None:
+    state = State(tables={})
+    state.insert("docname:1", info=Info(docname="docname", query=None, args={}))
+    state.insert("other:1", info=Info(docname="other", query=None, args={}))
+
+    state.purge("docname")
+
+    assert list(state.tables) == ["other:1"]
+    assert state.docnames == {"other": ["other:1"]}
+
+
+def test_merge_tables() -> None:
+    state = State(tables={})
+    other = State(tables={})
+    other.insert("docname:1", info=Info(docname="docname", query=None, args={}))
+    other.insert("unread:1", info=Info(docname="unread", query=None, args={}))
+
+    state.merge(["docname"], other)
+
+    assert list(state.tables) == ["docname:1"]
+    assert state.docnames == {"docname": ["docname:1"]}
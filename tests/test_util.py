@@ -1,3 +1,6 @@
+from types import SimpleNamespace
+from typing import Any
+
 import pytest
 
 from sphinx_graph import util
@@ -14,3 +17,15 @@ def test_unwrap() -> None:
         match="attempted to 'unwrap' a None value!",
     ):
         util.unwrap(None)
+
+
+def test_may_contain() -> None:
+    env: Any = SimpleNamespace(
+        toctree_includes={"index": ["a", "b"], "a": ["c"], "c": ["a"]},
+    )
+
+    assert util.may_contain(env, "c", {"c"})
+    assert not util.may_contain(env, "b", {"c"})
+    # nodes in documents included by the toctree (recursively) may be inlined
+    assert util.may_contain(env, "index", {"c"})
+    assert not util.may_contain(env, "index", {"d"})
@@ -5,6 +5,7 @@ from sphinx.application import Sphinx
 from sphinx.errors import SphinxError
 
 from sphinx_graph import vertex
+from sphinx_graph.vertex.uris import uri_cache
 
 
 @pytest.mark.sphinx(testroot="vertex", warningiserror=True)
@@ -12,6 +13,34 @@ def test_it_builds(app: Sphinx) -> None:
     app.build()
 
 
+@pytest.mark.sphinx(testroot="table", freshenv=True, warningiserror=True)
+def test_relative_uris_cached(app: Sphinx) -> None:
+    app.build()
+    # every link is within the one document, so its URI is only computed once
+    cache = uri_cache(app.builder)
+    assert cache.misses == 1
+    assert cache.hits > 0
+
+
+@pytest.mark.sphinx("html", testroot="toctree", freshenv=True, warningiserror=True)
+def test_resolve_documents(app: Sphinx) -> None:
+    app.build()
+    output = (app.outdir / "vertices.html").read_text()
+    assert "Children: " in output
+    assert "<table" in output
+
+
+@pytest.mark.sphinx(
+    "singlehtml", testroot="toctree", freshenv=True, warningiserror=True
+)
+def test_resolve_assembled_documents(app: Sphinx) -> None:
+    app.build()
+    # the vertices are resolved as part of the root document
+    output = (app.outdir / "index.html").read_text()
+    assert "Children: " in output
+    assert "<table" in output
+
+
 @pytest.mark.sphinx(testroot="parallel", parallel=2, warningiserror=True)
 def test_it_builds_parallel(app: Sphinx) -> None:
     app.build()
@@ -68,6 +97,14 @@ def test_tags_builds(app: Sphinx) -> None:
 
     state = vertex.State.read(app.env)
     assert state.vertices["01"].tags == ["P1", "component::x", "milestone::a"]
+    assert state.vertices["02"].type == "req"
+
+    assert list(state.tagged("P1")) == ["01", "02"]
+    assert list(state.tagged("component::x")) == ["01"]
+    assert not state.tagged("unknown")
+    assert list(state.of_type("req")) == ["02"]
+    assert list(state.in_document("index")) == ["01", "02"]
+    assert state.indexes == vertex.state.Indexes.build(state.vertices)
 
 
 @pytest.mark.sphinx(testroot="invalid-parent", warningiserror=True)